@@ -4,6 +4,7 @@ from game_logic.cores import PDECore
 from game_logic.pets import Phoenix
 from game_logic.lifestar import Specter, Nova
 from game_logic.enables import ControlPurify, AttributeReductionPurify, MarkPurify, BalancedStrike, UnbendingWill
+from utils.trace import tracer
 
 # Logging control
 LOG_SETTINGS = {
@@ -28,13 +29,14 @@ LOG_SETTINGS = {
 }
 
 def conditional_log(msg, category="battle_flow"):
-    if LOG_SETTINGS.get(category, False):
-        print(msg)
+    if getattr(tracer, category):
+        tracer.emit(msg)
 
 purify_mapping = {"CP": ControlPurify(), "ARP": AttributeReductionPurify(), "MP": MarkPurify()}
 trait_mapping = {"BS": BalancedStrike(), "UW": UnbendingWill()}
 
 def run_three_round_test():
+    tracer.configure(LOG_SETTINGS)
     global active_core
     active_core = PDECore()
 
@@ -102,6 +104,7 @@ def run_three_round_test():
         for buff_name, buff in boss.buffs.items():
             conditional_log(f"  {buff_name}: {buff}", "buffs")
         conditional_log(f"  Boss HP: {boss.hp/1e6:.1f}M", "buffs")
+    tracer.flush()
 
 if __name__ == "__main__":
     run_three_round_test()
@@ -1,5 +1,8 @@
+import asyncio
 import textwrap
-from utils.log_utils import stylize_log
+from game_logic.engine import Battle, BattleCancelled, VERDICT_LINES, build_battle
+from game_logic.rng import BattleRNG
+from utils.log_utils import LogRecord, stylize_log
 
 DISCORD_MESSAGE_LIMIT = 1900
 
@@ -25,6 +28,7 @@ def detect_category(line):
 def format_logs_as_bullet_points(logs):
     formatted_lines = []
     for line in logs:
+        line = str(line) if isinstance(line, LogRecord) else line
         if isinstance(line, str) and line.strip():
             category = detect_category(str(line))
             formatted_lines.append(stylize_log(str(line), category))
@@ -63,48 +67,40 @@ def group_control_effects(logs):
 
     return grouped
 
-async def simulate_battle(interaction, team, boss, mode):
-    all_logs = []
-    battle_start_logs = []
+def play_logged_battle(config, seed=None, should_stop=None):
+    """Build and play one detailed battle for ``config`` without touching Discord.
 
-    for hero in team.heroes:
-        if hero.artifact and hasattr(hero.artifact, "apply_start_of_battle"):
-            result = hero.artifact.apply_start_of_battle(team, round_num=1)
-            if result:
-                battle_start_logs.extend(result)
+    Safe to run in a worker process: the battle is built there, so module
+    state such as the active core is set up where the battle runs. Returns
+    ``(blocks, all_logs)``; ``blocks`` are the log groups simulate_battle posts
+    one after another in detailed mode. ``should_stop`` is checked between
+    rounds, as in Battle.run.
+    """
+    rng = BattleRNG(seed)
+    team, boss = build_battle(config, rng)
+    battle = Battle(team, boss, log_level="detailed", seed=rng.seed_value)
+    battle_start_logs = battle.start()
 
-    for hero in team.heroes:
-        if hasattr(hero, "start_of_battle") and callable(hero.start_of_battle):
-            battle_start_logs.extend(hero.start_of_battle(team, boss))
+    blocks = [battle_start_logs]
+    all_logs = list(battle_start_logs)
 
-    if mode == "detailed":
-        bullet_block = format_logs_as_bullet_points(battle_start_logs)
-        for chunk in chunk_logs(bullet_block):
-            await interaction.followup.send(chunk)
-
-    all_logs.extend(battle_start_logs)
-
-    for round_num in range(1, 16):
-        round_logs = [f"🔁 **Round {round_num}**"]
+    while not battle.finished:
+        if should_stop is not None and should_stop():
+            raise BattleCancelled(battle.round_num)
+        round_logs = [f"🔁 **Round {battle.round_num + 1}**"]
 
         statuses = team.status_descriptions()
         if statuses:
             round_logs.append("📊 Team Status:")
             round_logs.extend(statuses)
 
-        round_logs += team.perform_turn(boss, round_num)
-
-        if all(not h.is_alive() for h in team.heroes):
-            round_logs.append("❌ All heroes have fallen. Defeat!")
-            all_logs.extend(round_logs)
-            return all_logs
+        round_logs += battle.play_round().logs
 
-        if not boss.is_alive():
-            round_logs.append("🏆 Boss defeated! Victory!")
+        if battle.verdict in ("victory", "defeat"):
+            round_logs.append(VERDICT_LINES[battle.verdict])
             all_logs.extend(round_logs)
-            return all_logs
-
-        round_logs += team.end_of_round(boss, round_num)
+            blocks.append(round_logs)
+            return blocks, all_logs
 
         statuses = team.status_descriptions()
         if statuses:
@@ -114,22 +110,26 @@ async def simulate_battle(interaction, team, boss, mode):
         round_logs.append(f"💥 Boss HP: {int(boss.hp)} | 🏹 Total Damage: {int(boss.total_damage_taken)}")
 
         all_logs.extend(round_logs)
+        blocks.append(round_logs)
+
+    all_logs.append(VERDICT_LINES[battle.verdict])
+    blocks.append(all_logs)
+    return blocks, all_logs
 
-        if mode == "detailed":
-            bullet_block = format_logs_as_bullet_points(round_logs)
-            for chunk in chunk_logs(bullet_block):
-                await interaction.followup.send(chunk)
 
-    if all(not h.is_alive() for h in team.heroes):
-        all_logs.append("❌ All heroes have fallen. Defeat!")
-    elif not boss.is_alive():
-        all_logs.append("🏆 Boss defeated! Victory!")
-    else:
-        all_logs.append("⏳ Battle ended after 15 rounds. Boss survived.")
+async def simulate_battle(interaction, config, mode, executor=None):
+    """Play ``config`` on ``executor`` (default: the loop's) and post the logs as follow-ups."""
+    loop = asyncio.get_running_loop()
+    blocks, all_logs = await loop.run_in_executor(executor, play_logged_battle, config)
 
     if mode == "detailed":
-        bullet_block = format_logs_as_bullet_points(all_logs)
-        for chunk in chunk_logs(bullet_block):
-            await interaction.followup.send(chunk)
+        await post_logged_battle(interaction, blocks)
 
     return all_logs
+
+
+async def post_logged_battle(interaction, blocks):
+    """Send play_logged_battle's log blocks as follow-ups, in order."""
+    for block in blocks:
+        for chunk in chunk_logs(format_logs_as_bullet_points(block)):
+            await interaction.followup.send(chunk)
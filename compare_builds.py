@@ -0,0 +1,158 @@
+# compare_builds.py
+"""A/B comparison of two team builds with common random numbers.
+
+Both builds fight the same seeds with split RNG streams (``BattleRNG(split=True)``),
+so a crit, dodge or resist roll means the same thing in both battles of a
+pair. The quantity of interest is the per-seed difference, whose spread is far
+smaller than that of two independent runs, so a verdict needs fewer battles.
+"""
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from math import sqrt
+
+from debug_fast_average import TEAM, suppress_stdout, t_critical, _silence_worker, _variance
+from game_logic.engine import run_battle
+
+
+def team_damage(result):
+    """Default metric: total damage dealt by the team."""
+    return sum(result.damage.values())
+
+
+def _fmt(damage, sign=""):
+    if abs(damage) >= 1e13:
+        return f"{damage:{sign}.2e}"
+    return f"{damage / 1e9:{sign}.2f}B"
+
+
+class PairedStats:
+    """Running sums for paired battles; partial stats from workers merge."""
+
+    def __init__(self):
+        self.n = 0
+        self.sum_a = self.sum_b = 0.0
+        self.sq_a = self.sq_b = 0.0
+        self.sum_diff = self.sq_diff = 0.0
+
+    def add(self, a, b):
+        self.n += 1
+        self.sum_a += a
+        self.sum_b += b
+        self.sq_a += a * a
+        self.sq_b += b * b
+        diff = a - b
+        self.sum_diff += diff
+        self.sq_diff += diff * diff
+
+    def merge(self, other):
+        self.n += other.n
+        self.sum_a += other.sum_a
+        self.sum_b += other.sum_b
+        self.sq_a += other.sq_a
+        self.sq_b += other.sq_b
+        self.sum_diff += other.sum_diff
+        self.sq_diff += other.sq_diff
+        return self
+
+    @property
+    def mean_a(self):
+        return self.sum_a / self.n
+
+    @property
+    def mean_b(self):
+        return self.sum_b / self.n
+
+    @property
+    def mean_diff(self):
+        """Mean of A - B over the pairs."""
+        return self.sum_diff / self.n
+
+    def stderr(self):
+        return sqrt(_variance(self.sum_diff, self.sq_diff, self.n) / self.n)
+
+    def interval(self, confidence=0.95):
+        """Confidence interval for the mean difference A - B."""
+        half = t_critical(self.n - 1, confidence) * self.stderr()
+        return self.mean_diff - half, self.mean_diff + half
+
+    def variance_reduction(self):
+        """How many times fewer battles the pairing needs than two independent runs."""
+        paired = _variance(self.sum_diff, self.sq_diff, self.n)
+        independent = _variance(self.sum_a, self.sq_a, self.n) + _variance(self.sum_b, self.sq_b, self.n)
+        return independent / paired if paired > 0 else float("inf")
+
+    def verdict(self, confidence=0.95):
+        low, high = self.interval(confidence)
+        if low > 0:
+            return "A"
+        if high < 0:
+            return "B"
+        return None
+
+    def print_summary(self, label_a="A", label_b="B", confidence=0.95):
+        low, high = self.interval(confidence)
+        print(f"\n⚖️ PAIRED COMPARISON (across {self.n} seed pairs)\n")
+        print(f"{label_a:>12}: {_fmt(self.mean_a)} AVG")
+        print(f"{label_b:>12}: {_fmt(self.mean_b)} AVG")
+        print(f"\n📐 Difference ({label_a} - {label_b}): {_fmt(self.mean_diff, '+')} "
+              f"[{_fmt(low, '+')}, {_fmt(high, '+')}] at {confidence:.0%}")
+        print(f"📉 Variance reduction vs independent runs: {self.variance_reduction():.1f}x")
+        winner = self.verdict(confidence)
+        if winner:
+            print(f"🏆 {label_a if winner == 'A' else label_b} is better.")
+        else:
+            print("🤷 No significant difference yet.")
+
+
+def paired_battle(config_a, config_b, seed, metric=team_damage, stop_on_death=()):
+    """Run both builds on ``seed`` with split streams and return their metric values."""
+    a = metric(run_battle(config_a, seed, stop_on_death=stop_on_death, split_streams=True))
+    b = metric(run_battle(config_b, seed, stop_on_death=stop_on_death, split_streams=True))
+    return a, b
+
+
+def _run_pairs(config_a, config_b, seeds, metric=team_damage, stop_on_death=()):
+    stats = PairedStats()
+    for seed in seeds:
+        stats.add(*paired_battle(config_a, config_b, seed, metric, stop_on_death))
+    return stats
+
+
+def compare_builds(config_a, config_b, num_battles=100, base_seed=None, metric=team_damage,
+                   stop_on_death=(), workers=1, label_a="A", label_b="B", confidence=0.95):
+    """Compare two BattleConfigs on ``num_battles`` shared seeds and print the paired result.
+
+    Pair ``i`` uses seed ``base_seed + i``. ``metric`` maps a BattleResult to a
+    number and must be a module-level function when ``workers`` > 1.
+    """
+    if base_seed is None:
+        base_seed = random.randrange(2**32)
+    seeds = range(base_seed, base_seed + num_battles)
+
+    if workers == 1:
+        with suppress_stdout():
+            stats = _run_pairs(config_a, config_b, seeds, metric, stop_on_death)
+    else:
+        workers = workers or os.cpu_count() or 1
+        chunks = [seeds[i::workers] for i in range(workers)]
+        stats = PairedStats()
+        with ProcessPoolExecutor(max_workers=workers, initializer=_silence_worker) as pool:
+            futures = [pool.submit(_run_pairs, config_a, config_b, chunk, metric, stop_on_death)
+                       for chunk in chunks if chunk]
+            for future in futures:
+                stats.merge(future.result())
+
+    stats.print_summary(label_a, label_b, confidence)
+    return stats
+
+
+def swap_artifact(config, hero_id, artifact):
+    """``config`` with ``hero_id``'s artifact replaced."""
+    heroes = tuple(spec._replace(artifact=artifact) if spec.hero_id == hero_id else spec for spec in config.heroes)
+    return config._replace(heroes=heroes)
+
+
+if __name__ == "__main__":
+    compare_builds(TEAM, swap_artifact(TEAM, "hero_LFA_Hero", "scissors"), num_battles=100,
+                   label_a="LFA Antlers", label_b="LFA Scissors", workers=None)
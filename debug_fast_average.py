@@ -1,15 +1,15 @@
 # debugfast_average.py
 
-from game_logic import Hero, Boss, Team
-from game_logic.artifacts import Scissors, DB, Mirror, Antlers, dDB, dMirror
-from game_logic.cores import PDECore
-import game_logic.cores  # ✅ Import the module to set global core
-from game_logic.pets import Phoenix
-from game_logic.lifestar import Specter, Nova
-from game_logic.enables import ControlPurify, AttributeReductionPurify, MarkPurify, BalancedStrike, UnbendingWill
+from game_logic.engine import BattleConfig, HeroSpec, run_battle
 import sys
 import os
+import random
+import time
+from concurrent.futures import ProcessPoolExecutor, FIRST_COMPLETED, wait
 from contextlib import contextmanager
+from itertools import repeat
+from math import atan, cos, pi, sin, sqrt
+from statistics import NormalDist
 
 # 🧹 Suppress stdout during simulation
 @contextmanager
@@ -27,171 +27,310 @@ def suppress_stdout():
         sys.stderr = original_stderr
 
 
-purify_mapping = {
-    "CP": ControlPurify(),
-    "ARP": AttributeReductionPurify(),
-    "MP": MarkPurify()
-}
-trait_mapping = {
-    "BS": BalancedStrike(),
-    "UW": UnbendingWill()
-}
-
-def create_team_and_boss():
-    # ✅ Properly set active_core inside the module used by apply_control_effect
-    game_logic.cores.active_core = PDECore()
-
-    data = [
-        ("hero_MFF_Hero", 11e9, 6e7, 3800, "MP", "UW", dDB(), 15, 0, 0, 0, 0, 0, 0, 59, 40, 8000),
-        ("hero_PDE_Hero", 9e9, 6e7, 2200, "MP", "UW", Scissors(), 15, 0, 0, 0, 0, 0, 0, 59, 40, 8444),
-        ("hero_SQH_Hero", 12e9, 7e7, 3440, "MP", "UW", dMirror(), 15, 0, 0, 0, 0, 0, 0, 59, 40, 9000),
-        ("hero_LFA_Hero", 20e9, 1.74e8, 3200, "MP", "BS", Antlers(), 15, 20, 150, 130, 140, 530, 90, 0, 16, 8999),
-        ("hero_LBRM_Hero", 9.9e9, 5e7, 2000, "MP", "UW", dMirror(), 14, 0, 0, 0, 0, 0, 0, 59, 46, 8000),
-        ("hero_ELY_Hero", 7.4e9, 5e7, 2500, "MP", "UW", Antlers(), 0, 0, 0, 0, 0, 0, 0, 40, 46, 4999)
-    ]
-
-    heroes = []
-    for hid, hp, atk, spd, purify, trait, artifact, dt_level, crit_rate, crit_dmg, precision, hd, skill_damage, add, dr, adr, armor in data:
-        lifestar = None
- #       if hid == "hero_PDE_Hero":
-  #          h.immune_control_effect = "seal_of_light"
-#        if hid == "hero_LBRM_Hero":
- #           h.immune_control_effect = "seal_of_light"
-  #      if hid == "hero_LFA_Hero":
-   #        h.immune_control_effect = "seal_of_light"
-        if hid == "hero_LFA_Hero":
-            lifestar = Specter()
-        elif hid == "hero_SQH_Hero":
-            lifestar = Nova()
-
-        h = Hero.from_stats(hid, [hp, atk, spd], artifact=artifact, lifestar=lifestar)
-        h.set_enables(purify_mapping.get(purify), trait_mapping.get(trait))
-        h.dt_level = dt_level
-
-        # Offensive stats
-        h.crit_rate += crit_rate
-        h._base_crit_rate += crit_rate
-        h.crit_dmg += crit_dmg
-        h._base_crit_dmg += crit_dmg
-        h.precision += precision
-        h._base_precision += precision
-        h._base_skill_damage += skill_damage
-        h.hd += hd
-        h._base_hd += hd
-        h.all_damage_dealt += add
-        h._base_all_damage_dealt += add
-
-        # Defensive stats
-        h.DR += dr
-        h._base_dr += dr
-        h.ADR += adr
-        h._base_adr += adr
-        h.armor += armor
-        h.original_armor += armor
-
-        h.gk = h.defier = True
-        h.total_damage_dealt = 0
-        h.recalculate_stats()
-        heroes.append(h)
-
-
-    team = Team(heroes, heroes[:2], heroes[2:], pet=Phoenix())
-    boss = Boss()
-
-    for hero in heroes:
-        if hero.artifact and hasattr(hero.artifact, "apply_start_of_battle"):
-            hero.artifact.apply_start_of_battle(team, round_num=1)
-
-    return team, boss, heroes
-
-def run_debugfast_average():
-    num_simulations = 100
-    hero_totals = {}
-    boss_totals = []
-    ely_deaths = 0
-    ely_rounds_survived = []
-
-    
-
-    best_damage = -float('inf')
-    worst_damage = float('inf')
-    best_sim = None
-    worst_sim = None
-
-    with suppress_stdout():
-        for sim_num in range(num_simulations):
-            team, boss, heroes = create_team_and_boss()
-            ely = next((h for h in heroes if h.name == "ELY"), None)
-            track_ely = ely is not None
-            died_round = 15
-
-            for hero in heroes:
-                if hasattr(hero, "start_of_battle"):
-                    hero.start_of_battle(team, boss)
+TEAM = BattleConfig(heroes=(
+    #         hero_id          hp      atk     spd   purify trait artifact  lifestar  dt  cr  cd  prec  hd skill add  dr  adr armor
+    HeroSpec("hero_MFF_Hero", 11e9, 6e7, 3800, "MP", "UW", "ddb", None, 15, 0, 0, 0, 0, 0, 0, 59, 40, 8000),
+    HeroSpec("hero_PDE_Hero", 9e9, 6e7, 2200, "MP", "UW", "scissors", None, 15, 0, 0, 0, 0, 0, 0, 59, 40, 8444),
+    HeroSpec("hero_SQH_Hero", 12e9, 7e7, 3440, "MP", "UW", "dmirror", "nova", 15, 0, 0, 0, 0, 0, 0, 59, 40, 9000),
+    HeroSpec("hero_LFA_Hero", 20e9, 1.74e8, 3200, "MP", "BS", "antlers", "specter", 15, 20, 150, 130, 140, 530, 90, 0, 16, 8999),
+    HeroSpec("hero_LBRM_Hero", 9.9e9, 5e7, 2000, "MP", "UW", "dmirror", None, 14, 0, 0, 0, 0, 0, 0, 59, 46, 8000),
+    HeroSpec("hero_ELY_Hero", 7.4e9, 5e7, 2500, "MP", "UW", "antlers", None, 0, 0, 0, 0, 0, 0, 0, 40, 46, 4999),
+))
+
+
+def simulate_one_battle(seed, config=TEAM, split_streams=False, should_stop=None):
+    """Run a single seeded battle and return ``(hero_damage, ely_round, ely_died)``.
+
+    ``hero_damage`` is a list of ``(name, total_damage_dealt)`` in team order.
+    ``ely_round`` is the round ELY died in (15 if ELY survived), or None when
+    the team has no ELY. The battle stops as soon as ELY falls.
+    ``split_streams`` and ``should_stop`` are passed on to run_battle.
+    """
+    result = run_battle(config, seed, stop_on_death=("ELY",), split_streams=split_streams, should_stop=should_stop)
+    hero_damage = [(name, result.damage[name]) for name in result.hero_names]
+    if "ELY" not in result.hero_names:
+        return hero_damage, None, False
+    ely_died = "ELY" in result.deaths
+    return hero_damage, result.deaths.get("ELY", 15), ely_died
+
+
+def _t_coverage(t, df):
+    """P(|T| < t) for Student's t with integer ``df`` (Abramowitz & Stegun 26.7.3/4)."""
+    theta = atan(t / sqrt(df))
+    c2 = cos(theta) ** 2
+    term = total = 1.0 if df % 2 == 0 else cos(theta)
+    for k in range(2 if df % 2 == 0 else 3, df, 2):
+        term *= c2 * (k - 1) / k
+        total += term
+    if df % 2 == 0:
+        return sin(theta) * total
+    return 2 / pi * (theta + sin(theta) * total) if df > 1 else 2 * theta / pi
+
+
+def t_critical(df, confidence=0.95):
+    """Two-sided Student t quantile.
+
+    Exact (bisection on the closed-form CDF) up to 30 degrees of freedom, where
+    the Cornish-Fisher expansion of the normal quantile used beyond that
+    undershoots (9.7 instead of 12.7 at df=1).
+    """
+    if df <= 0:
+        return float("inf")
+    if df <= 30:
+        low, high = 0.0, 1.0
+        while _t_coverage(high, df) < confidence:
+            low, high = high, high * 2
+        for _ in range(60):
+            mid = (low + high) / 2
+            if _t_coverage(mid, df) < confidence:
+                low = mid
+            else:
+                high = mid
+        return high
+    z = NormalDist().inv_cdf(0.5 + confidence / 2)
+    return (z + (z ** 3 + z) / (4 * df) + (5 * z ** 5 + 16 * z ** 3 + 3 * z) / (96 * df ** 2)
+            + (3 * z ** 7 + 19 * z ** 5 + 17 * z ** 3 - 15 * z) / (384 * df ** 3))
+
+
+def _variance(total, squares, n):
+    if n < 2:
+        return float("inf")
+    return max(squares - total * total / n, 0.0) / (n - 1)
+
+
+class AverageStats:
+    """Running totals for a batch of battles; partial stats from workers merge."""
+
+    def __init__(self):
+        self.num_simulations = 0
+        self.hero_totals = {}
+        self.team_total_sum = 0
+        self.team_total_sq = 0.0
+        self.share_sums = {}
+        self.share_sq = {}
+        self.ely_deaths = 0
+        self.ely_rounds_survived = []
+        self.best_damage = -float('inf')
+        self.worst_damage = float('inf')
+        self.best_sim = None
+        self.worst_sim = None
+
+    def add(self, hero_damage, ely_round, ely_died):
+        self.num_simulations += 1
+        for name, dmg in hero_damage:
+            self.hero_totals.setdefault(name, 0)
+            self.hero_totals[name] += dmg
+
+        team_total = sum(dmg for _, dmg in hero_damage)
+        self.team_total_sum += team_total
+        self.team_total_sq += float(team_total) ** 2
+        for name, dmg in hero_damage:
+            share = dmg / team_total if team_total > 0 else 0.0
+            self.share_sums[name] = self.share_sums.get(name, 0.0) + share
+            self.share_sq[name] = self.share_sq.get(name, 0.0) + share * share
+
+        # Track best and worst
+        if team_total > self.best_damage:
+            self.best_damage = team_total
+            self.best_sim = [dmg for _, dmg in hero_damage]
+        if team_total < self.worst_damage:
+            self.worst_damage = team_total
+            self.worst_sim = [dmg for _, dmg in hero_damage]
+
+        if ely_died:
+            self.ely_deaths += 1
+        if ely_round is not None:
+            self.ely_rounds_survived.append(ely_round)
+
+    def to_dict(self):
+        """Plain JSON-friendly form, e.g. for the result cache."""
+        return dict(vars(self))
+
+    @classmethod
+    def from_dict(cls, data):
+        stats = cls()
+        vars(stats).update(data)
+        return stats
+
+    def merge(self, other):
+        self.num_simulations += other.num_simulations
+        for name, total in other.hero_totals.items():
+            self.hero_totals.setdefault(name, 0)
+            self.hero_totals[name] += total
+        self.team_total_sum += other.team_total_sum
+        self.team_total_sq += other.team_total_sq
+        for name, total in other.share_sums.items():
+            self.share_sums[name] = self.share_sums.get(name, 0.0) + total
+            self.share_sq[name] = self.share_sq.get(name, 0.0) + other.share_sq[name]
+        self.ely_deaths += other.ely_deaths
+        self.ely_rounds_survived.extend(other.ely_rounds_survived)
+        if other.best_damage > self.best_damage:
+            self.best_damage = other.best_damage
+            self.best_sim = other.best_sim
+        if other.worst_damage < self.worst_damage:
+            self.worst_damage = other.worst_damage
+            self.worst_sim = other.worst_sim
+        return self
+
+    def interval(self, hero=None, confidence=0.95):
+        """``(mean, half_width)`` of mean team damage, or of ``hero``'s per-battle damage share."""
+        n = self.num_simulations
+        if hero is None:
+            total, squares = self.team_total_sum, self.team_total_sq
+        else:
+            total, squares = self.share_sums.get(hero, 0.0), self.share_sq.get(hero, 0.0)
+        if n == 0:
+            return 0.0, float("inf")
+        return total / n, t_critical(n - 1, confidence) * sqrt(_variance(total, squares, n) / n)
+
+    def relative_width(self, hero=None, confidence=0.95):
+        """Full confidence-interval width as a fraction of the mean."""
+        mean, half = self.interval(hero, confidence)
+        return 2 * half / mean if mean > 0 else float("inf")
+
+    def print_summary(self):
+        num_simulations = self.num_simulations
+        print("\n🏹 FINAL AVERAGE SUMMARY (across {} battles)\n".format(num_simulations))
+        team_total_avg = self.team_total_sum / num_simulations
+
+        for name, total in self.hero_totals.items():
+            avg_damage = total / num_simulations
+            percent = (avg_damage / team_total_avg) * 100 if team_total_avg > 0 else 0
+            label = f"{name:>8}"
+            if avg_damage >= 1e13:
+                dmg_str = f"{avg_damage:.2e}"
+            else:
+                dmg_str = f"{avg_damage / 1e9:6.2f}B"
+            print(f"{label}: {dmg_str} AVG DMG ({percent:5.1f}%)")
+
+        if team_total_avg >= 1e13:
+            total_str = f"{team_total_avg:.2e}"
+        else:
+            total_str = f"{team_total_avg / 1e9:6.2f}B"
 
-            for round_num in range(1, 16):
-                if all(not h.is_alive() for h in team.heroes) or not boss.is_alive():
-                    break
+        print(f"\n🏆 Average Total Team Damage: {total_str}")
 
-                for hero in team.heroes:
-                    if hero.lifestar and hasattr(hero.lifestar, "start_of_round"):
-                        hero.lifestar.start_of_round(hero, team, boss, round_num)
+        print(f"\n⭐ Best Single Battle: {self.best_damage:.2e}")
+        print(f"📉 Worst Single Battle: {self.worst_damage:.2e}")
+        if self.ely_rounds_survived:
+            avg_survival = sum(self.ely_rounds_survived) / len(self.ely_rounds_survived)
+            print(f"\n💀 ELY Deaths: {self.ely_deaths} out of {len(self.ely_rounds_survived)}")
+            print(f"📊 ELY Average Round Survived: {avg_survival:.2f}")
 
-                _ = team.perform_turn(boss, round_num)
-                _ = team.end_of_round(boss, round_num)
-                if track_ely and not ely.is_alive():
-                    died_round = round_num
-                    ely_deaths += 1
-                    break
 
+def _run_seeds(seeds, config=TEAM, split_streams=False, should_stop=None):
+    stats = AverageStats()
+    for seed in seeds:
+        stats.add(*simulate_one_battle(seed, config, split_streams, should_stop))
+    return stats
 
-            for hero in heroes:
-                hero_totals.setdefault(hero.name, 0)
-                hero_totals[hero.name] += hero.total_damage_dealt
 
-            team_total = sum(h.total_damage_dealt for h in heroes)
-            boss_totals.append(team_total)
+def _silence_worker():
+    # Workers never print anything useful; redirect once instead of per battle.
+    sys.stdout = open(os.devnull, 'w')
+    sys.stderr = open(os.devnull, 'w')
 
-            # Track best and worst
-            if team_total > best_damage:
-                best_damage = team_total
-                best_sim = [h.total_damage_dealt for h in heroes]
-            if team_total < worst_damage:
-                worst_damage = team_total
-                worst_sim = [h.total_damage_dealt for h in heroes]
 
-            if track_ely:
-                ely_rounds_survived.append(died_round)
+def run_debugfast_average(num_simulations=100, base_seed=None):
+    if base_seed is None:
+        base_seed = random.randrange(2**32)
+    seeds = range(base_seed, base_seed + num_simulations)
 
+    with suppress_stdout():
+        stats = _run_seeds(seeds)
 
     # 🧠 OUTSIDE suppress_stdout → safe to print
-    print("\n🏹 FINAL AVERAGE SUMMARY (across {} battles)\n".format(num_simulations))
-    team_total_avg = sum(boss_totals) / num_simulations
-
-    for name, total in hero_totals.items():
-        avg_damage = total / num_simulations
-        percent = (avg_damage / team_total_avg) * 100 if team_total_avg > 0 else 0
-        label = f"{name:>8}"
-        if avg_damage >= 1e13:
-            dmg_str = f"{avg_damage:.2e}"
-        else:
-            dmg_str = f"{avg_damage / 1e9:6.2f}B"
-        print(f"{label}: {dmg_str} AVG DMG ({percent:5.1f}%)")
-
-    if team_total_avg >= 1e13:
-        total_str = f"{team_total_avg:.2e}"
-    else:
-        total_str = f"{team_total_avg / 1e9:6.2f}B"
-
-    print(f"\n🏆 Average Total Team Damage: {total_str}")
-
-    print(f"\n⭐ Best Single Battle: {best_damage:.2e}")
-    print(f"📉 Worst Single Battle: {worst_damage:.2e}")
-    if ely_rounds_survived:
-        avg_survival = sum(ely_rounds_survived) / len(ely_rounds_survived)
-        print(f"\n💀 ELY Deaths: {ely_deaths} out of {len(ely_rounds_survived)}")
-        print(f"📊 ELY Average Round Survived: {avg_survival:.2f}")
+    stats.print_summary()
+    return stats
+
+
+def simulate_seeds(seeds, config=TEAM, workers=None, chunks_per_worker=4):
+    """Run one battle per seed in ``seeds`` (a range) on a process pool and merge the stats."""
+    workers = workers or os.cpu_count() or 1
+    if not seeds:
+        return AverageStats()
+
+    # Several chunks per worker keeps cores busy when battle lengths vary.
+    num_chunks = max(1, min(len(seeds), workers * chunks_per_worker))
+    chunk_size = -(-len(seeds) // num_chunks)
+    chunks = [seeds[start:start + chunk_size] for start in range(0, len(seeds), chunk_size)]
+
+    stats = AverageStats()
+    with ProcessPoolExecutor(max_workers=workers, initializer=_silence_worker) as pool:
+        for partial in pool.map(_run_seeds, chunks, repeat(config)):
+            stats.merge(partial)
+    return stats
+
+
+def run_debugfast_average_parallel(num_simulations=10_000, workers=None, base_seed=None, chunks_per_worker=4):
+    """Split ``num_simulations`` seeded battles across a process pool.
+
+    Battle ``i`` always runs with seed ``base_seed + i``, so the merged summary
+    is identical to :func:`run_debugfast_average` for the same base seed no
+    matter how the seeds are chunked.
+    """
+    if base_seed is None:
+        base_seed = random.randrange(2**32)
+    stats = simulate_seeds(range(base_seed, base_seed + num_simulations), workers=workers,
+                           chunks_per_worker=chunks_per_worker)
+
+    stats.print_summary()
+    return stats
+
+
+def run_debugfast_until(target_width=0.02, hero=None, max_seconds=None, max_simulations=100_000,
+                        min_simulations=30, batch_size=None, workers=None, base_seed=None, confidence=0.95):
+    """Run seeded battles in parallel batches until the estimate is tight enough.
+
+    Stops once the ``confidence`` interval of mean team damage (or of
+    ``hero``'s damage share, e.g. ``"LFA"``) is narrower than ``target_width``
+    times its mean, once ``max_seconds`` have passed, or at
+    ``max_simulations``. Batches are merged in seed order and the check runs
+    after each one, so without a time budget the result depends only on
+    ``base_seed`` and ``batch_size``.
+    """
+    if base_seed is None:
+        base_seed = random.randrange(2**32)
+    workers = workers or os.cpu_count() or 1
+    batch_size = batch_size or max(4, min_simulations // workers)
+    deadline = None if max_seconds is None else time.monotonic() + max_seconds
+
+    def done():
+        if stats.num_simulations >= max_simulations:
+            return True
+        if deadline is not None and time.monotonic() >= deadline:
+            return True
+        return (stats.num_simulations >= min_simulations
+                and stats.relative_width(hero, confidence) <= target_width)
+
+    stats = AverageStats()
+    next_seed = base_seed
+    end_seed = base_seed + max_simulations
+    pending = []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_silence_worker) as pool:
+        while not done():
+            # Keep every worker busy; results are still consumed oldest first.
+            while len(pending) < workers and next_seed < end_seed:
+                batch = range(next_seed, min(next_seed + batch_size, end_seed))
+                pending.append(pool.submit(_run_seeds, batch))
+                next_seed = batch.stop
+            if not pending:
+                break
+            if deadline is not None and not pending[0].done():
+                wait([pending[0]], timeout=max(0.0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+                if not pending[0].done():
+                    continue
+            stats.merge(pending.pop(0).result())
+        for future in pending:
+            future.cancel()
+
+    stats.print_summary()
+    mean, half = stats.interval(hero, confidence)
+    target = f"{hero} share" if hero else "team damage"
+    print(f"\n🎯 {target}: ±{half / mean:.2%} at {confidence:.0%} after {stats.num_simulations} battles"
+          if mean > 0 else f"\n🎯 {target}: no damage after {stats.num_simulations} battles")
+    return stats
 
 
 if __name__ == "__main__":
-    run_debugfast_average()
+    run_debugfast_average_parallel(num_simulations=100)
@@ -1,10 +1,4 @@
-from game_logic import Hero, Boss, Team
-from game_logic.artifacts import Scissors, DB, Mirror, Antlers, dDB, dMirror
-from game_logic.cores import PDECore
-from game_logic.pets import Phoenix
-from game_logic.lifestar import Specter, Nova
-from game_logic.enables import ControlPurify, AttributeReductionPurify, MarkPurify, BalancedStrike, UnbendingWill
-from utils.battle import chunk_logs
+from game_logic.engine import Battle, BattleConfig, HeroSpec, build_battle
 import re, sys, os
 from contextlib import contextmanager
 
@@ -21,74 +15,32 @@ def suppress_stdout():
         sys.stdout.close()
         sys.stdout = original_stdout
 
-purify_mapping = {"CP": ControlPurify(), "ARP": AttributeReductionPurify(), "MP": MarkPurify()}
-trait_mapping = {"BS": BalancedStrike(), "UW": UnbendingWill()}
+TEAM = BattleConfig(heroes=(
+    HeroSpec("hero_MFF_Hero", 1.1e10, 6e7, 3800, "MP", "UW", "ddb", None, 15, 0, 0, 0, 0, 0, 0, 59, 40, 8000),
+    HeroSpec("hero_PDE_Hero", 0.9e10, 6e7, 3300, "MP", "UW", "scissors", None, 15, 0, 0, 0, 0, 0, 0, 59, 40, 8444),
+    HeroSpec("hero_SQH_Hero", 1.2e10, 7e7, 3670, "MP", "UW", "dmirror", "nova", 15, 0, 0, 0, 0, 0, 0, 59, 40, 9000),
+    HeroSpec("hero_LFA_Hero", 2e10, 1.75e8, 3540, "MP", "BS", "antlers", "specter", 15, 20, 150, 150, 130, 450, 90, 0, 16, 8999),
+    HeroSpec("hero_LBRM_Hero", 0.9e10, 5e7, 2000, "MP", "UW", "scissors", None, 14, 0, 0, 0, 0, 0, 0, 59, 46, 8000),
+    HeroSpec("hero_DGN_Hero", 0.76e10, 9e7, 2300, "MP", "UW", "antlers", None, 0, 0, 0, 0, 0, 0, 0, 40, 44, 5299),
+))
 
 def run_debugfast_terminal():
-    global active_core
-    active_core = PDECore()
-
-    data = [
-        ("hero_MFF_Hero", 1.1e10, 6e7, 3800, "MP", "UW", dDB(), 15, 0, 0, 0, 0, 0, 0, 59, 40, 8000),
-        ("hero_PDE_Hero", 0.9e10, 6e7, 3300, "MP", "UW", Scissors(), 15, 0, 0, 0, 0, 0, 0, 59, 40, 8444),
-        ("hero_SQH_Hero", 1.2e10, 7e7, 3670, "MP", "UW", dMirror(), 15, 0, 0, 0, 0, 0, 0, 59, 40, 9000),
-        ("hero_LFA_Hero", 2e10, 1.75e8, 3540, "MP", "BS", Antlers(), 15, 20, 150, 150, 130, 450, 90, 0, 16, 8999),
-        ("hero_LBRM_Hero", 0.9e10, 5e7, 2000, "MP", "UW", Scissors(), 14, 0, 0, 0, 0, 0, 0, 59, 46, 8000),
-        ("hero_DGN_Hero", 0.76e10, 9e7, 2300, "MP", "UW", Antlers(), 0, 0, 0, 0, 0, 0, 0, 40, 44, 5299)
-    ]
-
-    heroes = []
-    for hid, hp, atk, spd, purify, trait, artifact, dt_level, crit_rate, crit_dmg, precision, hd, skill_damage, add, dr, adr, armor in data:
-        lifestar = Specter() if hid == "hero_LFA_Hero" else Nova() if hid == "hero_SQH_Hero" else None
-   #     if hid == "hero_PDE_Hero":
-    #        h.immune_control_effect = "seal_of_light"
-        h = Hero.from_stats(hid, [hp, atk, spd], artifact=artifact, lifestar=lifestar)
-        h.set_enables(purify_mapping.get(purify), trait_mapping.get(trait))
-        h.dt_level = dt_level
-        h.crit_rate += crit_rate; h._base_crit_rate += crit_rate
-        h.crit_dmg += crit_dmg; h._base_crit_dmg += crit_dmg
-        h.precision += precision; h._base_precision += precision
-        h._base_skill_damage += skill_damage
-        h.hd += hd; h._base_hd += hd
-        h.all_damage_dealt += add; h._base_all_damage_dealt += add
-        h.DR += dr; h._base_dr += dr
-        h.ADR += adr; h._base_adr += adr
-        h.armor += armor; h.original_armor += armor
-        h.gk = h.defier = True
-        h.total_damage_dealt = 0
-        h._damage_rounds = []
-        h.recalculate_stats()
-
-        heroes.append(h)
-
-    team = Team(heroes, heroes[:2], heroes[2:], pet=Phoenix())
-    boss = Boss()
-
-    for hero in team.heroes:
-        if hasattr(hero, "start_of_battle"):
-            hero.start_of_battle(team, boss)
+    team, boss = build_battle(TEAM)
+    battle = Battle(team, boss)
+    battle.start()
 
     boss_buff_tracking = []
 
-    for round_num in range(1, 16):
-        if all(not h.is_alive() for h in team.heroes) or not boss.is_alive():
-            break
-
-        for hero in team.heroes:
-            if hero.lifestar and hasattr(hero.lifestar, "start_of_round"):
-                hero.lifestar.start_of_round(hero, team, boss, round_num)
-
+    while not battle.finished:
         if DEBUG_BUFFS:
             for h in team.heroes:
                 print(f"[DEBUG] {h.name} ATK: {h.atk:,} | ADD: {h.all_damage_dealt:.1f}% | HD: {h.hd}")
                 for name, buff in h.buffs.items():
                     print(f"[DEBUG] {h.name} buff {name}: {buff}")
 
-        hero_start_dmg = {h.name: h.total_damage_dealt for h in team.heroes}
         #with suppress_stdout():
-        team.perform_turn(boss, round_num)
-        team.end_of_round(boss, round_num)
-        hero_end_dmg = {h.name: h.total_damage_dealt for h in team.heroes}
+        stats = battle.play_round()
+        round_num = stats.round_num
 
         if round_num == 1:
             header = "         | " + " | ".join(f"{h.name:>8}" for h in team.heroes)
@@ -99,12 +51,12 @@ def run_debugfast_terminal():
         print(f"\n🔁 Round {round_num}")
         print("Energy   | " + " | ".join(f"{h.energy:8}" for h in team.heroes))
         print("DMG (B)  | " + " | ".join(
-    f"{(hero_end_dmg[h.name] - hero_start_dmg[h.name]) / 1e9:8.2f}" for h in team.heroes
+    f"{stats.damage[h.name] / 1e9:8.2f}" for h in team.heroes
 ))
 
 # NEW: Print actual damage amounts in scientific notation if very large
         print("DMG (A)  | " + " | ".join(
-            f"{(hero_end_dmg[h.name] - hero_start_dmg[h.name]):8.2e}" for h in team.heroes
+            f"{stats.damage[h.name]:8.2e}" for h in team.heroes
         ))
 
         
@@ -1,8 +1,8 @@
 # game_logic/artifacts.py
-import random
 from game_logic.buff_handler import BuffHandler
 from utils.log_utils import group_team_buffs
 from utils.log_utils import stylize_log
+from utils.trace import tracer
 
 class Artifact:
     def apply_start_of_battle(self, team, round_num):
@@ -21,10 +21,7 @@ class Scissors(Artifact):
         if hasattr(self, "owner") and self.owner and self.owner.has_seal_of_light:
             return [stylize_log("info", f"{self.owner.name}'s Scissors is sealed by Seal of Light.")]
 
-        for buff_name, buff in boss.buffs.items():
-            if not isinstance(buff, dict):
-                continue
-
+        for buff_name, buff in [(n, b) for n in boss.buffs.named(("atk", "hd")) for b in boss.buffs.stack_copies(n)]:
             attr = buff.get("attribute")
             bonus = buff.get("bonus", 0)
             duration = buff.get("rounds", 1)
@@ -74,10 +71,10 @@ class DB(Artifact):
         if hasattr(team, "heroes"):
             for hero in team.heroes:
                 energy_buff = {"attribute": "energy", "bonus": 20, "rounds": 0}
-                BuffHandler.apply_buff(hero, f"db_energy_{random.randint(1000,9999)}", energy_buff, boss)
+                BuffHandler.apply_buff(hero, "db_energy", energy_buff, boss)
                 buffs_applied.append((hero.name, "+20 Energy (DB)"))
-                if random.random() < 0.5:
-                    BuffHandler.apply_buff(hero, f"db_bonus_energy_{random.randint(1000,9999)}", {
+                if team.rng.stream("artifact", hero.name).random() < 0.5:
+                    BuffHandler.apply_buff(hero, "db_bonus_energy", {
                         "attribute": "energy", "bonus": 10, "rounds": 0
                     }, boss)
                     buffs_applied.append((hero.name, "+10 Bonus Energy (DB)"))
@@ -95,7 +92,7 @@ class dDB(DB):
             for hero in team.heroes:
                 if hero.has_seal_of_light:
                     continue
-                BuffHandler.apply_buff(hero, f"ddb_start_energy_{random.randint(1000,9999)}", {
+                BuffHandler.apply_buff(hero, "ddb_start_energy", {
                     "attribute": "energy", "bonus": 100, "rounds": 0
                 }, boss=None)
                 buffs_applied.append((hero.name, "+100 Starting Energy (dDB)"))
@@ -114,7 +111,7 @@ class dDB(DB):
         if hasattr(team, "heroes"):
             for hero in team.heroes:
                 if hero.energy >= 100:
-                    BuffHandler.apply_buff(hero, f"ddb_speed_boost_{random.randint(1000,9999)}", {
+                    BuffHandler.apply_buff(hero, "ddb_speed_boost", {
                         "attribute": "speed",
                         "bonus": 3,
                         "rounds": 4
@@ -123,7 +120,8 @@ class dDB(DB):
 
         if buffs_applied:
             logs.extend(group_team_buffs(buffs_applied))
-        print(f"[DEBUG-DB] {hero.name} gains energy from DB feed. Energy now: {hero.energy}")
+        if tracer.artifacts:
+            tracer.emit(f"[DEBUG-DB] {hero.name} gains energy from DB feed. Energy now: {hero.energy}")
 
         return logs
 
@@ -184,7 +182,8 @@ class Mirror(Artifact):
 
         if buffs_applied:
             msgs.extend(group_team_buffs(buffs_applied))
-        print(f"[DEBUG-MIRROR] {hero.name} gains +15 energy from Mirror (curse check: {hero.curse_of_decay})")
+        if tracer.artifacts:
+            tracer.emit(f"[DEBUG-MIRROR] {hero.name} gains +15 energy from Mirror (curse check: {hero.curse_of_decay})")
 
         return msgs
 
@@ -275,9 +274,8 @@ class Antlers(Artifact):
         hero.antler_stacks += 1
 
         bonus = 9
-        buff_name = f"antlers_round_{hero.antler_stacks}"
 
-        BuffHandler.apply_buff(hero, buff_name, {
+        BuffHandler.apply_buff(hero, "antlers", {
             "attribute": "all_damage_dealt",
             "bonus": bonus,
             "rounds": 9999,
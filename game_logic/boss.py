@@ -1,12 +1,39 @@
-import random
+from game_logic.buff_book import BuffBook
 from game_logic.buff_handler import BuffHandler
 from game_logic.control_effects import apply_control_effect, clear_control_effect
-from utils.log_utils import debug
-from utils.log_utils import stylize_log
+from game_logic.events import HIT, record
+from game_logic.status import EffectList, StatusView
+from game_logic.rng import GLOBAL_RNG
+from utils.log_utils import BattleLog, LogRecord, stylize_log
+from utils.trace import tracer
 
-class Boss:
-    def __init__(self):
+
+ATK_RAMP = 0.15  # ATK the boss gains at every round end, as a fraction of base ATK
+RAMP_BUFF = "end_of_round_atk_buff"
+
+
+def _format_hits(prefix, hits):
+    return prefix + ", ".join(f"{name} ({damage // 1_000_000}M)" for name, damage in hits)
+
+
+def _format_layers(template, names, totals):
+    return template.format(", ".join(names), ", ".join(str(t) for t in totals))
+
+class Boss(StatusView):
+    __slots__ = (
+        "name", "rng", "log",
+        "hp", "max_hp", "atk", "base_atk", "hd", "base_hd", "dr", "ADR", "armor", "block", "dodge",
+        "speed", "control_immunity", "crit_rate", "crit_dmg", "all_damage_dealt", "damage_output",
+        "energy", "shield", "total_damage_taken",
+        "buffs", "poison_effects", "shrink_debuff", "non_skill_debuffs",
+        "curse_of_decay", "abyssal_corruption", "bleed", "bleed_duration", "undying_shadow",
+        "_round_curse_offsets", "_round_passive_bonuses", "_round_curse_gains", "_round_calamity_gains",
+        "_pending_counterattack", "_pending_counterattack_needed", "_counterattack_sources",
+    )
+
+    def __init__(self, rng=None):
         self.name = "Boss"
+        self.rng = rng if rng is not None else GLOBAL_RNG
         self.max_hp = 20_000_000_000_000_000_000
         self.hp = self.max_hp
         self.atk = 1_000_000_000
@@ -24,12 +51,11 @@ class Boss:
         damage_output = 0
         self.base_hd = 0
         self.total_damage_taken = 0
-        self.attribute_effects = []
         self.energy = 0
-        self.poison_effects = []
+        self.poison_effects = EffectList()
         self.shrink_debuff = None
         self.non_skill_debuffs = []
-        self.buffs = {}
+        self.buffs = BuffBook()
         self.all_damage_dealt = 0
         self.shield = 0
         self.curse_of_decay = 0
@@ -39,36 +65,24 @@ class Boss:
         self._round_curse_gains = []
         self._round_calamity_gains = []
         self._pending_counterattack = []
+        self.log = BattleLog("detailed")
 
 
-    def apply_buff(self, buff_name, buff_data):
-        self.buffs[buff_name] = buff_data
+    def apply_buff(self, buff_name, buff_data, stack=False):
+        if stack:
+            self.buffs.add_stack(buff_name, buff_data)
+        else:
+            self.buffs[buff_name] = buff_data
         self.recalculate_stats()
 
 
     def recalculate_stats(self):
-        self.atk = self.base_atk
-        self.hd = 0
-        self.all_damage_dealt = 0
-        self.damage_output = 0
-
-        atk_percent = 0
-        for buff in self.buffs.values():
-            if not isinstance(buff, dict):
-                continue
-            attr = buff.get("attribute")
-            bonus = buff.get("bonus", 0)
-
-            if attr == "atk":
-                if isinstance(bonus, (float, int)):
-                    atk_percent += bonus  # Treat all as percentage
-            elif attr == "HD":
-                self.hd += bonus
-            elif attr == "all_damage_dealt":
-                self.all_damage_dealt += bonus
-            elif attr == "damage_output":
-                self.damage_output += bonus
+        buffs = self.buffs
+        self.hd = buffs.total("HD")
+        self.all_damage_dealt = buffs.total("all_damage_dealt")
+        self.damage_output = buffs.total("damage_output")
 
+        atk_percent = buffs.total("atk")  # Treat all as percentage
         self.atk = int(self.base_atk * (1 + atk_percent))
         self.atk = max(self.atk, 1)
 
@@ -77,11 +91,12 @@ class Boss:
 
         logs = []
 
-        print(f"[DEBUG] Boss.take_damage → Called with dmg={dmg}")
-        if source_hero:
-            print(f"[DEBUG] Source Hero: {source_hero.name}")
-            print(f"[DEBUG] _using_real_attack: {getattr(source_hero, '_using_real_attack', False)}")
-            print(f"[DEBUG] is_alive: {source_hero.is_alive()}")
+        if tracer.damage:
+            tracer.emit(f"[DEBUG] Boss.take_damage → Called with dmg={dmg}")
+            if source_hero:
+                tracer.emit(f"[DEBUG] Source Hero: {source_hero.name}")
+                tracer.emit(f"[DEBUG] _using_real_attack: {getattr(source_hero, '_using_real_attack', False)}")
+                tracer.emit(f"[DEBUG] is_alive: {source_hero.is_alive()}")
 
         multiplier = 1.0
         if self.shrink_debuff:
@@ -107,13 +122,15 @@ class Boss:
 
         if source_hero and source_hero.is_alive() and getattr(source_hero, '_using_real_attack', False):
             if not hasattr(self, "_counterattack_sources"):
-                self._counterattack_sources = set()
+                self._counterattack_sources = []
 
+            # Kept as an insertion-ordered list so counterattacks resolve in
+            # attack order and seeded battles replay identically.
             if source_hero not in self._counterattack_sources:
-                self._counterattack_sources.add(source_hero)
+                self._counterattack_sources.append(source_hero)
             
-        else:
-            print(f"[DEBUG] ❌ Counterattack NOT triggered.")
+        elif tracer.counterattack:
+            tracer.emit(f"[DEBUG] ❌ Counterattack NOT triggered.")
 
         if source_hero and source_hero.is_alive():
             from game_logic.heroes.base import Hero
@@ -129,10 +146,11 @@ class Boss:
             return []
 
         logs = []
-        print(f"[DEBUG] flush_counterattacks → Sources: {[h.name for h in self._counterattack_sources]}")
+        if tracer.counterattack:
+            tracer.emit(f"[DEBUG] flush_counterattacks → Sources: {[h.name for h in self._counterattack_sources]}")
 
         for attacker in self._counterattack_sources:
-            logs.append(f"🌀 Boss counterattacks due to {attacker.name}'s attack.")
+            logs.append(LogRecord("🌀 Boss counterattacks due to {}'s attack.", attacker.name))
             damage_lines = []
             curse_heroes = []
             curse_totals = []
@@ -140,29 +158,34 @@ class Boss:
             calamity_totals = []
             heroes_to_add_calamity = []
 
-            print(f"[DEBUG] Counterattack from {attacker.name} begins.")
+            if tracer.counterattack:
+                tracer.emit(f"[DEBUG] Counterattack from {attacker.name} begins.")
 
+            factors = self.damage_factors()
             for hero in heroes:
                 if not hero.is_alive():
                     continue
 
                 counter_damage = int(self.atk * 15)
-                print(f"[DEBUG] → Hitting {hero.name} with raw {counter_damage} damage")
+                if tracer.counterattack:
+                    tracer.emit(f"[DEBUG] → Hitting {hero.name} with raw {counter_damage} damage")
 
-                final_damage = self.calculate_damage_to_hero(hero, counter_damage)
-                print(f"[DEBUG] → {hero.name} took {final_damage} (after reductions), HP now {hero.hp}")
-                damage_lines.append(f"{hero.name} ({final_damage // 1_000_000}M)")
+                final_damage = self.land_hit(hero, self.mitigate(hero, counter_damage, factors))
+                if tracer.counterattack:
+                    tracer.emit(f"[DEBUG] → {hero.name} took {final_damage} (after reductions), HP now {hero.hp}")
+                damage_lines.append((hero.name, final_damage))
 
                 if hero.is_alive():
                     heroes_to_add_calamity.append(hero)
 
             if damage_lines:
-                logs.append(f"⏱️ Boss counterattack→ {', '.join(damage_lines)}")
+                logs.append(LogRecord(_format_hits, "⏱️ Boss counterattack→ ", damage_lines))
 
             for hero in heroes_to_add_calamity:
                 prev_calamity = hero.calamity
                 hero.calamity += 1
-                print(f"[DEBUG] {hero.name} Calamity: {prev_calamity} → {hero.calamity} (from {attacker.name})")
+                if tracer.counterattack:
+                    tracer.emit(f"[DEBUG] {hero.name} Calamity: {prev_calamity} → {hero.calamity} (from {attacker.name})")
 
                 # Trigger control at 5 layers
                 if prev_calamity < 5 and hero.calamity >= 5:
@@ -178,65 +201,78 @@ class Boss:
                             boss=self, team=hero.team if hasattr(hero, "team") else None
                         )
                         logs.extend(control_logs)
-                        print(f"[DEBUG] {hero.name} afflicted with: {applied_effects}")
+                        if tracer.counterattack:
+                            tracer.emit(f"[DEBUG] {hero.name} afflicted with: {applied_effects}")
                     else:
                         logs.append(f"❌ {hero.name} is immune to all control effects — no control applied.")
 
                     hero.calamity = 0
-                    print(f"[DEBUG] {hero.name} Calamity reset to 0 after triggering effects.")
+                    if tracer.counterattack:
+                        tracer.emit(f"[DEBUG] {hero.name} Calamity reset to 0 after triggering effects.")
 
                     if hasattr(hero, "handle_self_control_removal"):
                         for effect in ["fear", "silence", "seal_of_light"]:
                             logs += hero.handle_self_control_removal(effect, self, hero.team)
 
                 calamity_heroes.append(hero.name)
-                calamity_totals.append(str(hero.calamity))
+                calamity_totals.append(hero.calamity)
 
-                if random.random() < 0.5:
+                if self.rng.stream("curse").random() < 0.5:
                     hero.curse_of_decay += 1
-                    print(f"[DEBUG] {hero.name} Curse +1 from {attacker.name}, now {hero.curse_of_decay}")
+                    if tracer.counterattack:
+                        tracer.emit(f"[DEBUG] {hero.name} Curse +1 from {attacker.name}, now {hero.curse_of_decay}")
                     curse_heroes.append(hero.name)
-                    curse_totals.append(str(hero.curse_of_decay))
+                    curse_totals.append(hero.curse_of_decay)
 
             if curse_heroes:
-                logs.append(f"💀 {', '.join(curse_heroes)} gained 1 layer of Curse (Totals: {', '.join(curse_totals)})")
+                logs.append(LogRecord(_format_layers, "💀 {} gained 1 layer of Curse (Totals: {})", curse_heroes, curse_totals))
             if calamity_heroes:
-                logs.append(f"☠️ {', '.join(calamity_heroes)} gained 1 layer of Calamity (Totals: {', '.join(calamity_totals)})")
+                logs.append(LogRecord(_format_layers, "☠️ {} gained 1 layer of Calamity (Totals: {})", calamity_heroes, calamity_totals))
 
-        print(f"[DEBUG] flush_counterattacks complete → {len(self._counterattack_sources)} sources, total hits: {len(heroes) * len(self._counterattack_sources)}")
+        if tracer.counterattack:
+            tracer.emit(f"[DEBUG] flush_counterattacks complete → {len(self._counterattack_sources)} sources, total hits: {len(heroes) * len(self._counterattack_sources)}")
         self._pending_counterattack_needed = False
-        self._counterattack_sources = set()
+        self._counterattack_sources = []
         return logs
 
 
 
     def apply_curse_of_decay_damage(self, hero, cod_logs):
         base_damage = int(self.atk * 30)
-        damage = self.calculate_damage_to_hero(hero, base_damage, bypass_add_hd=True, bypass_shields=True)
+        damage = self.calculate_damage_to_hero(hero, base_damage, bypass_add_hd=True, bypass_shields=True, is_attack=False)
         cod_logs.append(f"{hero.name} takes {damage // 1_000_000}M from Curse of Decay.")
+        return damage
 
 
-    def calculate_damage_to_hero(self, hero, base_damage, bypass_add_hd=False, bypass_shields=False):
-        if not hero.is_alive():
-            return 0
-        damage = base_damage
+    def damage_factors(self, bypass_add_hd=False):
+        """Boss-side multipliers of one action, in the order they apply: Shrink, ADD, HD, damage output.
 
+        They only change when the boss's own buffs do. Calamity can Fear or Seal
+        a hero mid-action and buff the boss, so take them again after that.
+        """
+        factors = []
         # ✅ Apply Shrink Debuff
         if self.shrink_debuff:
-            damage *= self.shrink_debuff.get("multiplier_dealt", 1)
+            factors.append(self.shrink_debuff.get("multiplier_dealt", 1))
 
         # ✅ Skip ADD and HD for Curse of Decay
         if not bypass_add_hd:
             effective_add = max(-0.99, self.all_damage_dealt / 100)
-            damage *= (1 + effective_add)
+            factors.append(1 + effective_add)
 
             effective_holy = max(0, self.hd * 0.007)
-            damage *= (1 + effective_holy)
-
+            factors.append(1 + effective_holy)
 
         # ✅ Apply Damage Output Debuff (from e.g., LBRM transition)
         effective_output = max(-0.99, getattr(self, "damage_output", 0) / 100)
-        damage *= (1 + effective_output)
+        factors.append(1 + effective_output)
+        return factors
+
+    def mitigate(self, hero, base_damage, factors=None, bypass_add_hd=False):
+        """Damage one hit of ``base_damage`` does to ``hero`` before shields and Unbending Will."""
+        damage = base_damage
+        for factor in factors if factors is not None else self.damage_factors(bypass_add_hd):
+            damage *= factor
 
         # ✅ Armor Reduction
         armor = hero.armor
@@ -263,8 +299,10 @@ class Boss:
             reduction = min(hero.dt_level * 0.05 + 0.05, 0.80)
             damage = int(damage * (1 - reduction))
 
-        damage = max(0, int(damage))
+        return max(0, int(damage))
 
+    def land_hit(self, hero, damage, bypass_shields=False, is_attack=True):
+        """Apply one mitigated hit to ``hero``: shield, Unbending Will, then HP. Returns the HP lost."""
         # ✅ Shield Absorption
         if hero.shield > 0 and not bypass_shields:
             absorbed = min(hero.shield, damage)
@@ -282,24 +320,46 @@ class Boss:
         hero.hp = max(hero.hp, 0)
 
         hero._last_damage_received = damage
-
+        if is_attack:
+            record(getattr(hero, "team", None), HIT, self, hero, damage)
 
         return damage
 
+    def calculate_damage_to_hero(self, hero, base_damage, bypass_add_hd=False, bypass_shields=False, is_attack=True):
+        if not hero.is_alive():
+            return 0
+        damage = self.mitigate(hero, base_damage, bypass_add_hd=bypass_add_hd)
+        return self.land_hit(hero, damage, bypass_shields, is_attack)
+
+    def deal_hits(self, hero, base_damage, hits, factors=None):
+        """Hit ``hero`` ``hits`` times for ``base_damage`` each and return the HP lost per hit.
+
+        Mitigation is worked out once; the hits then go through shield and
+        Unbending Will one after another. Hits after the hero falls deal 0.
+        """
+        if not hero.is_alive():
+            return [0] * hits
+        damage = self.mitigate(hero, base_damage, factors)
+        results = []
+        for _ in range(hits):
+            results.append(self.land_hit(hero, damage) if hero.is_alive() else 0)
+        return results
+
     def boss_deal_damage_to_hero(self, hero, base_damage):
         return self.calculate_damage_to_hero(hero, base_damage)
 
     def add_calamity_with_tracking(self, hero, amount, logs, boss=None, team=None):
-        from logging import debug
         from game_logic.control_effects import apply_control_effect
 
         previous = hero.calamity
         hero.calamity += amount
-        debug(f"[DEBUG] {hero.name} Calamity: {previous} → {hero.calamity} (added {amount})")
+        if tracer.calamity:
+            tracer.emit(f"[DEBUG] {hero.name} Calamity: {previous} → {hero.calamity} (added {amount})")
         self._round_calamity_gains.append(f"{hero.name} +{amount} (Total: {hero.calamity})")
 
         if previous < 5 and hero.calamity >= 5:
-            debug(f"[DEBUG] {hero.name} triggered Calamity threshold (>=5)")
+            if tracer.calamity:
+                tracer.emit(f"[DEBUG] {hero.name} triggered Calamity threshold (>=5)")
 
             if not team and hasattr(hero, "team"):
                 team = hero.team
@@ -310,8 +370,9 @@ class Boss:
                 effect for effect in ["silence", "fear", "seal_of_light"]
                 if hero.immune_control_effect != effect
             ]
-            debug(f"[DEBUG] {hero.name} is immune to: {hero.immune_control_effect}")
-            debug(f"[DEBUG] {hero.name} eligible control effects: {effects_to_apply}")
+            if tracer.calamity:
+                tracer.emit(f"[DEBUG] {hero.name} is immune to: {hero.immune_control_effect}")
+                tracer.emit(f"[DEBUG] {hero.name} eligible control effects: {effects_to_apply}")
 
             # Apply control effects with -100 ctrl immunity bypass
             if effects_to_apply:
@@ -319,12 +380,14 @@ class Boss:
                     hero, effects_to_apply, boss=boss, team=team
                 )
                 logs.extend(control_logs)
-                debug(f"[DEBUG] {hero.name} afflicted with: {applied}")
+                if tracer.calamity:
+                    tracer.emit(f"[DEBUG] {hero.name} afflicted with: {applied}")
             else:
                 logs.append(f"❌ {hero.name} is immune to all control effects — no control applied.")
 
             hero.calamity = 0
-            debug(f"[DEBUG] {hero.name} Calamity reset to 0 after triggering effects.")
+            if tracer.calamity:
+                tracer.emit(f"[DEBUG] {hero.name} Calamity reset to 0 after triggering effects.")
 
             if hasattr(hero, "handle_self_control_removal"):
                 for effect in ["fear", "silence", "seal_of_light"]:
@@ -362,8 +425,8 @@ class Boss:
             dodge_chance = mystical_chance + getattr(hero, "dodge", 0) / 100
             dodge_chance = min(dodge_chance, 1.0)
 
-            if random.random() < dodge_chance:
-                logs.append(f"🌀 {hero.name} dodges the boss active skill!")
+            if self.rng.stream("dodge", hero.name).random() < dodge_chance:
+                logs.append(LogRecord("🌀 {} dodges the boss active skill!", hero.name))
                 if mystical_chance > 0:
                     veil = hero.buffs["mystical_veil"]
                     veil["layers"] -= 1
@@ -372,10 +435,8 @@ class Boss:
                 continue  # ❌ Skip damage and all effects if dodged
 
             # ✅ Skill hits
-            total_damage = 0
-            for _ in range(3):
-                total_damage += self.boss_deal_damage_to_hero(hero, int(self.atk * 30))
-            damage_lines.append(f"{hero.name} ({total_damage // 1_000_000}M)")
+            total_damage = sum(self.deal_hits(hero, int(self.atk * 30), 3))
+            damage_lines.append((hero.name, total_damage))
 
             # Apply debuffs
             hero.apply_buff("armor_down", {"attribute": "armor", "bonus": -1.0, "rounds": 3, "is_percent": True})
@@ -384,19 +445,19 @@ class Boss:
             # Apply Curse
             hero.curse_of_decay += 2
             curse_names.append(hero.name)
-            curse_totals.append(str(hero.curse_of_decay))
+            curse_totals.append(hero.curse_of_decay)
 
             # Apply Calamity
             self.add_calamity_with_tracking(hero, 2, logs, boss=self)
             calamity_names.append(hero.name)
-            calamity_totals.append(str(hero.calamity))
+            calamity_totals.append(hero.calamity)
 
         if curse_names:
-            logs.append(f"💀 {', '.join(curse_names)} gained 2 layers of Curse (Totals: {', '.join(curse_totals)})")
+            logs.append(LogRecord(_format_layers, "💀 {} gained 2 layers of Curse (Totals: {})", curse_names, curse_totals))
         if calamity_names:
-            logs.append(f"☠️ {', '.join(calamity_names)} gained 2 layers of Calamity (Totals: {', '.join(calamity_totals)})")
+            logs.append(LogRecord(_format_layers, "☠️ {} gained 2 layers of Calamity (Totals: {})", calamity_names, calamity_totals))
         if damage_lines:
-            logs.append(f"💥 Boss active hits→ {', '.join(damage_lines)}")
+            logs.append(LogRecord(_format_hits, "💥 Boss active hits→ ", damage_lines))
         return logs
     
     def basic_attack(self, heroes, round_num):
@@ -414,8 +475,8 @@ class Boss:
             dodge_chance = mystical_chance + getattr(hero, "dodge", 0) / 100
             dodge_chance = min(dodge_chance, 1.0)
 
-            if random.random() < dodge_chance:
-                logs.append(f"🌀 {hero.name} dodges the boss basic attack!")
+            if self.rng.stream("dodge", hero.name).random() < dodge_chance:
+                logs.append(LogRecord("🌀 {} dodges the boss basic attack!", hero.name))
                 if mystical_chance > 0:
                     veil = hero.buffs["mystical_veil"]
                     veil["layers"] -= 1
@@ -424,40 +485,32 @@ class Boss:
                 continue  # ❌ Skip damage and all effects if dodged
 
             # ✅ Skill hits
-            total_damage = 0
-            for _ in range(3):
-                total_damage += self.boss_deal_damage_to_hero(hero, int(self.atk * 20))
-            damage_lines.append(f"{hero.name} ({total_damage // 1_000_000}M)")
+            total_damage = sum(self.deal_hits(hero, int(self.atk * 20), 3))
+            damage_lines.append((hero.name, total_damage))
 
             # Apply debuff
             hero.apply_buff("crit_down", {"attribute": "crit_rate", "bonus": -20, "rounds": 3})
 
             # Apply Calamity
             self.add_calamity_with_tracking(hero, 1, logs, boss=self)
-            if random.random() < 0.75:
+            if self.rng.stream("calamity").random() < 0.75:
                 self.add_calamity_with_tracking(hero, 1, logs, boss=self)
 
             calamity_names.append(hero.name)
-            calamity_totals.append(str(hero.calamity))
+            calamity_totals.append(hero.calamity)
 
         if calamity_names:
-            logs.append(f"☠️ {', '.join(calamity_names)} gained Calamity (Totals: {', '.join(calamity_totals)})")
+            logs.append(LogRecord(_format_layers, "☠️ {} gained Calamity (Totals: {})", calamity_names, calamity_totals))
 
         if damage_lines:
-            logs.append(f"💥 Boss basic hits→ {', '.join(damage_lines)}")
+            logs.append(LogRecord(_format_hits, "💥 Boss basic hits→ ", damage_lines))
         return logs
 
 
 
     
     def process_buffs(self):
-        expired = []
-        for buff in list(self.buffs.keys()):
-            self.buffs[buff]["rounds"] -= 1
-            if self.buffs[buff]["rounds"] <= 0:
-                expired.append(buff)
-        for buff_name in expired:
-            buff = self.buffs[buff_name]
+        for buff_name, buff in self.buffs.tick():
             attr = buff.get("attribute")
             bonus = buff.get("bonus", 0)
             if attr == "HD":
@@ -466,24 +519,40 @@ class Boss:
                 self.all_damage_dealt -= bonus
             elif attr == "atk":
                 self.atk -= bonus
-            del self.buffs[buff_name]
         self.recalculate_stats()
 
 
+    def ramp_atk(self):
+        """Add one stack of the end-of-round ATK ramp.
+
+        The ramp is a single buff counting its stacks, with a bonus of
+        ``ATK_RAMP * stacks``. Effects that strip boss ATK buffs remove it and
+        the count starts over.
+        """
+        ramp = self.buffs.get(RAMP_BUFF)
+        if ramp is None:
+            self.buffs[RAMP_BUFF] = {"attribute": "atk", "bonus": ATK_RAMP, "rounds": 9999, "stacks": 1}
+        else:
+            ramp["stacks"] += 1
+            self.buffs.add_bonus(RAMP_BUFF, ATK_RAMP * ramp["stacks"] - ramp["bonus"])
+
     def on_hero_controlled(self, hero, effect):
         if effect == "fear":
-            BuffHandler.apply_buff(self, f"hd_from_fear_{random.randint(0, 999999)}", {
+            BuffHandler.apply_buff(self, "hd_from_fear", {
                 "attribute": "HD", "bonus": 50, "rounds": 15
             })
-            debug(f"[DEBUG] Boss gains +50% HD from {hero.name}'s Fear")
+            if tracer.control_effects:
+                tracer.emit(f"[DEBUG] Boss gains +50% HD from {hero.name}'s Fear")
         elif effect == "silence":
             self.energy += 50
-            debug(f"[DEBUG] Boss gains +50 energy from {hero.name}'s Silence")
+            if tracer.control_effects:
+                tracer.emit(f"[DEBUG] Boss gains +50 energy from {hero.name}'s Silence")
         elif effect == "seal_of_light":
-            BuffHandler.apply_buff(self, f"add_from_seal_{random.randint(0, 999999)}", {
+            BuffHandler.apply_buff(self, "add_from_seal", {
                 "attribute": "all_damage_dealt", "bonus": 15, "rounds": 15
             })
-            debug(f"[DEBUG] Boss gains +15% All Damage Dealt from {hero.name}'s Seal of Light")
+            if tracer.control_effects:
+                tracer.emit(f"[DEBUG] Boss gains +15% All Damage Dealt from {hero.name}'s Seal of Light")
 
 
     def process_poison(self):
@@ -514,11 +583,11 @@ class Boss:
                 self.shrink_debuff = None
                 logs.append("🌀 Shrink expired.")
 
-        # Remove 1 random attribute reduction debuff using BuffHandler
-        debuffs = [k for k, v in self.buffs.items() if BuffHandler.is_attribute_reduction(v)]
+        # Remove 1 random attribute reduction debuff (one stack of a family) using BuffHandler
+        debuffs = self.buffs.each_stack(self.buffs.named(BuffHandler.ATTRIBUTE_REDUCTION_KEYS))
         if debuffs:
-            to_remove = random.choice(debuffs)
-            del self.buffs[to_remove]
+            to_remove, stack = self.rng.stream("boss").choice(debuffs)
+            self.buffs.remove_stack(to_remove, stack)
             logs.append(f"🧹 Boss removes debuff: {to_remove}")
             self.recalculate_stats()
 
@@ -531,26 +600,16 @@ class Boss:
             hero_high.curse_of_decay += 3
             logs.append(f"🌀 Drains {hero_high.name}: -100 energy, -40% ATK, +3 Curse")
 
-        BuffHandler.apply_buff(self, "end_of_round_atk_buff", {
-            "attribute": "atk", "bonus": 0.15, "rounds": 9999
-        })
-        self.attribute_effects.append({
-            "attribute": "atk",
-            "value": 0.15,
-            "rounds": 9999,
-            "name": "ATK buff"
-        })
+        self.ramp_atk()
         logs.append(f"📈 Boss gains +15% ATK")
 
         for hero in alive_heroes:
             if hero.calamity > 0:
-                attr_buffs = [
-                    k for k, v in hero.buffs.items()
-                    if isinstance(v, dict) and v.get("attribute") in BuffHandler.ATTRIBUTE_BUFF_KEYS
-                ]
+                attr_buffs = hero.buffs.each_stack(hero.buffs.named(BuffHandler.ATTRIBUTE_BUFF_KEYS))
                 if attr_buffs:
-                    chosen_attr = random.choice(attr_buffs)
-                    removed_keys = [k for k, v in hero.buffs.items() if isinstance(v, dict) and v.get("attribute") == chosen_attr]
+                    chosen_attr, _ = self.rng.stream("boss").choice(attr_buffs)
+                    removed_keys = hero.buffs.named(chosen_attr)
+                    removed_stacks = sum(map(hero.buffs.stacks, removed_keys))
                     for key in removed_keys:
                         # Revert stat before removing buff
                         buff = hero.buffs[key]
@@ -592,7 +651,7 @@ class Boss:
 
                         del hero.buffs[key]
 
-                    logs.append(f"🧹 Boss removes all '{chosen_attr}' buffs from {hero.name} ({len(removed_keys)} stack{'s' if len(removed_keys)!=1 else ''})")
+                    logs.append(f"🧹 Boss removes all '{chosen_attr}' buffs from {hero.name} ({removed_stacks} stack{'s' if removed_stacks != 1 else ''})")
 
 
         for hero in alive_heroes:
@@ -0,0 +1,423 @@
+# game_logic/buff_book.py
+"""Buff containers with attribute indexes.
+
+``hero.buffs`` and ``boss.buffs`` are BuffBooks: ordinary ``{name: buff}``
+dicts that also keep, for every ``attribute``, the names carrying it and a
+cached sum of their ``bonus``, plus the names with a negative bonus. Stat
+recalculation reads the sums instead of walking every buff, and effects that
+work on "all ATK buffs" or "every debuff" look up the index.
+
+Durations run on a round clock. A buff's ``rounds`` is its length when it was
+stored; :meth:`BuffBook.tick` advances the clock and removes only the buffs
+whose time is up, found in a wheel keyed by due round. Buffs of PERMANENT
+rounds or more are never scheduled. Use :meth:`BuffBook.remaining` (or
+:meth:`BuffBook.copy_of`) for the rounds left now.
+
+A name can also hold a family of stacks (:meth:`BuffBook.add_stack`): one
+entry whose numeric fields (``bonus``, ``heal_amount``, ...) are sums over its
+stacks, while every stack keeps its own expiry. When stacks run out,
+``tick`` hands back each stack's own buff. Effects that take or copy "one
+buff" act on one stack (:meth:`BuffBook.remove_stack`,
+:meth:`BuffBook.stack_copies`); ``del`` and ``pop`` drop the whole family.
+
+Buffs are still plain dicts. The ``attribute`` and ``rounds`` of a stored buff
+must not be changed in place, and ``bonus`` changes go through
+:meth:`BuffBook.add_bonus` so the cached sums stay right.
+"""
+from itertools import count
+from math import ceil
+
+PERMANENT = 9999  # rounds at or above this never count down
+
+
+def _attribute(buff):
+    return buff.get("attribute") if isinstance(buff, dict) else None
+
+
+def _is_negative(buff):
+    bonus = buff.get("bonus", 0) if isinstance(buff, dict) else 0
+    return isinstance(bonus, (int, float)) and bonus < 0
+
+
+def _due(started, rounds):
+    """Round on which a buff stored at ``started`` runs out, or None if it never does."""
+    if rounds is None or rounds >= PERMANENT:
+        return None
+    # Counting down from ``rounds`` by one per tick, the buff is gone once it reaches 0.
+    return started + max(1, ceil(rounds))
+
+
+def _restore(items, clock, timers, families=None):
+    book = BuffBook()
+    book.clock = clock
+    families = families or {}
+    for name, buff in items.items():
+        if name in families:
+            for started, rounds, stack in families[name]:
+                book._stack(name, stack, started, rounds)
+            continue
+        book[name] = buff
+        if name in timers:
+            book._schedule(name, *timers[name])
+    return book
+
+
+class BuffBook(dict):
+    __slots__ = ("_by_attr", "_totals", "_negative", "_order", "_seq", "clock", "_timers", "_wheel",
+                 "_families")
+
+    def __init__(self, *args, **kwargs):
+        super().__init__()
+        self._by_attr = {}    # attribute -> {name: None}, insertion ordered
+        self._totals = {}     # attribute -> cached sum of bonuses
+        self._negative = {}   # names whose bonus is below zero
+        self._order = {}      # name -> insertion number (kept when a name is replaced)
+        self._seq = count()
+        self.clock = 0        # rounds ticked so far
+        self._timers = {}     # name -> (clock when stored, rounds)
+        self._wheel = {}      # due round -> {name: None}
+        self._families = {}   # name -> [stack count, {due round or None: [(started, rounds, buff)]}]
+        self.update(*args, **kwargs)
+
+    def __reduce__(self):
+        families = {name: [stack for stacks in family[1].values() for stack in stacks]
+                    for name, family in self._families.items()}
+        for stacks in families.values():
+            stacks.sort(key=lambda stack: stack[0])
+        return _restore, (dict(self), self.clock, dict(self._timers), families)
+
+    # -- dict mutation ----------------------------------------------------
+
+    def __setitem__(self, name, buff):
+        if name in self:
+            old = dict.__getitem__(self, name)
+            if _attribute(old) == _attribute(buff):
+                # Same attribute: keep the name's place in the index, like the dict does.
+                dict.__setitem__(self, name, buff)
+                self._totals.pop(_attribute(buff), None)
+                self._negative.pop(name, None)
+                if _is_negative(buff):
+                    self._negative[name] = None
+                self._start(name, buff)
+                return
+            self._unindex(name, old)
+            dict.__setitem__(self, name, buff)
+            self._index(name, buff)
+            attr = _attribute(buff)
+            if attr is not None:
+                # The name keeps its old place in the dict, so it does in the index too.
+                names = self._by_attr[attr]
+                self._by_attr[attr] = dict.fromkeys(sorted(names, key=self._order.__getitem__))
+            self._start(name, buff)
+            return
+        self._order[name] = next(self._seq)
+        dict.__setitem__(self, name, buff)
+        self._index(name, buff)
+        self._start(name, buff)
+
+    def __delitem__(self, name):
+        buff = dict.__getitem__(self, name)
+        dict.__delitem__(self, name)
+        self._unindex(name, buff)
+        self._unschedule(name)
+        del self._order[name]
+
+    _missing = object()
+
+    def pop(self, name, default=_missing):
+        if name in self:
+            buff = dict.__getitem__(self, name)
+            del self[name]
+            return buff
+        if default is BuffBook._missing:
+            raise KeyError(name)
+        return default
+
+    def popitem(self):
+        name = next(reversed(self))
+        return name, self.pop(name)
+
+    def setdefault(self, name, default=None):
+        if name not in self:
+            self[name] = default
+        return dict.__getitem__(self, name)
+
+    def update(self, *args, **kwargs):
+        for name, buff in dict(*args, **kwargs).items():
+            self[name] = buff
+
+    def clear(self):
+        dict.clear(self)
+        self._by_attr.clear()
+        self._totals.clear()
+        self._negative.clear()
+        self._order.clear()
+        self._timers.clear()
+        self._wheel.clear()
+        self._families.clear()
+
+    def _index(self, name, buff):
+        if not isinstance(buff, dict):
+            return
+        attr = buff.get("attribute")
+        if attr is not None:
+            names = self._by_attr.get(attr)
+            if names is None:
+                self._by_attr[attr] = {name: None}
+            else:
+                names[name] = None
+            self._totals.pop(attr, None)
+        bonus = buff.get("bonus", 0)
+        if isinstance(bonus, (int, float)) and bonus < 0:
+            self._negative[name] = None
+
+    def _unindex(self, name, buff):
+        if not isinstance(buff, dict):
+            return
+        attr = buff.get("attribute")
+        if attr is not None:
+            names = self._by_attr[attr]
+            del names[name]
+            if not names:
+                del self._by_attr[attr]
+            self._totals.pop(attr, None)
+        if self._negative:
+            self._negative.pop(name, None)
+
+    def _start(self, name, buff):
+        rounds = buff.get("rounds") if isinstance(buff, dict) else None
+        if rounds is None:
+            self._unschedule(name)
+        else:
+            self._schedule(name, self.clock, rounds)
+
+    def _schedule(self, name, started, rounds):
+        self._unschedule(name)
+        self._timers[name] = (started, rounds)
+        self._put(name, _due(started, rounds))
+
+    def _put(self, name, due):
+        if due is not None:
+            slot = self._wheel.get(due)
+            if slot is None:
+                self._wheel[due] = {name: None}
+            else:
+                slot[name] = None
+
+    def _take(self, name, due):
+        if due is not None:
+            slot = self._wheel[due]
+            del slot[name]
+            if not slot:
+                del self._wheel[due]
+
+    def _unschedule(self, name):
+        timer = self._timers.pop(name, None)
+        family = self._families.pop(name, None)
+        if family is not None:
+            for due in family[1]:
+                self._take(name, due)
+        elif timer is not None:
+            self._take(name, _due(*timer))
+
+    # -- stacks -----------------------------------------------------------
+
+    def add_stack(self, name, buff):
+        """Add ``buff`` as one more stack of ``name``.
+
+        Stacks share one entry holding the sum of their numeric fields, and each
+        runs out on its own. A missing name, or one holding a different
+        attribute, is simply set to ``buff``.
+        """
+        self._stack(name, buff, self.clock, buff.get("rounds"))
+
+    def _stack(self, name, buff, started, rounds):
+        if name not in self or _attribute(dict.__getitem__(self, name)) != _attribute(buff):
+            self[name] = buff
+            if name in self._timers:
+                self._schedule(name, started, rounds)
+            return
+        family = self._families.get(name)
+        if family is None:
+            # The stored buff becomes the first stack; the entry turns into the book's own sum.
+            first = dict.__getitem__(self, name)
+            timer = self._timers.get(name)
+            self._unschedule(name)
+            family = self._families[name] = [0, {}]
+            self._push(name, family, first, *(timer or (self.clock, None)))
+            dict.__setitem__(self, name, dict(first))
+        self._push(name, family, buff, started, rounds)
+        self._fold(name, buff, 1)
+
+    def _fold(self, name, buff, sign):
+        entry = dict.__getitem__(self, name)
+        for key, value in buff.items():
+            if key == "rounds" or isinstance(value, bool) or not isinstance(value, (int, float)):
+                continue
+            if key == "bonus":
+                self.add_bonus(name, sign * value)
+            else:
+                entry[key] = entry.get(key, 0) + sign * value
+
+    def _push(self, name, family, buff, started, rounds):
+        due = _due(started, rounds)
+        stacks = family[1].get(due)
+        if stacks is None:
+            family[1][due] = [(started, rounds, buff)]
+            self._put(name, due)
+        else:
+            stacks.append((started, rounds, buff))
+        family[0] += 1
+        self._extend_timer(name, started, rounds)
+
+    def _extend_timer(self, name, started, rounds):
+        # The entry lasts as long as its longest stack.
+        if rounds is None:
+            return
+        timer = self._timers.get(name)
+        last = timer and _due(*timer)
+        due = _due(started, rounds)
+        if timer is None or (last is not None and (due is None or due >= last)):
+            self._timers[name] = (started, rounds)
+
+    def stacks(self, name):
+        """Number of stacks under ``name`` (1 for an ordinary buff, 0 if absent)."""
+        family = self._families.get(name)
+        if family is not None:
+            return family[0]
+        return 1 if name in self else 0
+
+    def each_stack(self, names):
+        """``(name, index)`` for every stack of ``names``: pick from it to act on one stack."""
+        return [(name, index) for name in names for index in range(self.stacks(name))]
+
+    def _stack_list(self, name):
+        stacks = [(due, stack) for due, group in self._families[name][1].items() for stack in group]
+        stacks.sort(key=lambda item: item[1][0])
+        return stacks
+
+    def _stack_copy(self, started, rounds, buff):
+        copy = dict(buff)
+        if rounds is not None:
+            copy["rounds"] = rounds - (self.clock - started)
+        return copy
+
+    def stack_copies(self, name):
+        """Copies of each stack of ``name``, oldest first, whose ``rounds`` is the time it has left."""
+        if name not in self._families:
+            return [self.copy_of(name)]
+        return [self._stack_copy(*stack) for _, stack in self._stack_list(name)]
+
+    def remove_stack(self, name, index=0):
+        """Remove one stack of ``name`` (``index`` in :meth:`stack_copies` order) and return its copy.
+
+        The entry goes with its last stack; an ordinary buff is removed whole.
+        """
+        family = self._families.get(name)
+        if family is None or family[0] == 1:
+            copy = self.stack_copies(name)[index]
+            del self[name]
+            return copy
+        due, stack = self._stack_list(name)[index]
+        group = family[1][due]
+        group.pop(next(i for i, other in enumerate(group) if other is stack))
+        if not group:
+            del family[1][due]
+            self._take(name, due)
+        family[0] -= 1
+        self._fold(name, stack[2], -1)
+
+        self._timers.pop(name, None)
+        for _, (started, rounds, _) in self._stack_list(name):
+            self._extend_timer(name, started, rounds)
+        return self._stack_copy(*stack)
+
+    # -- rounds -----------------------------------------------------------
+
+    def tick(self):
+        """End a round: advance the clock and remove the buffs that ran out.
+
+        Returns the removed ``(name, buff)`` pairs in insertion order, one pair
+        per stack for a family.
+        """
+        self.clock += 1
+        due = self._wheel.pop(self.clock, None)
+        if not due:
+            return []
+        expired = []
+        for name in sorted(due, key=self._order.__getitem__):
+            family = self._families.get(name)
+            if family is not None:
+                stacks = family[1].pop(self.clock)
+                family[0] -= len(stacks)
+                expired.extend((name, buff) for _, _, buff in stacks)
+                if family[0]:
+                    for _, _, buff in stacks:
+                        self._fold(name, buff, -1)
+                    continue
+                del self._families[name]
+            self._timers.pop(name)
+            buff = dict.__getitem__(self, name)
+            dict.__delitem__(self, name)
+            self._unindex(name, buff)
+            del self._order[name]
+            if family is None:
+                expired.append((name, buff))
+        return expired
+
+    def remaining(self, name, default=None):
+        """Rounds left on buff ``name`` (its stored ``rounds`` minus the rounds ticked since)."""
+        timer = self._timers.get(name)
+        if timer is None:
+            buff = dict.get(self, name)
+            return buff.get("rounds", default) if isinstance(buff, dict) else default
+        return timer[1] - (self.clock - timer[0])
+
+    def copy_of(self, name):
+        """A copy of buff ``name`` whose ``rounds`` is the time it has left."""
+        buff = dict(dict.__getitem__(self, name))
+        if name in self._timers:
+            buff["rounds"] = self.remaining(name)
+        return buff
+
+    # -- queries ----------------------------------------------------------
+
+    def add_bonus(self, name, delta):
+        """Change a stored buff's ``bonus`` by ``delta`` and keep the indexes in step."""
+        buff = dict.__getitem__(self, name)
+        buff["bonus"] = buff.get("bonus", 0) + delta
+        self._totals.pop(_attribute(buff), None)
+        if _is_negative(buff):
+            self._negative[name] = None
+        else:
+            self._negative.pop(name, None)
+        return buff["bonus"]
+
+    def attributes(self):
+        """Attributes carried by at least one buff."""
+        return self._by_attr.keys()
+
+    def has(self, attribute):
+        return attribute in self._by_attr
+
+    def total(self, attribute):
+        """Sum of ``bonus`` over buffs with ``attribute`` (0 if none)."""
+        cached = self._totals.get(attribute)
+        if cached is None:
+            cached = 0
+            for name in self._by_attr.get(attribute, ()):
+                cached += dict.__getitem__(self, name).get("bonus", 0)
+            self._totals[attribute] = cached
+        return cached
+
+    def named(self, attributes):
+        """Names of buffs whose attribute is ``attributes`` (a name or a collection), in insertion order."""
+        if isinstance(attributes, str):
+            return list(self._by_attr.get(attributes, ()))
+        found = [n for a in attributes if a in self._by_attr for n in self._by_attr[a]]
+        found.sort(key=self._order.__getitem__)
+        return found
+
+    def negatives(self):
+        """Names of buffs with a negative bonus, in insertion order."""
+        return sorted(self._negative, key=self._order.__getitem__)
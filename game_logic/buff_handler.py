@@ -1,4 +1,5 @@
-import random
+from game_logic.events import OFFSET, record
+from utils.trace import tracer
 
 class BuffHandler:
     ATTRIBUTE_BUFF_KEYS = {
@@ -48,14 +49,20 @@ class BuffHandler:
         return True
 
     @staticmethod
-    def _generate_unique_name(base_name, buffs):
-        name = base_name
-        while name in buffs:
-            name = f"{base_name}_{random.randint(1000, 9999)}"
-        return name
-        
+    def attribute_buffs(buffs, strict=False):
+        """Names in the BuffBook ``buffs`` that pass ``is_attribute_buff``, in insertion order."""
+        return [n for n in buffs.named(BuffHandler.ATTRIBUTE_BUFF_KEYS)
+                if BuffHandler.is_attribute_buff(buffs[n], strict)]
+
+    @staticmethod
+    def attribute_reductions(buffs, strict=False):
+        """Names in the BuffBook ``buffs`` that pass ``is_attribute_reduction``, in insertion order."""
+        # Strict reductions always have a negative bonus, so only those need checking.
+        names = buffs.negatives() if strict else buffs.named(BuffHandler.ATTRIBUTE_REDUCTION_KEYS)
+        return [n for n in names if BuffHandler.is_attribute_reduction(buffs[n], strict)]
+
     @staticmethod
-    def apply_buff(hero, buff_name, buff_data, boss=None, replace_existing=False):
+    def apply_buff(hero, buff_name, buff_data, boss=None, replace_existing=False, stack=False):
         if not hero.is_alive():
             return False, f"{hero.name} is dead. Buff {buff_name} skipped."
 
@@ -63,28 +70,37 @@ class BuffHandler:
         bonus = buff_data.get("bonus", 0)
         internal_attr = BuffHandler.ALIAS_MAP.get(attr, attr)
 
-        # Finalize unique buff name if needed
-        if buff_name in hero.buffs and not replace_existing:
+        # Same name and attribute with a numeric bonus: add a stack instead of replacing
+        if buff_name in hero.buffs and not replace_existing and not stack:
             existing = hero.buffs[buff_name]
             if (
                 existing.get("attribute") == attr and
                 isinstance(existing.get("bonus"), (int, float))
             ):
-                buff_name = BuffHandler._generate_unique_name(buff_name, hero.buffs)
+                stack = True
 
-        # ✅ Curse of Decay check AFTER final buff name is resolved
+        # ✅ Curse of Decay check
         if BuffHandler.is_attribute_buff(buff_data) and hero.curse_of_decay > 0:
+            team = getattr(hero, "team", None)
+            source = getattr(team, "acting", None)
+            if team is not None:
+                team.curse_offsets[(hero.name, source.name if source else "round", attr)] += 1
             if boss and hasattr(boss, "apply_curse_of_decay_damage"):
                 cod_logs = []
-                boss.apply_curse_of_decay_damage(hero, cod_logs)
+                damage = boss.apply_curse_of_decay_damage(hero, cod_logs)
+                record(team, OFFSET, source, hero, damage or 0, detail=attr)
                 msg = f"💀 Curse of Decay offsets {attr} buff on {hero.name}. " + " ".join(cod_logs)
                 hero.curse_of_decay -= 1
                 return False, msg
             else:
+                record(team, OFFSET, source, hero, 0, detail=attr)
                 return False, f"💀 Curse of Decay offsets {attr} buff on {hero.name} (boss missing)."
 
-        # ✅ Apply new or replacement buff
-        hero.buffs[buff_name] = buff_data
+        # ✅ Apply new, stacked or replacement buff
+        if stack:
+            hero.buffs.add_stack(buff_name, buff_data)
+        else:
+            hero.buffs[buff_name] = buff_data
 
         # ✅ Apply effect to stat
         try:
@@ -147,5 +163,6 @@ class BuffHandler:
 def grant_energy(hero, amount: int) -> str:
     before = hero.energy
     hero.energy += amount
-    print(f"[DEBUG-GRANT] {hero.name} gains {amount} energy (from {before} → {hero.energy})")
+    if tracer.energy:
+        tracer.emit(f"[DEBUG-GRANT] {hero.name} gains {amount} energy (from {before} → {hero.energy})")
     return f"⚡ {hero.name} gains +{amount} energy after using their skill."
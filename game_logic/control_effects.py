@@ -1,5 +1,20 @@
 from game_logic.cores import active_core
-import random
+from game_logic.events import CONTROL, record
+from utils.log_utils import ControlLine
+from utils.trace import tracer
+
+def _format_resist(name, effect_name, resist_chance, bypass_note):
+    return f"🛡️ {name} resists {effect_name.replace('_', ' ').title()} ({resist_chance}% Control Immunity){bypass_note}."
+
+
+def _format_receive(name, effect_name, duration):
+    return f"💥 {name} receives {effect_name.replace('_', ' ').title()} for {duration} rounds."
+
+
+def _format_controlled(name, effects, duration):
+    control_list = " and ".join([e.replace("_", " ").capitalize() for e in effects])
+    return f"🔋 {name} is controlled by {control_list} for {duration} rounds."
+
 
 def apply_control_effect(hero, effects, *args, boss=None, team=None):
     if args:
@@ -14,6 +29,8 @@ def apply_control_effect(hero, effects, *args, boss=None, team=None):
         effects = [effects]
 
     control_afflicted = []
+    rng = boss.rng if boss is not None else hero.rng
+    events_team = team if team is not None else getattr(hero, "team", None)
 
     for effect_name in effects:
         # Skip if already applied
@@ -24,7 +41,7 @@ def apply_control_effect(hero, effects, *args, boss=None, team=None):
 
         # Permanent immunity
         if hero.immune_control_effect == effect_name:
-            logs.append(f"🚫 {hero.name} is permanently immune to {effect_name}.")
+            logs.append(ControlLine("🚫 {} is permanently immune to {}.", hero.name, effect_name))
             continue
 
         # Bypass 100 ctrl immunity if boss is applying
@@ -35,16 +52,17 @@ def apply_control_effect(hero, effects, *args, boss=None, team=None):
             immunity_bypass = True
 
         resist_chance = min(max(ctrl_immunity, 0), 100)
-        if random.random() < (resist_chance / 100):
+        if rng.stream("control", hero.name).random() < (resist_chance / 100):
             bypass_note = " (after -100 bypass)" if immunity_bypass else ""
-            logs.append(f"🛡️ {hero.name} resists {effect_name.replace('_', ' ').title()} ({resist_chance}% Control Immunity){bypass_note}.")
+            logs.append(ControlLine(_format_resist, hero.name, effect_name, resist_chance, bypass_note))
             continue
 
         # ✅ Apply effect
         setattr(hero, f"has_{effect_name}", True)
         setattr(hero, f"{effect_name}_rounds", duration)
         control_afflicted.append(effect_name)
-        logs.append(f"💥 {hero.name} receives {effect_name.replace('_', ' ').title()} for {duration} rounds.")
+        record(events_team, CONTROL, boss, hero, duration, detail=effect_name)
+        logs.append(ControlLine(_format_receive, hero.name, effect_name, duration))
 
         # Boss reacts
         if boss:
@@ -52,7 +70,8 @@ def apply_control_effect(hero, effects, *args, boss=None, team=None):
 
         # Self-cleansing (LBRM)
         if hasattr(hero, "on_control_afflicted"):
-            print(f"[DEBUG-CLEANSE-CHECK] {hero.name} checking SELF for {effect_name}: {getattr(hero, f'has_{effect_name}', None)}")
+            if tracer.control_cleansing:
+                tracer.emit(f"[DEBUG-CLEANSE-CHECK] {hero.name} checking SELF for {effect_name}: {getattr(hero, f'has_{effect_name}', None)}")
             result = hero.on_control_afflicted(hero, effect_name)
             if result:
                 logs += result
@@ -61,7 +80,8 @@ def apply_control_effect(hero, effects, *args, boss=None, team=None):
         if team:
             for ally in team.heroes:
                 if ally != hero and hasattr(ally, "on_control_afflicted"):
-                    print(f"[DEBUG-CLEANSE-CHECK] {ally.name} checking {hero.name} for {effect_name}: {getattr(hero, f'has_{effect_name}', None)}")
+                    if tracer.control_cleansing:
+                        tracer.emit(f"[DEBUG-CLEANSE-CHECK] {ally.name} checking {hero.name} for {effect_name}: {getattr(hero, f'has_{effect_name}', None)}")
                     result = ally.on_control_afflicted(hero, effect_name)
                     if result:
                         logs += result
@@ -75,8 +95,7 @@ def apply_control_effect(hero, effects, *args, boss=None, team=None):
     # Summarize final applied effects (after cleanse attempts)
     final_effects = [e for e in control_afflicted if getattr(hero, f"has_{e}", False)]
     if final_effects:
-        control_list = " and ".join([e.replace("_", " ").capitalize() for e in final_effects])
-        logs.append(f"🔋 {hero.name} is controlled by {control_list} for {duration} rounds.")
+        logs.append(ControlLine(_format_controlled, hero.name, final_effects, duration))
 
     return logs, control_afflicted
 
@@ -85,6 +104,6 @@ def apply_control_effect(hero, effects, *args, boss=None, team=None):
 def clear_control_effect(hero, effect_name: str):
     setattr(hero, f"has_{effect_name}", False)
     setattr(hero, f"{effect_name}_rounds", 0)
-    return f"🧹 {hero.name} has {effect_name.replace('_', ' ').capitalize()} removed."
+    return ControlLine("🧹 {} has {} removed.", hero.name, effect_name.replace('_', ' ').capitalize())
 
 
@@ -1,12 +1,45 @@
 from game_logic.buff_handler import BuffHandler
-from utils.log_utils import stylize_log
-import random
+from utils.log_utils import LogRecord, stylize_log
 from math import floor
 from game_logic.boss import Boss
+from game_logic.events import HIT, record
 from collections import namedtuple
 
 Hit = namedtuple("Hit", ["damage", "can_crit"])
 
+AttackerSnapshot = namedtuple("AttackerSnapshot", [
+    "key", "crit_multiplier", "hd_factor", "precision_factor", "add_factor", "dt_bonus",
+])
+AttackerSnapshot.__doc__ = """Offensive multipliers of one attacker. ``key`` holds the stats they were
+built from (HD, precision, ADD, crit DMG, DT level)."""
+
+
+def attacker_snapshot(source):
+    """The attacker's offensive multipliers, rebuilt only when the stats behind them change.
+
+    Team.perform_turn takes one per action right after recalculate_stats, and
+    every hit of that action reuses it. A buff landing mid-action changes the
+    stats in ``key``, so the next hit builds a fresh snapshot.
+    """
+    key = (source.hd, source.precision, source.all_damage_dealt, source.crit_dmg, getattr(source, "dt_level", 0))
+    snapshot = getattr(source, "_damage_snapshot", None)
+    if snapshot is not None and snapshot.key == key:
+        return snapshot
+
+    crit_dmg = min(source.crit_dmg, 150)
+    precision = min(source.precision, 150)
+    snapshot = AttackerSnapshot(
+        key=key,
+        crit_multiplier=1.5 + (crit_dmg / 100) * 2,
+        hd_factor=1 + source.hd * 0.007,
+        precision_factor=1 + precision * 0.003,
+        add_factor=1 + source.all_damage_dealt / 100,
+        dt_bonus=1 + (key[4] * 0.10) if key[4] > 0 else None,
+    )
+    source._damage_snapshot = snapshot
+    return snapshot
+
+
 def hero_deal_damage(source, target, base_damage, is_active, team, hits=1, allow_counter=True, allow_crit=True, hit_list=None, crit_chance_bonus=0):
 
     logs = []
@@ -23,8 +56,9 @@ def hero_deal_damage(source, target, base_damage, is_active, team, hits=1, allow
         source._using_real_attack = True
         temp_flagged = True
 
-    crit_dmg = min(source.crit_dmg, 150)
-    precision = min(source.precision, 150)
+    snapshot = attacker_snapshot(source)
+    crit_multiplier = snapshot.crit_multiplier
+    crit_rng = team.rng.stream("crit", source.name)
 
     all_hits = []
     any_non_crit = False
@@ -37,8 +71,8 @@ def hero_deal_damage(source, target, base_damage, is_active, team, hits=1, allow
             crit = False
             if can_crit and allow_crit:
                 crit_chance = min(source.crit_rate + crit_chance_bonus, 100)
-                crit = random.random() < (crit_chance / 100)
-                dmg *= (1.5 + (crit_dmg / 100) * 2) if crit else 1.0
+                crit = crit_rng.random() < (crit_chance / 100)
+                dmg *= crit_multiplier if crit else 1.0
             else:
                 dmg *= 1.0
             all_hits.append((dmg, crit))
@@ -50,8 +84,8 @@ def hero_deal_damage(source, target, base_damage, is_active, team, hits=1, allow
         for _ in range(hits):
             crit = False
             if allow_crit:
-                crit = random.random() < (source.crit_rate / 100)
-                dmg = base_damage * (1.5 + (crit_dmg / 100) * 2) if crit else base_damage * 1.0
+                crit = crit_rng.random() < (source.crit_rate / 100)
+                dmg = base_damage * crit_multiplier if crit else base_damage * 1.0
             else:
                 dmg = base_damage * 1.0
             all_hits.append((dmg, crit))
@@ -64,22 +98,18 @@ def hero_deal_damage(source, target, base_damage, is_active, team, hits=1, allow
     total_damage = sum(d for d, _ in all_hits)
 
     # Phase 1 modifiers
-    total_damage *= (1 + source.hd * 0.007)
-    total_damage *= (1 + precision * 0.003)
-    total_damage *= (1 + source.all_damage_dealt / 100)
+    total_damage *= snapshot.hd_factor
+    total_damage *= snapshot.precision_factor
+    total_damage *= snapshot.add_factor
 
     # Phase 2 multipliers
     poison_bonus = 0
-    if any(isinstance(b, dict) and b.get("attribute") == "poison" for b in getattr(target, "buffs", {}).values()):
+    if target.is_poisoned:
         poison_bonus = getattr(source, "bonus_damage_vs_poisoned", 0)
 
     burn_bonus = 0
-    if hasattr(source, "phoenix_burn_bonus_rounds") and source.phoenix_burn_bonus_rounds > 0:
-        if hasattr(target, "poison_effects") and any(
-            effect.get("attribute") == "burn" and effect.get("rounds", 0) > 0
-            for effect in target.poison_effects
-        ):
-            burn_bonus = 0.80
+    if getattr(source, "phoenix_burn_bonus_rounds", 0) > 0 and target.is_burning:
+        burn_bonus = 0.80
 
     gk = 0
     if getattr(source, "gk", False) and source.hp > 0:
@@ -97,15 +127,14 @@ def hero_deal_damage(source, target, base_damage, is_active, team, hits=1, allow
     total_damage *= phase2_multiplier
 
 
-    if hasattr(source, "dt_level") and source.dt_level > 0:
-        dt_bonus = 1 + (source.dt_level * 0.10)
+    dt_bonus = snapshot.dt_bonus
+    if dt_bonus is not None:
         total_damage *= dt_bonus
-        logs.append(f"🔮 {source.name} gains +{int((dt_bonus - 1) * 100)}% damage from DT level {source.dt_level}.")
+        logs.append(LogRecord("🔮 {} gains +{}% damage from DT level {}.", source.name, int((dt_bonus - 1) * 100), source.dt_level))
 
     # Apply crit_damage_taken bonus if any hit crit
     if any_crit:
-        bonus = sum(buff.get("bonus", 0) for buff in getattr(target, "buffs", {}).values()
-                    if isinstance(buff, dict) and buff.get("attribute") == "crit_damage_taken")
+        bonus = target.crit_taken_bonus
         if bonus:
             total_damage *= (1 + bonus / 100)
 
@@ -118,17 +147,17 @@ def hero_deal_damage(source, target, base_damage, is_active, team, hits=1, allow
     if any_non_crit:
         bonus_damage = total_damage * 0.30
         total_damage += bonus_damage
-        logs.append(f"🔹 {source.name} gains +{int(bonus_damage) // 1_000_000}M from Balanced Strike (post-multiplier).")
+        logs.append(LogRecord("🔹 {} gains +{}M from Balanced Strike (post-multiplier).", source.name, int(bonus_damage) // 1_000_000))
 
     # Healing and extra bonus from trait_enable
     if hasattr(source, "trait_enable") and hasattr(source.trait_enable, "apply_crit_bonus"):
         heal_amt, extra_dmg = source.trait_enable.apply_crit_bonus(int(total_damage), not any_non_crit)
         if heal_amt > 0:
             source.hp = min(source.max_hp, source.hp + heal_amt)
-            logs.append(f"❤️ {source.name} heals {heal_amt // 1_000_000}M HP from Balanced Strike.")
+            logs.append(LogRecord("❤️ {} heals {}M HP from Balanced Strike.", source.name, heal_amt // 1_000_000))
         if extra_dmg > 0:
             total_damage += extra_dmg
-            logs.append(f"🔹 {source.name} gains +{extra_dmg // 1_000_000}M bonus damage from Balanced Strike.")
+            logs.append(LogRecord("🔹 {} gains +{}M bonus damage from Balanced Strike.", source.name, extra_dmg // 1_000_000))
 
     # DR and ADR
     dr = min(getattr(target, "dr", 0), 0.75)
@@ -140,7 +169,7 @@ def hero_deal_damage(source, target, base_damage, is_active, team, hits=1, allow
         absorbed = min(target.shield, total_damage)
         target.shield -= absorbed
         total_damage -= absorbed
-        logs.append(f"🛡️ {target.name} absorbs {int(absorbed) // 1_000_000}M damage with Shield.")
+        logs.append(LogRecord("🛡️ {} absorbs {}M damage with Shield.", target.name, int(absorbed) // 1_000_000))
 
     if hasattr(target, "trait_enable") and hasattr(target.trait_enable, "prevent_death"):
         if target.trait_enable.prevent_death(target, int(total_damage)):
@@ -156,7 +185,8 @@ def hero_deal_damage(source, target, base_damage, is_active, team, hits=1, allow
     else:
         target.hp -= final_damage
 
-    logs.append(f"🔹 {source.name} deals {final_damage // 1_000_000}M damage to {target.name}.")
+    logs.append(LogRecord("🔹 {} deals {}M damage to {}.", source.name, final_damage // 1_000_000, target.name))
+    record(team, HIT, source, target, final_damage, any_crit)
 
     if hasattr(source, "after_attack"):
         logs += source.after_attack(source, target, "active" if is_active else "basic", team) or []
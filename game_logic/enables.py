@@ -1,7 +1,5 @@
 # game_logic/enables.py
 
-import random
-
 class Enable:
     def apply_end_of_round(self, hero, boss):
         pass
@@ -17,7 +15,7 @@ class ControlPurify(Enable):
             effects.append("seal_of_light")
 
         if effects:
-            effect_to_remove = random.choice(effects)
+            effect_to_remove = hero.rng.stream("purify", hero.name).choice(effects)
             if effect_to_remove == "fear":
                 hero.has_fear = False
                 hero.fear_rounds = 0
@@ -42,7 +40,7 @@ class AttributeReductionPurify(Enable):
             reductions.append("armor")
 
         if reductions:
-            chosen = random.choice(reductions)
+            chosen = hero.rng.stream("purify", hero.name).choice(reductions)
             if chosen == "atk":
                 messages.append(f"💢 {hero.name} purifies {hero.atk_reduction * 100:.0f}% **ATK Reduction**.")
                 hero.atk /= (1 - hero.atk_reduction)
@@ -0,0 +1,301 @@
+# game_logic/engine.py
+"""Headless battle engine.
+
+One place owns the 15-round loop. Callers describe a team with plain
+``HeroSpec`` tuples (codes instead of objects, so a spec can be pickled to a
+worker or used as a cache key) and get back a ``BattleResult`` with
+per-round numbers. Log lines are only kept when ``log_level`` asks for them.
+"""
+import pickle
+from collections import Counter, namedtuple
+
+import game_logic.cores
+from game_logic.artifacts import Scissors, DB, dDB, Mirror, dMirror, Antlers
+from game_logic.boss import Boss
+from game_logic.cores import PDECore
+from game_logic.enables import ControlPurify, AttributeReductionPurify, MarkPurify, BalancedStrike, UnbendingWill
+from game_logic.heroes.base import Hero
+from game_logic.lifestar import Specter, Nova
+from game_logic.pets import Phoenix
+from game_logic.rng import BattleRNG
+from game_logic.team import Team
+from utils.log_utils import BattleLog
+
+MAX_ROUNDS = 15
+# Part of every cached result's key (sim_cache.py). Source edits under
+# game_logic/ invalidate the cache on their own; bump this for changes they
+# can't see, such as how results are aggregated.
+ENGINE_VERSION = 1
+
+ARTIFACTS = {
+    "scissors": Scissors, "db": DB, "ddb": dDB,
+    "mirror": Mirror, "dmirror": dMirror, "antlers": Antlers,
+}
+LIFESTARS = {"specter": Specter, "nova": Nova}
+PURIFIES = {"CP": ControlPurify, "ARP": AttributeReductionPurify, "MP": MarkPurify}
+TRAITS = {"BS": BalancedStrike, "UW": UnbendingWill}
+PETS = {"phoenix": Phoenix}
+CORES = {"pde": PDECore}
+
+HeroSpec = namedtuple("HeroSpec", [
+    "hero_id", "hp", "atk", "spd", "purify", "trait", "artifact", "lifestar",
+    "dt_level", "crit_rate", "crit_dmg", "precision", "hd", "skill_damage", "add",
+    "dr", "adr", "armor",
+], defaults=(None, 0, 0, 0, 0, 0, 0, 0, 0, 0, 0))
+HeroSpec.__doc__ = """One hero's build. ``artifact``/``lifestar`` are codes from ARTIFACTS/LIFESTARS
+(or None), ``purify``/``trait`` are codes from PURIFIES/TRAITS. The remaining
+fields are flat bonuses added on top of the hero's class stats."""
+
+BattleConfig = namedtuple("BattleConfig", ["heroes", "front_line", "pet", "core"],
+                          defaults=(2, "phoenix", "pde"))
+BattleConfig.__doc__ = """A full team: a tuple of HeroSpec in slot order. The first ``front_line``
+heroes form the front line. ``pet``/``core`` are codes (or None)."""
+
+VERDICT_LINES = {
+    "victory": "🏆 Boss defeated! Victory!",
+    "defeat": "❌ All heroes have fallen. Defeat!",
+    "timeout": "⏳ Battle ended after 15 rounds. Boss survived.",
+    "stopped": "🛑 Battle stopped early.",
+}
+
+RoundStats = namedtuple("RoundStats", ["round_num", "damage", "energy", "calamity", "curse", "logs"])
+RoundStats.__doc__ = """Per-round numbers keyed by hero name: damage dealt and energy change this
+round, and Calamity/Curse layers at round end. ``logs`` holds the round's game
+log lines ("detailed"), a one-line recap ("summary"), or None ("off"). Lines may
+be unformatted LogRecords; use ``utils.log_utils.render_logs`` to get text."""
+
+BattleResult = namedtuple("BattleResult", [
+    "seed", "verdict", "rounds_played", "hero_names", "damage", "energy", "rounds", "deaths",
+    "boss_damage_taken", "logs", "curse_offsets",
+])
+BattleResult.__doc__ = """Outcome of one battle. ``verdict`` is "victory", "defeat", "timeout" or
+"stopped" (a hero named in ``stop_on_death`` fell). ``damage`` maps hero name to
+total damage dealt, ``energy`` to energy at the end, and ``deaths`` to the
+round the hero fell in. ``logs`` lists every kept line (None when off).
+``curse_offsets`` is a Counter of buffs cancelled by Curse of Decay, keyed
+``(hero, source, attribute)``; ``source`` is the name of the hero or boss whose
+action granted the buff, or "round" for start/end-of-round effects."""
+
+BattleSnapshot = namedtuple("BattleSnapshot", ["round_num", "seed", "state"])
+BattleSnapshot.__doc__ = """A battle frozen between rounds by ``Battle.snapshot``. ``state`` is an
+immutable pickle of the whole battle (team, heroes, boss, artifacts,
+lifestars, pet, RNG state and the rounds so far), so one snapshot can be
+shared by any number of forks, in this process or sent to workers."""
+
+
+def build_hero(spec, rng=None):
+    artifact = ARTIFACTS[spec.artifact.lower()]() if spec.artifact else None
+    lifestar = LIFESTARS[spec.lifestar.lower()]() if spec.lifestar else None
+
+    h = Hero.from_stats(spec.hero_id, [spec.hp, spec.atk, spec.spd], artifact=artifact, lifestar=lifestar, rng=rng)
+    h.set_enables(PURIFIES[spec.purify]() if spec.purify else None,
+                  TRAITS[spec.trait]() if spec.trait else None)
+    h.dt_level = spec.dt_level
+
+    # Offensive stats
+    h.crit_rate += spec.crit_rate
+    h._base_crit_rate += spec.crit_rate
+    h.crit_dmg += spec.crit_dmg
+    h._base_crit_dmg += spec.crit_dmg
+    h.precision += spec.precision
+    h._base_precision += spec.precision
+    h._base_skill_damage += spec.skill_damage
+    h.hd += spec.hd
+    h._base_hd += spec.hd
+    h.all_damage_dealt += spec.add
+    h._base_all_damage_dealt += spec.add
+
+    # Defensive stats
+    h.DR += spec.dr
+    h._base_dr += spec.dr
+    h.ADR += spec.adr
+    h._base_adr += spec.adr
+    h.armor += spec.armor
+    h.original_armor += spec.armor
+
+    h.gk = h.defier = True
+    h.total_damage_dealt = 0
+    h.recalculate_stats()
+    return h
+
+
+def build_battle(config, rng=None):
+    """Create fresh ``(team, boss)`` objects for one battle from a BattleConfig."""
+    if config.core:
+        game_logic.cores.active_core = CORES[config.core]()
+
+    heroes = [build_hero(spec, rng) for spec in config.heroes]
+    pet = PETS[config.pet]() if config.pet else None
+    team = Team(heroes, heroes[:config.front_line], heroes[config.front_line:], pet=pet, rng=rng)
+    boss = Boss(rng=rng)
+    return team, boss
+
+
+class BattleCancelled(Exception):
+    """Raised by Battle.run when its ``should_stop`` hook asks it to stop."""
+
+
+class Battle:
+    """Steps one battle a round at a time.
+
+    ``run_battle`` is the usual entry point; the Discord commands drive a
+    Battle directly when they need to send output between rounds.
+    """
+
+    def __init__(self, team, boss, log_level="off", stop_on_death=(), max_rounds=MAX_ROUNDS, seed=None):
+        self.log = BattleLog(log_level)
+        team.log = boss.log = self.log
+        self.team = team
+        self.boss = boss
+        self.log_level = log_level
+        self.stop_on_death = tuple(stop_on_death or ())
+        self.max_rounds = max_rounds
+        self.seed = seed
+        self.heroes = list(team.heroes)  # slot order; team.heroes is re-sorted by speed every turn
+        self.round_num = 0
+        self.rounds = []
+        self.deaths = {}
+        self.verdict = None
+        self.started = False
+
+    @property
+    def finished(self):
+        return self.verdict is not None
+
+    def start(self):
+        """Apply start-of-battle artifact and hero effects. Returns the log lines."""
+        logs = []
+        for hero in self.team.heroes:
+            if hero.artifact and hasattr(hero.artifact, "apply_start_of_battle"):
+                result = hero.artifact.apply_start_of_battle(self.team, round_num=1)
+                if result:
+                    logs.extend(result)
+
+        for hero in self.team.heroes:
+            if hasattr(hero, "start_of_battle") and callable(hero.start_of_battle):
+                logs.extend(hero.start_of_battle(self.team, self.boss))
+
+        self.started = True
+        if self.log.detailed:
+            self.log.extend(logs)
+            return logs
+        return []
+
+    def _check_verdict(self):
+        if not self.boss.is_alive():
+            self.verdict = "victory"
+        elif all(not h.is_alive() for h in self.team.heroes):
+            self.verdict = "defeat"
+        elif any(name in self.deaths for name in self.stop_on_death):
+            self.verdict = "stopped"
+        elif self.round_num >= self.max_rounds:
+            self.verdict = "timeout"
+        return self.verdict
+
+    def play_round(self):
+        """Play the next round and return its RoundStats."""
+        if not self.started:
+            self.start()
+        if self.finished:
+            raise RuntimeError("battle is already over")
+
+        team, boss = self.team, self.boss
+        self.round_num += 1
+        round_num = self.round_num
+        start_dmg = [h.total_damage_dealt for h in self.heroes]
+        start_energy = [h.energy for h in self.heroes]
+
+        turn_logs = team.perform_turn(boss, round_num)
+
+        # A wiped team or a dead boss skips end-of-round effects.
+        end_logs = []
+        if boss.is_alive() and any(h.is_alive() for h in team.heroes):
+            end_logs = team.end_of_round(boss, round_num)
+
+        for h in self.heroes:
+            if h.name not in self.deaths and not h.is_alive():
+                self.deaths[h.name] = round_num
+
+        round_logs = None
+        if self.log.detailed:
+            round_logs = turn_logs + end_logs
+            self.log.extend(round_logs)
+        elif self.log.summary:
+            self.log.note("🔁 Round {} | 💥 Boss HP: {} | 🏹 Total Damage: {}",
+                          round_num, int(boss.hp), int(boss.total_damage_taken))
+            round_logs = self.log.lines[-1:]
+
+        stats = RoundStats(
+            round_num,
+            {h.name: h.total_damage_dealt - d for h, d in zip(self.heroes, start_dmg)},
+            {h.name: h.energy - e for h, e in zip(self.heroes, start_energy)},
+            {h.name: h.calamity for h in self.heroes},
+            {h.name: h.curse_of_decay for h in self.heroes},
+            round_logs,
+        )
+        self.rounds.append(stats)
+        self._check_verdict()
+        return stats
+
+    def run(self, should_stop=None):
+        """Play until the battle ends and return the BattleResult.
+
+        ``should_stop`` is checked before every round; when it returns true
+        the battle is abandoned with BattleCancelled (cooperative cancellation).
+        """
+        if not self.started:
+            self.start()
+        if self._check_verdict() is None:
+            while not self.finished:
+                if should_stop is not None and should_stop():
+                    raise BattleCancelled(self.round_num)
+                self.play_round()
+        return self.result()
+
+    def snapshot(self):
+        """Freeze the battle as it stands (best taken between rounds)."""
+        return BattleSnapshot(self.round_num, self.seed, pickle.dumps(self, pickle.HIGHEST_PROTOCOL))
+
+    @staticmethod
+    def fork(snapshot, seed=None):
+        """A new, independent Battle carrying on from ``snapshot``.
+
+        Without ``seed`` the fork replays the original's rolls, so changes
+        made to the fork are the only difference. With ``seed`` the shared RNG
+        is reseeded and forks diverge; ``Battle.seed`` still names the seed the
+        battle started from.
+        """
+        battle = pickle.loads(snapshot.state)
+        if seed is not None:
+            battle.team.rng.seed(seed)
+        return battle
+
+    def result(self):
+        return BattleResult(
+            seed=self.seed,
+            verdict=self.verdict,
+            rounds_played=self.round_num,
+            hero_names=tuple(h.name for h in self.heroes),
+            damage={h.name: h.total_damage_dealt for h in self.heroes},
+            energy={h.name: h.energy for h in self.heroes},
+            rounds=self.rounds,
+            deaths=dict(self.deaths),
+            boss_damage_taken=self.boss.total_damage_taken,
+            logs=self.log.lines if self.log.summary else None,
+            curse_offsets=Counter(self.team.curse_offsets),
+        )
+
+
+def run_battle(config, seed=None, log_level="off", stop_on_death=(), split_streams=False, should_stop=None):
+    """Run one battle for ``config`` on its own seeded RNG stream.
+
+    ``stop_on_death`` lists hero names whose death ends the battle early
+    (verdict "stopped"), e.g. ``("ELY",)`` for survival testing.
+    ``split_streams`` draws each kind of roll from its own stream (see
+    BattleRNG), for comparing builds on common random numbers.
+    ``should_stop`` is passed on to Battle.run.
+    """
+    rng = BattleRNG(seed, split=split_streams)
+    team, boss = build_battle(config, rng)
+    return Battle(team, boss, log_level=log_level, stop_on_death=stop_on_death,
+                  seed=rng.seed_value).run(should_stop)
@@ -0,0 +1,29 @@
+# game_logic/events.py
+"""Typed combat events.
+
+Damage, control and Curse of Decay code append a ``CombatEvent`` to the
+team's ``events`` list as things happen. Team logic reads the slice for the
+action it cares about (``team.events[mark:]``) instead of searching the text
+log, so it works the same whether or not logs are being kept.
+
+Events drive game logic only. The text log is not rendered from them: hooks
+still write their own lines (lazily, see utils.log_utils) next to the
+``record`` call, so a change to what a hook does must update both.
+"""
+from collections import namedtuple
+
+HIT = "hit"          # source damaged target; ``crit`` set if any hit crit
+CONTROL = "control"  # target received control effect ``detail``
+OFFSET = "offset"    # Curse of Decay on target cancelled a ``detail`` buff; ``amount`` is the curse damage
+
+CombatEvent = namedtuple("CombatEvent", ["kind", "source", "target", "amount", "crit", "detail"])
+CombatEvent.__doc__ = """One thing that happened in a battle. ``source``/``target`` are the live
+Hero or Boss objects. ``source`` is None for round effects (start/end of
+round) that no single unit is responsible for."""
+
+
+def record(team, kind, source, target, amount=0, crit=False, detail=None):
+    """Append an event to ``team.events`` (no-op for objects without a stream)."""
+    events = getattr(team, "events", None)
+    if events is not None:
+        events.append(CombatEvent(kind, source, target, amount, crit, detail))
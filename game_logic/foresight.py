@@ -1,5 +1,6 @@
 # game_logic/foresight.py
 from game_logic.buff_handler import BuffHandler
+from utils.trace import tracer
 
 def apply_foresight(hero, source):
     logs = []
@@ -9,36 +10,33 @@ def apply_foresight(hero, source):
         return logs
 
     if source == "basic":
-        # Create a new unique buff name for each trigger to avoid overwriting
-        buff_key = f"foresight_basic_{len([b for b in hero.buffs if b.startswith('foresight_basic')]) + 1}"
-
-        BuffHandler.apply_buff(hero, buff_key, {
+        # Each trigger adds a stack; stacks run out on their own
+        BuffHandler.apply_buff(hero, "foresight_basic", {
             "attribute": "all_damage_dealt",
             "bonus": 30,
             "rounds": 15,
             "skill_buff": True
         })
 
-        BuffHandler.apply_buff(hero, f"{buff_key}_energy", {
+        BuffHandler.apply_buff(hero, "foresight_basic_energy", {
             "attribute": "energy",
             "bonus": 50,
             "rounds": 0,
             "skill_buff": False
         })
 
-        print(f"[DEBUG-FORESIGHT] {hero.name} gains +50 Energy from Foresight (Basic). Now at: {hero.energy}")
+        if tracer.foresight:
+            tracer.emit(f"[DEBUG-FORESIGHT] {hero.name} gains +50 Energy from Foresight (Basic). Now at: {hero.energy}")
 
         logs.append(f"🧿 {hero.name} gains Foresight (Basic): +30% All Damage for 15 rounds and +50 Energy.")
 
     elif source == "active":
-        buff_key = f"foresight_active_{len([b for b in hero.buffs if b.startswith('foresight_active')]) + 1}"
-
-        BuffHandler.apply_buff(hero, buff_key, {
+        BuffHandler.apply_buff(hero, "foresight_active", {
             "crit_rate_increase": 30,
             "crit_dmg_increase": 100,
             "rounds": 2,
             "skill_buff": True
-        })
+        }, stack=True)
 
         hero.crit_rate += 30
         hero.crit_dmg += 100
@@ -1,15 +1,53 @@
 # game_logic/heroes/base.py
 
-import random
 from math import floor
 from game_logic.enables import ControlPurify, AttributeReductionPurify, MarkPurify, BalancedStrike, UnbendingWill
 from game_logic.artifacts import Scissors, DB, Mirror, Antlers
 from game_logic.cores import active_core
 from game_logic.control_effects import apply_control_effect, clear_control_effect
+from game_logic.buff_book import BuffBook
 from game_logic.buff_handler import BuffHandler
+from game_logic.status import EffectList, StatusView
+from game_logic.rng import GLOBAL_RNG
+
+# Buff attribute (lower-cased) -> the stat recalculate_stats adds it to. ATK is split separately.
+BUFF_STATS = {
+    "all_damage_dealt": "all_damage_dealt", "armor": "armor", "speed": "spd",
+    "skill_damage": "skill_damage", "precision": "precision", "block": "block",
+    "crit_rate": "crit_rate", "crit_dmg": "crit_dmg", "armor_break": "armor_break",
+    "control_immunity": "ctrl_immunity", "dr": "DR", "hd": "hd", "adr": "ADR",
+    "energy": "energy", "dodge": "dodge",
+}
+
+class Hero(StatusView):
+    # Every attribute a hero can carry. Subclasses list their own extras; code
+    # that tags another hero (antlers, wings, Undying Shadow, ...) needs a slot
+    # here. Unset slots behave like missing attributes for hasattr/getattr.
+    __slots__ = (
+        # Identity and wiring
+        "name", "rng", "team", "artifact", "lifestar", "purify_enable", "trait_enable",
+        # Live stats (rebuilt by recalculate_stats)
+        "hp", "max_hp", "atk", "armor", "spd", "skill_damage", "dodge", "block", "armor_break",
+        "crit_rate", "crit_dmg", "ctrl_immunity", "hd", "precision", "all_damage_dealt", "DR", "ADR",
+        "dt_level", "energy", "shield", "gk", "defier", "bonus_damage_vs_poisoned",
+        # Base stats
+        "original_atk", "original_armor", "_base_hd", "_base_precision", "_base_ctrl_immunity",
+        "_base_dr", "_base_adr", "_base_dodge", "_base_all_damage_dealt", "_base_spd",
+        "_base_skill_damage", "_base_block", "_base_crit_rate", "_base_crit_dmg", "_base_armor_break",
+        # Buffs, debuffs and control
+        "buffs", "regen_buff", "poison_effects", "status_effects", "curse_of_decay", "calamity",
+        "immune_control_effect", "has_silence", "silence_rounds", "has_fear", "fear_rounds",
+        "has_seal_of_light", "seal_rounds", "seal_of_light_rounds",
+        "atk_reduction", "armor_reduction", "bleed", "bleed_duration", "mystical_veil", "shadow_lurk",
+        # Effects granted by other units
+        "transition_power", "antler_stacks", "phoenix_burn_bonus_rounds", "queens_guard",
+        "wings_effect", "wings_from_transition", "magnification_effect", "protection_effect",
+        "extra_ctrl_removals", "undying_shadow", "bright_blessing", "fluorescent_triggered",
+        # Bookkeeping
+        "total_damage_dealt", "_healing_done", "_healing_rounds", "_last_damage_received",
+        "_current_action_type", "_using_real_attack", "_damage_rounds", "_damage_snapshot",
+    )
 
-class Hero:
-    
     def decrement_control_effects(self):
         for effect, rounds_attr in [("fear", "fear_rounds"), ("silence", "silence_rounds"), ("seal_of_light", "seal_rounds")]:
             rounds = getattr(self, rounds_attr, 0)
@@ -19,8 +57,10 @@ class Hero:
                 if rounds <= 0:
                     setattr(self, f"has_{effect}", False)
     def __init__(self, name, hp, atk, armor, spd, crit_rate, crit_dmg, ctrl_immunity, hd, precision,
-                purify_enable=None, trait_enable=None, artifact=None, lifestar=None):
+                purify_enable=None, trait_enable=None, artifact=None, lifestar=None, rng=None):
         self.name = name
+        # Replaced by the battle's shared RNG once the hero joins a Team.
+        self.rng = rng if rng is not None else GLOBAL_RNG
         self.hp = hp
         self.max_hp = hp
         self.atk = atk
@@ -49,9 +89,9 @@ class Hero:
         self.artifact = artifact
         self.lifestar = lifestar
         self.all_damage_dealt = 0
-        self.buffs = {}
+        self.buffs = BuffBook()
         self.regen_buff = None
-        self.poison_effects = []
+        self.poison_effects = EffectList()
         self.shield = 0
         self._healing_done = 0
         self._healing_rounds = []
@@ -63,10 +103,11 @@ class Hero:
         self.bleed_duration = 0
         self.mystical_veil = 0
         self.shadow_lurk = 0
-        self.immune_control_effect = random.choice(["fear", "silence", "seal_of_light"])
+        self.immune_control_effect = self.rng.stream("setup", self.name).choice(["fear", "silence", "seal_of_light"])
         self.gk = False
         self.defier = False
         self.total_damage_dealt = 0
+        self._damage_snapshot = None
         self.purify_enable = purify_enable
         self.trait_enable = trait_enable
         self.bonus_damage_vs_poisoned = 0
@@ -114,51 +155,23 @@ class Hero:
         self.armor_break = self._base_armor_break
         self.dodge = self._base_dodge  # Reset first
 
-        # Accumulators for ATK split
+        # Apply active buffs: per-attribute totals, with ATK split into percent and flat
         percent_atk = 0
         flat_atk = 0
-
-        # Apply active buffs
-        for buff in self.buffs.values():
-            if isinstance(buff, dict):
-                attr = buff.get("attribute", "").lower()
-                val = buff.get("bonus", 0)
-
-                if attr == "all_damage_dealt":
-                    self.all_damage_dealt += val
-                elif attr == "atk":
+        buffs = self.buffs
+        for attr in buffs.attributes():
+            key = attr.lower()
+            if key == "atk":
+                for name in buffs.named(attr):
+                    val = buffs[name].get("bonus", 0)
                     if abs(val) < 10:
                         percent_atk += val
                     else:
                         flat_atk += val
-                elif attr == "armor":
-                    self.armor += val
-                elif attr == "speed":
-                    self.spd += val
-                elif attr == "skill_damage":
-                    self.skill_damage += val
-                elif attr == "precision":
-                    self.precision += val
-                elif attr == "block":
-                    self.block += val
-                elif attr == "crit_rate":
-                    self.crit_rate += val
-                elif attr == "crit_dmg":
-                    self.crit_dmg += val
-                elif attr == "armor_break":
-                    self.armor_break += val
-                elif attr == "control_immunity":
-                    self.ctrl_immunity += val
-                elif attr == "dr":
-                    self.DR += val
-                elif attr == "hd":
-                    self.hd += val
-                elif attr == "adr":
-                    self.ADR += val
-                elif attr == "energy":
-                    self.energy += val
-                elif attr == "dodge":
-                    self.dodge += val
+            else:
+                stat = BUFF_STATS.get(key)
+                if stat:
+                    setattr(self, stat, getattr(self, stat) + buffs.total(attr))
 
         # Final ATK computation: percent + flat
         self.atk = int(self.original_atk * (1 + percent_atk)) + flat_atk
@@ -173,17 +186,14 @@ class Hero:
     def is_alive(self):
         return self.hp > 0
 
-    def apply_buff(self, buff_name, buff_data):
-        self.buffs[buff_name] = buff_data
+    def apply_buff(self, buff_name, buff_data, stack=False):
+        if stack:
+            self.buffs.add_stack(buff_name, buff_data)
+        else:
+            self.buffs[buff_name] = buff_data
 
     def process_buffs(self):
-        expired = []
-        for buff in list(self.buffs.keys()):
-            self.buffs[buff]["rounds"] -= 1
-            if self.buffs[buff]["rounds"] <= 0:
-                expired.append(buff)
-        for buff_name in expired:
-            buff = self.buffs[buff_name]
+        for buff_name, buff in self.buffs.tick():
             if "attribute" in buff and "bonus" in buff:
                 attr = buff["attribute"]
                 alias = {
@@ -207,7 +217,6 @@ class Hero:
                 self.crit_rate -= buff["crit_rate_increase"]
             if "crit_dmg_increase" in buff:
                 self.crit_dmg -= buff["crit_dmg_increase"]
-            del self.buffs[buff_name]
         if self.regen_buff:
             self.regen_buff["rounds"] -= 1
             if self.regen_buff["rounds"] <= 0:
@@ -245,7 +254,7 @@ class Hero:
     def process_regen_buffs(self):
         logs = []
         for name, buff in self.buffs.items():
-            if "heal_amount" in buff and buff.get("rounds", 0) > 0:
+            if "heal_amount" in buff and self.buffs.remaining(name, 0) > 0:
                 heal = buff["heal_amount"]
                 before = self.hp
                 self.hp = min(self.max_hp, self.hp + heal)
@@ -293,7 +302,10 @@ class Hero:
 
         self.decrement_control_effects()
 
-        messages.append(f"📉 {self.get_status_description()}")
+        # The status line snapshots every buff, so skip it when nobody will read it.
+        log = getattr(team, "log", None)
+        if log is None or log.detailed:
+            messages.append(f"📉 {self.get_status_description()}")
         return messages
 
     def apply_attribute_effect(self, effect, ratio):
@@ -379,7 +391,7 @@ class Hero:
         return f"{self.name} gains Foresight (Active): +30% crit rate and +100% crit dmg for 2 rounds."
 
     @classmethod
-    def from_stats(cls, hero_id, stats, artifact=None, lifestar=None):
+    def from_stats(cls, hero_id, stats, artifact=None, lifestar=None, rng=None):
         from .sqh import SQH
         from .lfa import LFA
         from .mff import MFF
@@ -390,28 +402,28 @@ class Hero:
         hp, atk, spd = stats
         if hero_id == "hero_SQH_Hero":
             hero = SQH("SQH", hp, atk, armor=7000, spd=spd, crit_rate=10, crit_dmg=150,
-                       ctrl_immunity=70, hd=0, precision=100, artifact=artifact, lifestar=lifestar)
+                       ctrl_immunity=70, hd=0, precision=100, artifact=artifact, lifestar=lifestar, rng=rng)
         elif hero_id == "hero_LFA_Hero":
             hero = LFA("LFA", hp, atk, armor=4200, spd=spd, crit_rate=20, crit_dmg=150,
-                       ctrl_immunity=30, hd=150, precision=150, artifact=artifact, lifestar=lifestar)
+                       ctrl_immunity=30, hd=150, precision=150, artifact=artifact, lifestar=lifestar, rng=rng)
         elif hero_id == "hero_MFF_Hero":
             hero = MFF("MFF", hp, atk, armor=4000, spd=spd, crit_rate=8, crit_dmg=150,
-                       ctrl_immunity=70, hd=0, precision=100, artifact=artifact, lifestar=lifestar)
+                       ctrl_immunity=70, hd=0, precision=100, artifact=artifact, lifestar=lifestar, rng=rng)
         elif hero_id == "hero_ELY_Hero":
             hero = ELY("ELY", hp, atk, armor=5000, spd=spd, crit_rate=9, crit_dmg=150,
-                       ctrl_immunity=80, hd=0, precision=100, artifact=artifact, lifestar=lifestar)
+                       ctrl_immunity=80, hd=0, precision=100, artifact=artifact, lifestar=lifestar, rng=rng)
         elif hero_id == "hero_PDE_Hero":
             hero = PDE("PDE", hp, atk, armor=9000, spd=spd, crit_rate=11, crit_dmg=150,
-                       ctrl_immunity=125, hd=0, precision=100, artifact=artifact, lifestar=lifestar)
+                       ctrl_immunity=125, hd=0, precision=100, artifact=artifact, lifestar=lifestar, rng=rng)
         elif hero_id == "hero_LBRM_Hero":
             hero = LBRM("LBRM", hp, atk, armor=7000, spd=spd, crit_rate=10, crit_dmg=145,
-                        ctrl_immunity=130, hd=0, precision=100, artifact=artifact, lifestar=lifestar)
+                        ctrl_immunity=130, hd=0, precision=100, artifact=artifact, lifestar=lifestar, rng=rng)
         elif hero_id == "hero_DGN_Hero":
             hero = DGN("DGN", hp, atk, armor=12000, spd=spd, crit_rate=10, crit_dmg=150,
-                       ctrl_immunity=80, hd=0, precision=100, artifact=artifact, lifestar=lifestar)
+                       ctrl_immunity=80, hd=0, precision=100, artifact=artifact, lifestar=lifestar, rng=rng)
         else:
             hero = cls("Default", hp, atk, armor=1000, spd=spd, crit_rate=10, crit_dmg=150,
-                       ctrl_immunity=10, hd=0, precision=100, artifact=artifact, lifestar=lifestar)
+                       ctrl_immunity=10, hd=0, precision=100, artifact=artifact, lifestar=lifestar, rng=rng)
         hero.energy = 50
         return hero
 
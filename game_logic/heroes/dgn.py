@@ -2,15 +2,30 @@ from .base import Hero
 from game_logic.damage_utils import hero_deal_damage
 from game_logic.buff_handler import BuffHandler
 from utils.log_utils import group_team_buffs
-import random
-from utils.log_utils import debug
+from utils.trace import tracer
+
+
+def _sample_stacks(rng, buffs, names):
+    """Up to two stacks of ``names``, each with a copy of itself taken before anything is written."""
+    picked = rng.sample(buffs.each_stack(names), min(2, sum(map(buffs.stacks, names))))
+    return [(name, buffs.stack_copies(name)[index]) for name, index in picked]
+
+
+def _replicate(receiver, copies, key):
+    """Apply each copy as ``key.format(name)``; two stacks of one family land as two stacks."""
+    landed = set()
+    for name, buff in copies:
+        receiver.apply_buff(key.format(name), buff, stack=key.format(name) in landed)
+        landed.add(key.format(name))
 
 
 class DGN(Hero):
+    __slots__ = ()
+
     def __init__(self, name, hp, atk, armor, spd, crit_rate, crit_dmg, ctrl_immunity, hd, precision,
-                 purify_enable=None, trait_enable=None, artifact=None, lifestar=None):
+                 purify_enable=None, trait_enable=None, artifact=None, lifestar=None, rng=None):
         super().__init__(name, hp, atk, armor, spd, crit_rate, crit_dmg, ctrl_immunity, hd, precision,
-                         purify_enable, trait_enable, artifact, lifestar=lifestar)
+                         purify_enable, trait_enable, artifact, lifestar=lifestar, rng=rng)
         self.undying_shadow = False
         self.bright_blessing = False
         self.transition_power = 0
@@ -25,12 +40,14 @@ class DGN(Hero):
         target = boss if not hasattr(boss, "heroes") else max(boss.heroes, key=lambda h: h.atk)
         target.undying_shadow = True
         logs.append(f"{self.name} inflicts Undying Shadow on {target.name} until battle ends.")
-        debug(f"{self.name} assigns Undying Shadow → {target.name}")
+        if tracer.hero_skills:
+            tracer.emit(f"[DEBUG] {self.name} assigns Undying Shadow → {target.name}")
 
         top_ally = max([h for h in team.heroes if h.is_alive()], key=lambda h: h.atk)
         top_ally.bright_blessing = True
         logs.append(f"{self.name} grants Bright Blessing to {top_ally.name} until battle ends.")
-        debug(f"{self.name} assigns Bright Blessing → {top_ally.name}")
+        if tracer.hero_skills:
+            tracer.emit(f"[DEBUG] {self.name} assigns Bright Blessing → {top_ally.name}")
 
         return logs
 
@@ -40,20 +57,23 @@ class DGN(Hero):
             logs.append(f"{self.name} is silenced and cannot use active skill.")
             return logs
 
-        debug(f"{self.name} starts ACTIVE skill")
+        if tracer.hero_skills:
+            tracer.emit(f"[DEBUG] {self.name} starts ACTIVE skill")
 
         # First hit (can crit, triggers counter)
         base = self.atk * (14 + self.skill_damage / 100)
-        debug(f"{self.name} base damage = {base:.2f}")
+        if tracer.hero_skills:
+            tracer.emit(f"[DEBUG] {self.name} base damage = {base:.2f}")
         logs.extend(hero_deal_damage(
             self, boss, base,
             is_active=True, team=team, allow_counter=True, allow_crit=True
         ))
 
         # Bonus hit (can crit, no counter)
-        count = sum(1 for b in boss.buffs.values() if BuffHandler.is_attribute_reduction(b, strict=True))
+        count = len(BuffHandler.attribute_reductions(boss.buffs, strict=True))
         bonus = self.atk * (10 + self.skill_damage / 100) * count
-        debug(f"{self.name} bonus damage = {bonus:.2f} from {count} boss debuffs")
+        if tracer.hero_skills:
+            tracer.emit(f"[DEBUG] {self.name} bonus damage = {bonus:.2f} from {count} boss debuffs")
         if bonus:
             logs.extend(hero_deal_damage(
                 self, boss, bonus,
@@ -63,7 +83,8 @@ class DGN(Hero):
         # AOE to Undying Shadow
         total = base + bonus
         aoe = int(total * 0.7)
-        debug(f"{self.name} AOE damage = {aoe} to Undying Shadow allies")
+        if tracer.hero_skills:
+            tracer.emit(f"[DEBUG] {self.name} AOE damage = {aoe} to Undying Shadow allies")
         for ally in team.heroes:
             if getattr(ally, "undying_shadow", False):
                 ally.hp -= aoe
@@ -89,17 +110,17 @@ class DGN(Hero):
 
         # Debuff replication to boss
         debuffs = [
-            (n, b) for n, b in self.buffs.items()
-            if BuffHandler.is_attribute_reduction(b, strict=True)
-            and not n.startswith("gg_")
+            n for n in BuffHandler.attribute_reductions(self.buffs, strict=True)
+            if not n.startswith("gg_")
             and "_self" not in n
         ]
 
         if debuffs:
-            replicate = random.sample(debuffs, min(2, len(debuffs)))
-            debug(f"{self.name} replicating debuffs to boss: {[name for name, _ in replicate]}")
-            for name, debuff in replicate:
-                boss.apply_buff(f"replicated_{name}", debuff.copy())
+            replicate = _sample_stacks(self.rng.stream("skill", self.name), self.buffs, debuffs)
+            if tracer.hero_skills:
+                tracer.emit(f"[DEBUG] {self.name} replicating debuffs to boss: {[name for name, _ in replicate]}")
+            _replicate(boss, replicate, "replicated_{}")
+            for name, _ in replicate:
                 logs.append(f"🔁 {self.name} replicates debuff '{name}' to {boss.name}.")
         else:
             logs.append(f"⚠️ {self.name} had no valid attribute debuffs to replicate.")
@@ -108,7 +129,8 @@ class DGN(Hero):
 
     def basic_attack(self, boss, team):
         logs = []
-        debug(f"{self.name} starts BASIC attack")
+        if tracer.hero_skills:
+            tracer.emit(f"[DEBUG] {self.name} starts BASIC attack")
 
         if self.has_fear:
             logs.append(f"{self.name} is feared and cannot perform basic attack.")
@@ -119,16 +141,18 @@ class DGN(Hero):
 
             # First hit (can crit, triggers counter)
             base = self.atk * (12 + self.skill_damage / 100)
-            debug(f"{self.name} basic hit = {base:.2f}")
+            if tracer.hero_skills:
+                tracer.emit(f"[DEBUG] {self.name} basic hit = {base:.2f}")
             attack_logs.extend(hero_deal_damage(
                 self, boss, base,
                 is_active=False, team=team, allow_counter=True, allow_crit=True
             ))
 
             # Bonus hit (can crit, no counter)
-            count = sum(1 for b in boss.buffs.values() if BuffHandler.is_attribute_reduction(b, strict=True))
+            count = len(BuffHandler.attribute_reductions(boss.buffs, strict=True))
             bonus = self.atk * (10 + self.skill_damage / 100) * count
-            debug(f"{self.name} bonus hit = {bonus:.2f} from {count} boss debuffs")
+            if tracer.hero_skills:
+                tracer.emit(f"[DEBUG] {self.name} bonus hit = {bonus:.2f} from {count} boss debuffs")
             if bonus:
                 attack_logs.extend(hero_deal_damage(
                     self, boss, bonus,
@@ -138,7 +162,8 @@ class DGN(Hero):
             # Apply shield to blessed allies
             total = base + bonus
             shield = int(total * 0.5)
-            debug(f"{self.name} grants shields = {shield} to blessed allies")
+            if tracer.hero_skills:
+                tracer.emit(f"[DEBUG] {self.name} grants shields = {shield} to blessed allies")
             buffs_applied = []
             for h in team.heroes:
                 if getattr(h, "bright_blessing", False) and h.is_alive():
@@ -147,19 +172,20 @@ class DGN(Hero):
 
             # Buff replication to allies
             buffs = [
-                (n, b) for n, b in self.buffs.items()
-                if BuffHandler.is_attribute_buff(b, strict=True)
-                and b.get("attribute") != "energy"
+                n for n in BuffHandler.attribute_buffs(self.buffs, strict=True)
+                if self.buffs[n].get("attribute") != "energy"
                 and not n.startswith("gg_")
                 and "_self" not in n
             ]
             if buffs:
-                replicate = random.sample(buffs, min(2, len(buffs)))
-                debug(f"{self.name} replicating buffs: {[name for name, _ in replicate]}")
+                # Copied before writing: DGN may be one of the allies receiving them.
+                copies = _sample_stacks(self.rng.stream("skill", self.name), self.buffs, buffs)
+                if tracer.hero_skills:
+                    tracer.emit(f"[DEBUG] {self.name} replicating buffs: {[name for name, _ in copies]}")
                 for ally in team.heroes:
                     if getattr(ally, "bright_blessing", False) and ally.is_alive():
-                        for name, buff in replicate:
-                            ally.apply_buff(f"replicated_{name}", buff.copy())
+                        _replicate(ally, [(name, dict(buff)) for name, buff in copies], "replicated_{}")
+                        for name, _ in copies:
                             buffs_applied.append((ally.name, f"Replicated {name}"))
             else:
                 attack_logs.append(f"⚠️ {self.name} had no valid attribute buffs to replicate.")
@@ -176,11 +202,11 @@ class DGN(Hero):
             # Remove debuff from bright blessed allies
             for h in team.heroes:
                 if getattr(h, "bright_blessing", False) and h.is_alive():
-                    if random.random() < 0.5:
-                        reducible = [(n, b) for n, b in h.buffs.items() if BuffHandler.is_attribute_reduction(b, strict=True)]
+                    if self.rng.stream("skill", self.name).random() < 0.5:
+                        reducible = h.buffs.each_stack(BuffHandler.attribute_reductions(h.buffs, strict=True))
                         if reducible:
-                            to_remove = random.choice(reducible)
-                            del h.buffs[to_remove[0]]
+                            to_remove = self.rng.stream("skill", self.name).choice(reducible)
+                            h.buffs.remove_stack(*to_remove)
                             attack_logs.append(f"{self.name} removes attribute reduction '{to_remove[0]}' from {h.name}.")
 
             return attack_logs
@@ -191,7 +217,8 @@ class DGN(Hero):
         if self.has_seal_of_light:
             return super().end_of_round(boss, team, round_num)
         logs = super().end_of_round(boss, team, round_num)
-        debug(f"{self.name} ends round with {self.transition_power} TP")
+        if tracer.hero_skills:
+            tracer.emit(f"[DEBUG] {self.name} ends round with {self.transition_power} TP")
 
         if self.transition_power < 12:
             return logs
@@ -212,27 +239,31 @@ class DGN(Hero):
                 "attribute": "control_immunity", "bonus": -50, "rounds": 3
             })
             logs.append(f"{enemy.name} receives -50% ATK, -50 Crit Rate, -50 Control Immunity for 3 rounds.")
-            debug(f"{self.name} applies full debuffs to {enemy.name}")
+            if tracer.hero_skills:
+                tracer.emit(f"[DEBUG] {self.name} applies full debuffs to {enemy.name}")
 
-            debuff_count = sum(1 for b in enemy.buffs.values() if isinstance(b, dict) and BuffHandler.is_attribute_reduction(b, strict=True))
+            debuff_count = len(BuffHandler.attribute_reductions(enemy.buffs, strict=True))
             bonus = self.atk * (20 + self.skill_damage / 100) * debuff_count
-            debug(f"{self.name} deals bonus {bonus:.2f} to {enemy.name} from {debuff_count} debuffs")
+            if tracer.hero_skills:
+                tracer.emit(f"[DEBUG] {self.name} deals bonus {bonus:.2f} to {enemy.name} from {debuff_count} debuffs")
             logs.extend(hero_deal_damage(self, enemy, bonus, is_active=True, team=team, allow_counter=False, allow_crit=False))
 
         target = min(targets, key=lambda e: e.hp if e.is_alive() else float('inf'))
         if target and target.is_alive():
-            count = sum(1 for b in target.buffs.values() if isinstance(b, dict) and BuffHandler.is_attribute_reduction(b, strict=True))
+            count = len(BuffHandler.attribute_reductions(target.buffs, strict=True))
             bonus = self.atk * 6 * count
-            debug(f"{self.name} deals extra {bonus:.2f} to {target.name} based on {count} debuffs")
+            if tracer.hero_skills:
+                tracer.emit(f"[DEBUG] {self.name} deals extra {bonus:.2f} to {target.name} based on {count} debuffs")
             logs.extend(hero_deal_damage(self, target, bonus, is_active=True, team=team, allow_counter=False, allow_crit=False))
 
         top_enemy = max(targets, key=lambda e: e.atk if e.is_alive() else -1)
-        removable = [n for n, d in top_enemy.buffs.items() if isinstance(d, dict) and BuffHandler.is_attribute_buff(d, strict=True)]
+        removable = top_enemy.buffs.each_stack(BuffHandler.attribute_buffs(top_enemy.buffs, strict=True))
         if removable:
-            removed = random.choice(removable)
-            buff = top_enemy.buffs.pop(removed, None)
+            removed, stack = self.rng.stream("skill", self.name).choice(removable)
+            top_enemy.buffs.remove_stack(removed, stack)
             logs.append(f"{self.name} removes buff '{removed}' from {top_enemy.name}.")
-            debug(f"{self.name} removes {removed} from {top_enemy.name}")
+            if tracer.hero_skills:
+                tracer.emit(f"[DEBUG] {self.name} removes {removed} from {top_enemy.name}")
             if hasattr(top_enemy, "recalculate_stats"):
                 top_enemy.recalculate_stats()
 
@@ -250,11 +281,12 @@ class DGN(Hero):
             logs.append("✨ Transition Buffs Applied:")
             logs.extend(group_team_buffs(buffs_applied))
 
-        if random.random() < 0.5:
+        if self.rng.stream("skill", self.name).random() < 0.5:
             for ally in team.heroes:
                 ally.energy += 20
             logs.append("⚡ All allies gain +20 Energy.")
-            debug(f"{self.name} grants +20 energy to all allies")
+            if tracer.hero_skills:
+                tracer.emit(f"[DEBUG] {self.name} grants +20 energy to all allies")
 
         return logs
 
@@ -263,21 +295,24 @@ class DGN(Hero):
             return []
 
         logs = []
-        debug(f"{self.name} receives damage from {source.name} ({getattr(damage, 'source_type', 'unknown')})")
+        if tracer.hero_skills:
+            tracer.emit(f"[DEBUG] {self.name} receives damage from {source.name} ({getattr(damage, 'source_type', 'unknown')})")
 
         if getattr(source, "is_alive", lambda: False)() and hasattr(damage, "source_type") and damage.source_type in ["basic", "active"]:
             logs.append(f"{self.name} retaliates against {source.name} for using {damage.source_type} skill.")
             logs.extend(hero_deal_damage(self, source, self.atk * 10, is_active=False, team=team, allow_counter=False, allow_crit=False))
             source.apply_buff("crit_down", {"attribute": "crit_rate", "bonus": -28, "rounds": 2})
             source.apply_buff("atk_down", {"attribute": "atk", "bonus": -0.06, "rounds": 4})
-            debug(f"{self.name} applies -28 Crit Rate and -6% ATK to {source.name}")
+            if tracer.hero_skills:
+                tracer.emit(f"[DEBUG] {self.name} applies -28 Crit Rate and -6% ATK to {source.name}")
 
             for ally in team.heroes:
                 if ally != self and getattr(ally, "bright_blessing", False) and ally.is_alive():
                     logs.append(f"{ally.name} retaliates against {source.name} for being hit.")
                     logs.extend(hero_deal_damage(ally, source, ally.atk * 10, is_active=False, team=team, allow_counter=False, allow_crit=False))
                     source.apply_buff("crit_down", {"attribute": "crit_rate", "bonus": -28, "rounds": 2})
-                    debug(f"{ally.name} applies -28 Crit Rate to {source.name}")
+                    if tracer.hero_skills:
+                        tracer.emit(f"[DEBUG] {ally.name} applies -28 Crit Rate to {source.name}")
 
         if not self.fluorescent_triggered and self.hp / self.max_hp < 0.5:
             self.fluorescent_triggered = True
@@ -289,7 +324,8 @@ class DGN(Hero):
             self.apply_buff("damage_reduction_up", {"attribute": "DR", "bonus": 0.30, "rounds": 2})
             self.apply_buff("healing_received_up", {"attribute": "healing_received", "bonus": 0.50, "rounds": 2})
             logs.append(f"{self.name} activates Fluorescent Shield: heals {self.format_damage_log(heal)}, gains {self.format_damage_log(actual)} shield, +20% holy damage.")
-            debug(f"{self.name} triggers Fluorescent Shield: heal {heal}, shield {actual}")
+            if tracer.hero_skills:
+                tracer.emit(f"[DEBUG] {self.name} triggers Fluorescent Shield: heal {heal}, shield {actual}")
 
         for ally in team.heroes:
             if getattr(ally, "bright_blessing", False) and not getattr(ally, "fluorescent_triggered", False):
@@ -303,7 +339,8 @@ class DGN(Hero):
                     ally.apply_buff("damage_reduction_up", {"attribute": "DR", "bonus": 0.30, "rounds": 2})
                     ally.apply_buff("healing_received_up", {"attribute": "healing_received", "bonus": 0.50, "rounds": 2})
                     logs.append(f"{ally.name} activates Fluorescent Shield: heals {self.format_damage_log(heal)}, gains {self.format_damage_log(actual)} shield, +20% holy damage.")
-                    debug(f"{ally.name} triggers Fluorescent Shield: heal {heal}, shield {actual}")
+                    if tracer.hero_skills:
+                        tracer.emit(f"[DEBUG] {ally.name} triggers Fluorescent Shield: heal {heal}, shield {actual}")
 
         return logs
 
@@ -315,17 +352,18 @@ class DGN(Hero):
 
         # Identify debuffs on the target
         debuffs = [
-            (n, b) for n, b in target.buffs.items()
-            if BuffHandler.is_attribute_reduction(b, strict=True)
-            and not n.startswith("gg_")
+            n for n in BuffHandler.attribute_reductions(target.buffs, strict=True)
+            if not n.startswith("gg_")
             and "_self" not in n
         ]
 
         if debuffs:
-            replicate = random.sample(debuffs, min(2, len(debuffs)))
-            debug(f"{self.name} after_attack replicating to {target.name}: {[name for name, _ in replicate]}")
-            for name, debuff in replicate:
-                target.apply_buff(f"replicated_{name}_from_dgn", debuff.copy())
+            # Copied before writing: the sample may hold both X and replicated_X_from_dgn.
+            copies = _sample_stacks(self.rng.stream("skill", self.name), target.buffs, debuffs)
+            if tracer.hero_skills:
+                tracer.emit(f"[DEBUG] {self.name} after_attack replicating to {target.name}: {[name for name, _ in copies]}")
+            _replicate(target, copies, "replicated_{}_from_dgn")
+            for name, _ in copies:
                 logs.append(f"🔁 {self.name} replicates debuff '{name}' again onto {target.name}.")
         else:
             logs.append(f"⚠️ {self.name} found no valid debuffs to replicate onto {target.name}.")
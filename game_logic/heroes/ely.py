@@ -1,14 +1,15 @@
 from .base import Hero
-import random
 from game_logic.buff_handler import BuffHandler
 from game_logic.damage_utils import hero_deal_damage
 from utils.log_utils import stylize_log
 
 class ELY(Hero):
+    __slots__ = ()
+
     def __init__(self, name, hp, atk, armor, spd, crit_rate, crit_dmg, ctrl_immunity, hd, precision,
-                 purify_enable=None, trait_enable=None, artifact=None, lifestar=None):
+                 purify_enable=None, trait_enable=None, artifact=None, lifestar=None, rng=None):
         super().__init__(name, hp, atk, armor, spd, crit_rate, crit_dmg, ctrl_immunity, hd, precision,
-                         purify_enable, trait_enable, artifact, lifestar=lifestar)
+                         purify_enable, trait_enable, artifact, lifestar=lifestar, rng=rng)
 
     def active_skill(self, boss, team):
         logs = [stylize_log("damage", f"{self.name} uses active skill.")]
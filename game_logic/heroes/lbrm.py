@@ -1,17 +1,18 @@
 from .base import Hero
-import random
 from game_logic.buff_handler import BuffHandler
 from game_logic.damage_utils import hero_deal_damage
 from game_logic.control_effects import clear_control_effect
-from utils.log_utils import group_team_buffs
-from utils.log_utils import debug
+from utils.log_utils import ControlLine, group_team_buffs
+from utils.trace import tracer
 
 
 class LBRM(Hero):
+    __slots__ = ("power_of_dream", "ctrl_removal_limit", "ctrl_removal_used")
+
     def __init__(self, name, hp, atk, armor, spd, crit_rate, crit_dmg, ctrl_immunity, hd, precision,
-                 purify_enable=None, trait_enable=None, artifact=None, lifestar=None):
+                 purify_enable=None, trait_enable=None, artifact=None, lifestar=None, rng=None):
         super().__init__(name, hp, atk, armor, spd, crit_rate, crit_dmg, ctrl_immunity, hd, precision,
-                         purify_enable, trait_enable, artifact, lifestar=lifestar)
+                         purify_enable, trait_enable, artifact, lifestar=lifestar, rng=rng)
         self.transition_power = 0
         self.power_of_dream = 0
         self.ctrl_removal_limit = 1
@@ -26,7 +27,8 @@ class LBRM(Hero):
         # Re-check the status just before acting
         currently_afflicted = getattr(self, f"has_{effect}", False)
 
-        print(f"[DEBUG-LBRM-CHECK] handle_self_control_removal: {effect} → Wings={self.wings_effect}, Used={self.ctrl_removal_used}, Seal={self.has_seal_of_light}, EffectPresent={currently_afflicted}")
+        if tracer.control_cleansing:
+            tracer.emit(f"[DEBUG-LBRM-CHECK] handle_self_control_removal: {effect} → Wings={self.wings_effect}, Used={self.ctrl_removal_used}, Seal={self.has_seal_of_light}, EffectPresent={currently_afflicted}")
 
         if (
             self.wings_effect
@@ -37,10 +39,11 @@ class LBRM(Hero):
             logs.append(clear_control_effect(self, effect))
             self.ctrl_removal_used = True
             self.energy += 30
-            logs.append(f"🪽 {self.name} removes {effect.replace('_', ' ').title()} from herself (Mirror Wings). +30 Energy.")
-            print(f"[DEBUG-CLEANSE] {self.name} successfully cleansed {effect} (Mirror Wings). Energy now {self.energy}.")
-        else:
-            print(f"[DEBUG-CLEANSE] {self.name} failed cleanse attempt → Wings={self.wings_effect}, Used={self.ctrl_removal_used}, Seal={self.has_seal_of_light}, EffectPresent={currently_afflicted}")
+            logs.append(ControlLine("🪽 {} removes {} from herself (Mirror Wings). +30 Energy.", self.name, effect.replace('_', ' ').title()))
+            if tracer.control_cleansing:
+                tracer.emit(f"[DEBUG-CLEANSE] {self.name} successfully cleansed {effect} (Mirror Wings). Energy now {self.energy}.")
+        elif tracer.control_cleansing:
+            tracer.emit(f"[DEBUG-CLEANSE] {self.name} failed cleanse attempt → Wings={self.wings_effect}, Used={self.ctrl_removal_used}, Seal={self.has_seal_of_light}, EffectPresent={currently_afflicted}")
 
         return logs
 
@@ -67,12 +70,13 @@ class LBRM(Hero):
         self.power_of_dream += 1
 
         logs.append(clear_control_effect(target, effect))
-        logs.append(f"🪽 {self.name} removes {effect.replace('_', ' ').title()} from {target.name} (manual Wings). Shield granted, +1 Power of Dream.")
+        logs.append(ControlLine("🪽 {} removes {} from {} (manual Wings). Shield granted, +1 Power of Dream.", self.name, effect.replace('_', ' ').title(), target.name))
 
         actual = target.add_shield(int(self.atk * 15))
         logs.append(f"🛡️ {target.name} gains {actual // 1_000_000}M shield (capped).")
 
-        print(f"[DEBUG-CLEANSE] {self.name} triggered cleanse on ally: 🪽 {self.name} removes {effect} from {target.name} (Wings). +1 Power of Dream, shield granted.")
+        if tracer.control_cleansing:
+            tracer.emit(f"[DEBUG-CLEANSE] {self.name} triggered cleanse on ally: 🪽 {self.name} removes {effect} from {target.name} (Wings). +1 Power of Dream, shield granted.")
 
         return logs
 
@@ -110,7 +114,8 @@ class LBRM(Hero):
 
         def do_attack():
             logs = []
-            debug(f"{self.name} starts BASIC attack")
+            if tracer.hero_skills:
+                tracer.emit(f"[DEBUG] {self.name} starts BASIC attack")
 
             logs.extend(hero_deal_damage(
                 self, boss, self.atk * (10 + self.skill_damage / 100),
@@ -128,7 +133,8 @@ class LBRM(Hero):
         if self.has_seal_of_light:
             return []
 
-        debug(f"{self.name} starts ACTIVE SKILL")
+        if tracer.hero_skills:
+            tracer.emit(f"[DEBUG] {self.name} starts ACTIVE SKILL")
 
         self.ctrl_removal_limit = min(2, self.ctrl_removal_limit + 1)
         logs = []
@@ -195,7 +201,7 @@ class LBRM(Hero):
 
         logs.append(f"💥 Deals {damage_to_deal / 1e6:.0f}M damage to Boss.")
 
-        option = random.choice([1, 2, 3])
+        option = self.rng.stream("skill", self.name).choice([1, 2, 3])
         buffs_applied = []
 
         if option == 1:
@@ -254,23 +260,25 @@ class LBRM(Hero):
     def passive_trigger(self, ally, boss, team):
         logs = []
 
-        print(f"[DEBUG-LBRM-PASSIVE] Attempting cleanse for {ally.name} → Seal={self.has_seal_of_light}, Energy={self.energy}")
+        if tracer.control_cleansing:
+            tracer.emit(f"[DEBUG-LBRM-PASSIVE] Attempting cleanse for {ally.name} → Seal={self.has_seal_of_light}, Energy={self.energy}")
 
         if self.has_seal_of_light:
             return logs
 
         # Skip if ally has Dream Magic Wings with control removal stacks available
         if any(getattr(ally, f"has_{e}", False) and getattr(ally, "extra_ctrl_removals", 0) > 0 for e in ["fear", "silence", "seal_of_light"]):
-            print(f"[DEBUG-LBRM-PASSIVE] Skipping cleanse for {ally.name} — Effect present & Wings stack available")
+            if tracer.control_cleansing:
+                tracer.emit(f"[DEBUG-LBRM-PASSIVE] Skipping cleanse for {ally.name} — Effect present & Wings stack available")
             return logs
 
 
         if any([ally.has_silence, ally.has_fear, ally.has_seal_of_light]) and self.energy >= 30:
             effects = [e for e in ["silence", "fear", "seal_of_light"] if getattr(ally, f"has_{e}", False)]
             if effects:
-                chosen = random.choice(effects)
+                chosen = self.rng.stream("skill", self.name).choice(effects)
                 logs.append(clear_control_effect(ally, chosen))
-                logs.append(f"🪽 {self.name} removes {chosen.replace('_', ' ').title()} from {ally.name} (Wings). +1 Power of Dream, shield granted.")
+                logs.append(ControlLine("🪽 {} removes {} from {} (Wings). +1 Power of Dream, shield granted.", self.name, chosen.replace('_', ' ').title(), ally.name))
                 self.power_of_dream += 1
                 shield_value = int(self.atk * 15)
                 actual = ally.add_shield(shield_value)
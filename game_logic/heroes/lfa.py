@@ -1,23 +1,23 @@
 from .base import Hero
 from game_logic.damage_utils import hero_deal_damage
-import random
 from math import floor
 from game_logic.buff_handler import BuffHandler
-from utils.log_utils import debug
+from utils.trace import tracer
 
 
 class LFA(Hero):
+    __slots__ = ()
+
     def __init__(self, name, hp, atk, armor, spd, crit_rate, crit_dmg, ctrl_immunity, hd, precision,
-                 purify_enable=None, trait_enable=None, artifact=None, lifestar=None):
+                 purify_enable=None, trait_enable=None, artifact=None, lifestar=None, rng=None):
         super().__init__(name, hp, atk, armor, spd, crit_rate, crit_dmg, ctrl_immunity, hd, precision,
-                         purify_enable, trait_enable, artifact, lifestar=lifestar)
+                         purify_enable, trait_enable, artifact, lifestar=lifestar, rng=rng)
         self.transition_power = 0
 
     def add_or_update_buff(self, hero, buff_name, buff_data):
         if buff_name in hero.buffs:
-            existing = hero.buffs[buff_name]
             if "bonus" in buff_data:
-                existing["bonus"] += buff_data.get("bonus", 0)
+                hero.buffs.add_bonus(buff_name, buff_data.get("bonus", 0))
         else:
             hero.apply_buff(buff_name, buff_data)
    
@@ -27,7 +27,8 @@ class LFA(Hero):
         if self.has_silence:
             logs.append(f"{self.name} is silenced and cannot use active skill.")
             return logs
-        debug(f"{self.name} starts ACTIVE skill")
+        if tracer.hero_skills:
+            tracer.emit(f"[DEBUG] {self.name} starts ACTIVE skill")
 
         hit_list = []
 
@@ -68,8 +69,7 @@ class LFA(Hero):
         )
 
         # Step 6: Buffs and debuffs
-        unique_name = f"lfa_atk_down_active_{random.randint(0, 999999)}"
-        logs.extend(BuffHandler.apply_debuff(boss, unique_name, {
+        logs.extend(BuffHandler.apply_debuff(boss, "lfa_atk_down_active", {
             "attribute": "atk", "bonus": -0.30, "rounds": 9999
         }))
         steal_amount = int(boss.atk * 0.30)
@@ -94,7 +94,8 @@ class LFA(Hero):
 
         def do_attack():
             logs = []
-            debug(f"{self.name} starts BASIC attack")
+            if tracer.hero_skills:
+                tracer.emit(f"[DEBUG] {self.name} starts BASIC attack")
 
 
             # ✅ Main basic hit triggers counter
@@ -2,9 +2,11 @@ from .base import Hero
 from game_logic.buff_handler import BuffHandler
 from game_logic.damage_utils import hero_deal_damage
 from utils.log_utils import group_team_buffs
-from utils.log_utils import debug
+from utils.trace import tracer
 
 class MFF(Hero):
+    __slots__ = ("evolutionary_factor", "permanent_ef3_bonus_active")
+
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
         self.evolutionary_factor = 0
@@ -14,7 +16,7 @@ class MFF(Hero):
         if buff_name in hero.buffs:
             existing = hero.buffs[buff_name]
             if "bonus" in buff_data:
-                existing["bonus"] += buff_data.get("bonus", 0)
+                hero.buffs.add_bonus(buff_name, buff_data.get("bonus", 0))
             if "heal_amount" in buff_data:
                 existing["heal_amount"] += buff_data.get("heal_amount", 0)
             if "shield" in buff_data:
@@ -27,7 +29,8 @@ class MFF(Hero):
         if self.has_silence:
             logs.append(f"{self.name} is silenced and cannot use active skill.")
             return logs
-        debug(f"{self.name} starts ACTIVE skill")
+        if tracer.hero_skills:
+            tracer.emit(f"[DEBUG] {self.name} starts ACTIVE skill")
 
 
         # ✅ Counterattack allowed here
@@ -44,10 +47,8 @@ class MFF(Hero):
         }))
 
         # Remove ALL ATK and HD buffs from boss
-        atk_buffs = [name for name, data in boss.buffs.items()
-                    if isinstance(data, dict) and data.get("attribute") == "atk"]
-        hd_buffs = [name for name, data in boss.buffs.items()
-                    if isinstance(data, dict) and data.get("attribute") == "HD"]
+        atk_buffs = boss.buffs.named("atk")
+        hd_buffs = boss.buffs.named("HD")
 
         for buff_name in atk_buffs:
             buff = boss.buffs.pop(buff_name, None)
@@ -80,7 +81,8 @@ class MFF(Hero):
 
         def do_attack():
             logs = []
-            debug(f"{self.name} starts BASIC attack")
+            if tracer.hero_skills:
+                tracer.emit(f"[DEBUG] {self.name} starts BASIC attack")
 
 
             # ✅ Main hit — counterattack should occur
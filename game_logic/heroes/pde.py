@@ -1,17 +1,18 @@
 from .base import Hero
-import random
 from game_logic.damage_utils import hero_deal_damage
 from game_logic.buff_handler import BuffHandler
 from game_logic.control_effects import clear_control_effect
-from utils.log_utils import group_team_buffs
-from utils.log_utils import debug
+from utils.log_utils import ControlLine, group_team_buffs
+from utils.trace import tracer
 
 
 class PDE(Hero):
+    __slots__ = ("triggered_this_round",)
+
     def __init__(self, name, hp, atk, armor, spd, crit_rate, crit_dmg, ctrl_immunity, hd, precision,
-                 purify_enable=None, trait_enable=None, artifact=None, lifestar=None):
+                 purify_enable=None, trait_enable=None, artifact=None, lifestar=None, rng=None):
         super().__init__(name, hp, atk, armor, spd, crit_rate, crit_dmg, ctrl_immunity, hd, precision,
-                         purify_enable, trait_enable, artifact, lifestar=lifestar)
+                         purify_enable, trait_enable, artifact, lifestar=lifestar, rng=rng)
         self.transition_power = 0
         self.energy = 0
         self.triggered_this_round = False
@@ -23,7 +24,7 @@ class PDE(Hero):
                 existing["layers"] = min(existing.get("layers", 0) + buff_data.get("layers", 0), 3)
 
             if "bonus" in buff_data:
-                existing["bonus"] += buff_data.get("bonus", 0)
+                hero.buffs.add_bonus(buff_name, buff_data.get("bonus", 0))
             if "heal_amount" in buff_data:
                 existing["heal_amount"] += buff_data.get("heal_amount", 0)
         else:
@@ -34,7 +35,8 @@ class PDE(Hero):
         if self.has_silence:
             logs.append(f"{self.name} is silenced and cannot use active skill.")
             return logs
-        debug(f"{self.name} starts ACTIVE skill")
+        if tracer.hero_skills:
+            tracer.emit(f"[DEBUG] {self.name} starts ACTIVE skill")
 
         # ✅ Damage should trigger counterattack
         logs.extend(hero_deal_damage(
@@ -64,7 +66,8 @@ class PDE(Hero):
 
         def do_attack():
             logs = []
-            debug(f"{self.name} starts BASIC attack")
+            if tracer.hero_skills:
+                tracer.emit(f"[DEBUG] {self.name} starts BASIC attack")
 
             # ✅ Main hit triggers counterattack
             logs.extend(hero_deal_damage(
@@ -104,7 +107,7 @@ class PDE(Hero):
                 effects.append("seal_of_light")
 
             if effects:
-                chosen = random.choice(effects)
+                chosen = self.rng.stream("skill", self.name).choice(effects)
                 logs.append(clear_control_effect(h, chosen))
                 cleanse_logs.append(f"{h.name}: Cleansed {chosen.replace('_', ' ').title()}")
 
@@ -121,7 +124,7 @@ class PDE(Hero):
         logs.append(f"{self.name} reduces {boss.name}'s speed by 12 for 2 rounds.")
 
         if cleanse_logs:
-            logs.append("🧹 PDE cleanses: " + ", ".join(cleanse_logs))
+            logs.append(ControlLine("🧹 PDE cleanses: {}", ", ".join(cleanse_logs)))
         if buff_logs:
             logs.append("✨ PDE buffs: " + ", ".join(buff_logs))
 
@@ -140,7 +143,7 @@ class PDE(Hero):
                 logs.append(f"{self.name} is struck by a {attack_type.lower()} skill and triggers transition skill.")
                 logs.extend(self.release_transition_skill(team, self.transition_power, attacker))
             else:
-                if not self.triggered_this_round and random.random() < 0.8:
+                if not self.triggered_this_round and self.rng.stream("skill", self.name).random() < 0.8:
                     self.transition_power += 1
                     logs.append(f"{self.name} gains 1 layer of Transition Power (now {self.transition_power}).")
             self.triggered_this_round = True
@@ -168,8 +171,9 @@ class PDE(Hero):
             actual_target = target.hp - before_target
             self._healing_done += actual_self
             target._healing_done += actual_target
-            debug(f"{self.name} transition heals {self.name} for {actual_self} HP ({actual_self / 1e6:.1f}M)")
-            debug(f"{self.name} transition heals {target.name} for {actual_target} HP ({actual_target / 1e6:.1f}M)")
+            if tracer.hero_skills:
+                tracer.emit(f"[DEBUG] {self.name} transition heals {self.name} for {actual_self} HP ({actual_self / 1e6:.1f}M)")
+                tracer.emit(f"[DEBUG] {self.name} transition heals {target.name} for {actual_target} HP ({actual_target / 1e6:.1f}M)")
             logs.append(f"🩹 PDE heals: {self.name} & {target.name} for {heal_amt // 1_000_000}M each.")
 
             buffs_applied = []
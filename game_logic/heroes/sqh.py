@@ -1,16 +1,17 @@
 from .base import Hero
-import random
 from game_logic.buff_handler import BuffHandler
 from game_logic.damage_utils import hero_deal_damage
 from utils.log_utils import group_team_buffs
-from utils.log_utils import debug
+from utils.trace import tracer
 
 
 class SQH(Hero):
+    __slots__ = ("abyssal_corruption",)
+
     def __init__(self, name, hp, atk, armor, spd, crit_rate, crit_dmg, ctrl_immunity, hd, precision,
-                 purify_enable=None, trait_enable=None, artifact=None, lifestar=None):
+                 purify_enable=None, trait_enable=None, artifact=None, lifestar=None, rng=None):
         super().__init__(name, hp, atk, armor, spd, crit_rate, crit_dmg, ctrl_immunity, hd, precision,
-                         purify_enable, trait_enable, artifact, lifestar=lifestar)
+                         purify_enable, trait_enable, artifact, lifestar=lifestar, rng=rng)
         self.transition_power = 0
         self.queens_guard = False
         self.abyssal_corruption = 0
@@ -55,7 +56,8 @@ class SQH(Hero):
         if self.has_silence:
             logs.append(f"{self.name} is silenced and cannot use active skill.")
             return logs
-        debug(f"{self.name} starts ACTIVE skill")
+        if tracer.hero_skills:
+            tracer.emit(f"[DEBUG] {self.name} starts ACTIVE skill")
 
         dmg = self.atk * (18 + self.skill_damage / 100)
         logs.extend(hero_deal_damage(self, boss, dmg, is_active=True, team=team, allow_counter=True, allow_crit=True))
@@ -67,7 +69,7 @@ class SQH(Hero):
         effects.append("Bleed")
 
         boss.abyssal_corruption = getattr(boss, "abyssal_corruption", 0) + 1
-        if random.random() < 0.25:
+        if self.rng.stream("skill", self.name).random() < 0.25:
             boss.abyssal_corruption += 1
             effects.append("Abyssal Corruption +2")
         else:
@@ -104,7 +106,8 @@ class SQH(Hero):
 
         def do_attack():
             logs = []
-            debug(f"{self.name} starts BASIC attack")
+            if tracer.hero_skills:
+                tracer.emit(f"[DEBUG] {self.name} starts BASIC attack")
 
             # ✅ Main hit — should allow counter
             dmg = self.atk * (12 + self.skill_damage / 100)
@@ -180,7 +183,7 @@ class SQH(Hero):
                 buffs_applied.append((ally.name, f"+{val}% {attr}"))
 
             if ally != self:
-                _, msg = BuffHandler.apply_buff(ally, f"transition_energy_{random.randint(1000,9999)}", {
+                _, msg = BuffHandler.apply_buff(ally, "transition_energy", {
                     "attribute": "energy", "bonus": 20, "rounds": 0
                 }, boss=boss)
                 if msg:
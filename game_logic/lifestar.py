@@ -1,4 +1,3 @@
-import random
 from game_logic.buff_handler import BuffHandler
 from utils.log_utils import group_team_buffs
 from game_logic.damage_utils import apply_burn
@@ -72,8 +71,8 @@ class Nova:
             return logs
 
         highest_hp_target = max(enemies, key=lambda e: e.hp)
-        blazing_targets = [e for e in enemies if any(b.get("attribute") == "blazing_nova" for b in e.buffs.values())]
-        random_blazing = random.choice(blazing_targets) if blazing_targets else None
+        blazing_targets = [e for e in enemies if e.is_blazing]
+        random_blazing = hero.rng.stream("lifestar", hero.name).choice(blazing_targets) if blazing_targets else None
 
         for target in [highest_hp_target, random_blazing]:
             if target:
@@ -89,21 +88,21 @@ class Nova:
 
         for enemy in enemies:
             logs.extend(apply_burn(enemy, int(hero.max_hp * 0.33), 3, source=hero, label="Nova Burst DOT"))
-            if any(b.get("attribute") == "blazing_nova" for b in enemy.buffs.values()):
+            if enemy.is_blazing:
                 logs.extend(apply_burn(enemy, int(hero.max_hp * 0.33), 3, source=hero, label="Bonus Nova DOT"))
 
         hero.energy += 100
         logs.append(f"⚡ {hero.name} gains +100 Energy from Nova Burst.")
 
         alive_allies = [h for h in team.heroes if h.is_alive() and h != hero]
-        chosen = random.sample(alive_allies, min(4, len(alive_allies)))
+        chosen = hero.rng.stream("lifestar", hero.name).sample(alive_allies, min(4, len(alive_allies)))
         for ally in chosen:
             for _ in range(3):
-                BuffHandler.apply_buff(ally, f"nova_heal_{random.randint(1000,9999)}", {
+                BuffHandler.apply_buff(ally, "nova_heal", {
                     "attribute": "regen",
                     "heal_amount": int(hero.max_hp * 0.33),
                     "rounds": 1
-                })
+                }, stack=True)
                 logs.append(f"🢕 {ally.name} receives 33% Max HP healing from Nova Burst.")
 
         return logs
@@ -112,7 +111,7 @@ class Nova:
         logs = []
         if not attacker.is_alive():
             return logs
-        if any(b.get("attribute") == "blazing_nova" for b in attacker.buffs.values()):
+        if attacker.is_blazing:
             logs.append(f"🔥 {attacker.name} has Blazing Nova and triggers retaliation.")
             logs.extend(apply_burn(attacker, int(hero.max_hp * 0.33), 2, source=hero, label="Nova Retaliation DOT"))
             self.burn_retaliation_count += 1
@@ -146,7 +145,7 @@ class Specter:
                 buffs_applied.append((hero.name, "+15% ADD and +20% ADR"))
                 eligible_allies = [h for h in team.heroes if h != hero and h.is_alive()]
                 if eligible_allies:
-                    target = random.choice(eligible_allies)
+                    target = hero.rng.stream("lifestar", hero.name).choice(eligible_allies)
                     BuffHandler.apply_buff(target, "specter_passive_add_ally", {"attribute": "all_damage_dealt", "bonus": 15, "rounds": 1})
                     BuffHandler.apply_buff(target, "specter_passive_adr_ally", {"attribute": "ADR", "bonus": 20, "rounds": 1})
                     buffs_applied.append((target.name, "+15% ADD and +20% ADR"))
@@ -168,22 +167,23 @@ class Specter:
         from collections import defaultdict
         attr_reduction_groups = defaultdict(list)
 
-        # 🔎 Collect all negative attribute reductions
-        for name, data in hero.buffs.items():
-            if isinstance(data, dict) and "attribute" in data and "bonus" in data and data["bonus"] < 0:
-                attr_reduction_groups[data["attribute"]].append((name, data))
+        # 🔎 Collect all negative attribute reductions, one entry per stack
+        for name in hero.buffs.negatives():
+            data = hero.buffs[name]
+            if "attribute" in data and "bonus" in data:
+                attr_reduction_groups[data["attribute"]].extend(hero.buffs.each_stack([name]))
 
         converted_attrs = []
 
         # ✅ Convert 1 single debuff
         if attr_reduction_groups:
-            chosen_attr = random.choice(list(attr_reduction_groups.keys()))
+            chosen_attr = hero.rng.stream("lifestar", hero.name).choice(list(attr_reduction_groups.keys()))
             debuff_list = attr_reduction_groups[chosen_attr]
-            debuff_name, debuff_data = random.choice(debuff_list)
-            hero.buffs.pop(debuff_name)
+            debuff_name, stack = hero.rng.stream("lifestar", hero.name).choice(debuff_list)
+            debuff_data = hero.buffs.remove_stack(debuff_name, stack)
+            duration = debuff_data.get("rounds", 2)
 
             bonus = abs(debuff_data["bonus"])
-            duration = debuff_data.get("rounds", 2)
             is_percent = isinstance(debuff_data["bonus"], float) and abs(debuff_data["bonus"]) < 1.0
 
             buff_data = {
@@ -200,14 +200,14 @@ class Specter:
 
         # 🎲 30% chance to convert another single debuff
         remaining_attrs = [attr for attr in attr_reduction_groups if attr not in converted_attrs]
-        if remaining_attrs and random.random() < 0.3:
-            second_attr = random.choice(remaining_attrs)
+        if remaining_attrs and hero.rng.stream("lifestar", hero.name).random() < 0.3:
+            second_attr = hero.rng.stream("lifestar", hero.name).choice(remaining_attrs)
             debuff_list = attr_reduction_groups[second_attr]
-            debuff_name, debuff_data = random.choice(debuff_list)
-            hero.buffs.pop(debuff_name)
+            debuff_name, stack = hero.rng.stream("lifestar", hero.name).choice(debuff_list)
+            debuff_data = hero.buffs.remove_stack(debuff_name, stack)
+            duration = debuff_data.get("rounds", 2)
 
             bonus = abs(debuff_data["bonus"])
-            duration = debuff_data.get("rounds", 2)
             is_percent = isinstance(debuff_data["bonus"], float) and abs(debuff_data["bonus"]) < 1.0
 
             buff_data = {
@@ -248,7 +248,7 @@ class Specter:
         logs.append(f"🌠 {hero.name}'s **Specter** triggers a Star Soul Skill.")
         self.star_soul_count += 1
 
-        effect = random.choice(["energy", "add", "adr"])
+        effect = hero.rng.stream("lifestar", hero.name).choice(["energy", "add", "adr"])
         logs.extend(self.apply_effect(effect, hero, team))
 
         if self.star_soul_count >= 3:
@@ -328,7 +328,7 @@ class Specter:
 
         eligible_allies = [h for h in team.heroes if h != hero and h.is_alive()]
         if eligible_allies:
-            target = random.choice(eligible_allies)
+            target = hero.rng.stream("lifestar", hero.name).choice(eligible_allies)
             BuffHandler.apply_buff(target, f"specter_burst_add_ally_{round_num}", {"attribute": "all_damage_dealt", "bonus": 15, "rounds": 1})
             buffs_applied.append((target.name, "+15% ADD"))
             BuffHandler.apply_buff(target, f"specter_burst_adr_ally_{round_num}", {"attribute": "ADR", "bonus": 20, "rounds": 1})
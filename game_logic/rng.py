@@ -0,0 +1,67 @@
+# game_logic/rng.py
+import random
+
+
+class BattleRNG(random.Random):
+    """Random stream owned by one battle.
+
+    The Team and Boss of a battle share a single instance and every roll in
+    game_logic goes through it, so a battle can be replayed exactly from its
+    seed and parallel workers never touch the module-global ``random`` state.
+
+    Rolls are drawn from ``rng.stream(purpose, key)``. Normally that is the
+    battle stream itself. With ``split=True`` each purpose (and key, e.g. the
+    hero rolling) gets its own stream derived from the seed, so two builds run
+    on the same seed keep their crits, dodges and resists lined up even when
+    one of them rolls more often for something else (common random numbers).
+    """
+
+    def __init__(self, seed=None, split=False):
+        if seed is None:
+            seed = random.randrange(2**63)
+        self.seed_value = seed
+        self.split = split
+        super().__init__(seed)
+
+    def seed(self, a=None, version=2):
+        super().seed(a, version)
+        self.seed_value = a
+        self._streams = {}
+
+    def stream(self, purpose, key=None):
+        """The stream for rolls of one ``purpose`` ("crit", "dodge", ...)."""
+        if not self.split:
+            return self
+        name = (purpose, key)
+        stream = self._streams.get(name)
+        if stream is None:
+            stream = self._streams[name] = random.Random(f"{self.seed_value}:{purpose}:{key}")
+        return stream
+
+    def __reduce__(self):
+        # random.Random pickles as (cls, (), state), which would draw a fresh
+        # seed in __init__ and lose seed_value.
+        streams = {name: stream.getstate() for name, stream in self._streams.items()}
+        return self.__class__, (self.seed_value, self.split), (self.getstate(), streams)
+
+    def __setstate__(self, state):
+        main, streams = state
+        self.setstate(main)
+        for (purpose, key), stream_state in streams.items():
+            self.stream(purpose, key).setstate(stream_state)
+
+
+class _GlobalRNG:
+    """Stand-in for objects built without a BattleRNG: the module-level ``random``, one stream."""
+
+    def __getattr__(self, name):
+        return getattr(random, name)
+
+    def stream(self, purpose, key=None):
+        return self
+
+    def __reduce__(self):
+        return "GLOBAL_RNG"
+
+
+GLOBAL_RNG = _GlobalRNG()
@@ -0,0 +1,103 @@
+# game_logic/status.py
+"""Status flags the damage pipeline reads on every hit.
+
+Hero and Boss mix in StatusView. Each flag is answered by an index that is
+kept up to date as buffs and DoTs change: the BuffBook attribute index for
+buffs, and EffectList's per-attribute counts for ``poison_effects``. Reading
+a flag costs the same however many buffs or DoTs the unit carries.
+"""
+
+
+def _kind(effect):
+    return effect.get("attribute") if isinstance(effect, dict) else None
+
+
+class EffectList(list):
+    """A DoT list (``poison_effects``) that counts its entries by ``attribute``.
+
+    Entries are dicts; their ``attribute`` must not be changed in place.
+    """
+    __slots__ = ("_kinds",)
+
+    def __init__(self, effects=()):
+        super().__init__()
+        self._kinds = {}
+        self.extend(effects)
+
+    def __reduce__(self):
+        return EffectList, (list(self),)
+
+    def _count(self, effect, step):
+        kind = _kind(effect)
+        left = self._kinds.get(kind, 0) + step
+        if left:
+            self._kinds[kind] = left
+        else:
+            self._kinds.pop(kind, None)
+
+    def has(self, attribute):
+        return attribute in self._kinds
+
+    def append(self, effect):
+        super().append(effect)
+        self._count(effect, 1)
+
+    def insert(self, index, effect):
+        super().insert(index, effect)
+        self._count(effect, 1)
+
+    def extend(self, effects):
+        for effect in effects:
+            self.append(effect)
+
+    def __iadd__(self, effects):
+        self.extend(effects)
+        return self
+
+    def remove(self, effect):
+        super().remove(effect)
+        self._count(effect, -1)
+
+    def pop(self, index=-1):
+        effect = super().pop(index)
+        self._count(effect, -1)
+        return effect
+
+    def clear(self):
+        super().clear()
+        self._kinds.clear()
+
+    def _recount(self):
+        self._kinds.clear()
+        for effect in self:
+            self._count(effect, 1)
+
+    def __setitem__(self, index, value):
+        super().__setitem__(index, value)
+        self._recount()
+
+    def __delitem__(self, index):
+        super().__delitem__(index)
+        self._recount()
+
+
+class StatusView:
+    __slots__ = ()
+
+    @property
+    def is_poisoned(self):
+        return self.buffs.has("poison")
+
+    @property
+    def is_burning(self):
+        # process_poison drops a DoT once its rounds run out, so any listed burn is live.
+        return self.poison_effects.has("burn")
+
+    @property
+    def is_blazing(self):
+        return self.buffs.has("blazing_nova")
+
+    @property
+    def crit_taken_bonus(self):
+        """Extra crit damage taken, in percent, from ``crit_damage_taken`` debuffs."""
+        return self.buffs.total("crit_damage_taken")
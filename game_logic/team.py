@@ -1,19 +1,17 @@
+from collections import Counter
 from game_logic.foresight import apply_foresight 
 from game_logic.heroes.mff import MFF
 from game_logic.buff_handler import grant_energy, BuffHandler
-from utils.log_utils import group_team_buffs
+from game_logic.damage_utils import attacker_snapshot
+from game_logic.events import HIT
+from utils.log_utils import BattleLog, ControlLine, LogRecord, group_team_buffs
+from utils.trace import tracer
 from game_logic.lifestar import Nova
-
-CONTROL_EFFECTS = {"fear", "silence", "seal of light"}
+from game_logic.rng import GLOBAL_RNG
 
 def group_control_effects(logs, team):
-    grouped = []
-
-    # Keep only non-control logs, skip duplicates
-    for line in logs:
-        if isinstance(line, str) and any(effect in line.lower() for effect in CONTROL_EFFECTS):
-            continue  # Skip raw control lines
-        grouped.append(line)
+    # Drop the raw apply/resist/cleanse lines; the status lines below replace them
+    grouped = [line for line in logs if not isinstance(line, ControlLine)]
 
     # Append final consolidated control status
     for hero in team.heroes:
@@ -33,13 +31,23 @@ def group_control_effects(logs, team):
 
 
 class Team:
-    def __init__(self, heroes, front_line, back_line, pet=None):
+    def __init__(self, heroes, front_line, back_line, pet=None, rng=None):
         self.heroes = heroes
+        self.rng = rng if rng is not None else GLOBAL_RNG
         self.front_line = front_line
         self.back_line = back_line
         self.pet = pet
+        # Battle swaps in its own sink; standalone teams keep every line.
+        self.log = BattleLog("detailed")
+        # CombatEvents for the current round (see game_logic.events).
+        self.events = []
+        # Hero (or boss) whose action is resolving; None for round effects.
+        self.acting = None
+        # Curse of Decay offsets this battle: (hero, source, attribute) -> count
+        self.curse_offsets = Counter()
         for hero in self.heroes:
             hero.team = self
+            hero.rng = self.rng
             if hero.artifact and hasattr(hero.artifact, "bind_team"):
                 hero.artifact.bind_team(self)
 
@@ -68,12 +76,21 @@ class Team:
             self._batched_energy_logs = {}
         self._batched_energy_logs.setdefault(gain, []).append(target.name)
 
+    @staticmethod
+    def _crit_in(events, mark, hero):
+        """True if any hit ``hero`` dealt since ``events[mark]`` was a crit."""
+        return any(e.crit for e in events[mark:] if e.kind == HIT and e.source is hero)
+
     def perform_turn(self, boss, round_num):
-        for hero in self.heroes:
-            print(f"[DEBUG-ENERGY] {hero.name} pre-turn: {hero.energy}")
+        if tracer.energy:
+            for hero in self.heroes:
+                tracer.emit(f"[DEBUG-ENERGY] {hero.name} pre-turn: {hero.energy}")
         logs = []
         if not boss.is_alive():
             return logs
+        events = self.events
+        events.clear()
+        self.acting = None
 
         # 🔄 Sort by speed before acting
         self.heroes.sort(key=lambda h: h.spd, reverse=True)
@@ -100,21 +117,24 @@ class Team:
         if not boss.is_alive():
             return logs
 
-        logs.append(f"⚔️ Team begins actions for Round {round_num}.")
+        logs.append(LogRecord("⚔️ Team begins actions for Round {}.", round_num))
 
         for hero in self.heroes:
             if not hero.is_alive():
                 continue
 
             hero.recalculate_stats()
-            print(f"[DEBUG-BATTLE] {hero.name} Pre-Attack Stats → ATK: {hero.atk:,} | ADD: {hero.all_damage_dealt:.1f}% | HD: {hero.hd}")
-            for name, buff in hero.buffs.items():
-                print(f"[DEBUG-BATTLE] {hero.name} buff {name}: {buff}")
+            attacker_snapshot(hero)
+            if tracer.buffs:
+                tracer.emit(f"[DEBUG-BATTLE] {hero.name} Pre-Attack Stats → ATK: {hero.atk:,} | ADD: {hero.all_damage_dealt:.1f}% | HD: {hero.hd}")
+                for name, buff in hero.buffs.items():
+                    tracer.emit(f"[DEBUG-BATTLE] {hero.name} buff {name}: {buff}")
 
+            self.acting = hero
             hero._using_real_attack = True
+            mark = len(events)
             if hero.energy >= 100 and not hero.has_silence:
-                skill_logs = hero.active_skill(boss, self)
-                logs.extend(skill_logs)
+                logs.extend(hero.active_skill(boss, self))
                 hero.energy = 0
 
                 # Buff sharing
@@ -137,39 +157,36 @@ class Team:
                 if self.pet and hasattr(self.pet, "on_hero_active"):
                     self.pet.on_hero_active(hero)
 
-                crit_occurred = any("CRIT" in str(line) for line in skill_logs)
-                self.energy_gain_on_being_hit(hero, logs, crit_occurred)
+                self.energy_gain_on_being_hit(hero, logs, self._crit_in(events, mark, hero))
             else:
-                skill_logs = hero.basic_attack(boss, self)
-                logs.extend(skill_logs)
+                logs.extend(hero.basic_attack(boss, self))
                 if hero.lifestar and hasattr(hero.lifestar, "on_after_action"):
                     logs.extend(hero.lifestar.on_after_action(hero, self, boss) if isinstance(hero.lifestar, Nova) else hero.lifestar.on_after_action(hero, self))
                 logs.extend(self.trigger_mff_passive(hero, boss))
                 logs.extend(apply_foresight(hero, "basic"))
                 logs.append(grant_energy(hero, 50))
 
-                crit_occurred = any("CRIT" in str(line) for line in skill_logs)
-                self.energy_gain_on_being_hit(hero, logs, crit_occurred)
+                self.energy_gain_on_being_hit(hero, logs, self._crit_in(events, mark, hero))
 
             hero._using_real_attack = False
+            self.acting = boss
             logs.extend(boss.flush_counterattacks(self.heroes))
 
         # 🔄 Boss action phase
-        boss_logs = boss.boss_action(self.heroes, round_num)
-        logs.extend(boss_logs)
-
-
-        # 🌀 Lifestar reactive
-        for line in boss_logs:
-            for hero in self.heroes:
-                if hero.is_alive() and hero.lifestar and hasattr(hero.lifestar, "on_receive_attack"):
-                    retaliation_logs = hero.lifestar.on_receive_attack(hero, boss, boss)
-                    if retaliation_logs:
-                        logs.extend(retaliation_logs)
+        mark = len(events)
+        logs.extend(boss.boss_action(self.heroes, round_num))
+        boss_hits = [e for e in events[mark:] if e.kind == HIT and e.source is boss]
+
+        # 🌀 Lifestar reactive: once per boss hit on the lifestar's holder
+        for hit in boss_hits:
+            hero = hit.target
+            if hero.is_alive() and hero.lifestar and hasattr(hero.lifestar, "on_receive_attack"):
+                retaliation_logs = hero.lifestar.on_receive_attack(hero, boss, boss)
+                if retaliation_logs:
+                    logs.extend(retaliation_logs)
 
         # 🟢 Crit reaction after boss skill
-        crit_hit_heroes = [h for h in self.heroes if h.is_alive()]
-        crit_occurred = any("CRIT" in str(line) and any(h.name in str(line) for h in crit_hit_heroes) for line in boss_logs)
+        crit_occurred = any(hit.crit and hit.target.is_alive() for hit in boss_hits)
         for hero in self.heroes:
             if hero.is_alive():
                 self.energy_gain_on_being_hit(hero, logs, crit_occurred)
@@ -178,25 +195,31 @@ class Team:
         for hero in self.heroes:
             if not hero.is_alive() or not hasattr(hero, "passive_trigger"):
                 continue
+            self.acting = hero
             if hero.__class__.__name__ == "PDE":
                 pde_logs = hero.passive_trigger(self.heroes, boss, self)
-                for log in pde_logs:
-                    if "removes" in log and "from" in log:
-                        print(f"[DEBUG-CLEANSE] PDE triggered cleanse: {log}")
+                if tracer.control_cleansing:
+                    for log in pde_logs:
+                        if "removes" in log and "from" in log:
+                            tracer.emit(f"[DEBUG-CLEANSE] PDE triggered cleanse: {log}")
                 logs.extend(pde_logs)
             else:
                 for ally in self.heroes:
                     if ally != hero and ally.is_alive():
                         p_logs = hero.passive_trigger(ally, boss, self)
-                        for log in p_logs:
-                            if "removes" in log and "from" in log:
-                                if hero.__class__.__name__ == "LBRM":
-                                    print(f"[DEBUG-CLEANSE] LBRM triggered cleanse on ally: {log}")
-                                else:
-                                    print(f"[DEBUG-CLEANSE] {hero.name} triggered cleanse: {log}")
+                        if tracer.control_cleansing:
+                            for log in p_logs:
+                                if "removes" in log and "from" in log:
+                                    if hero.__class__.__name__ == "LBRM":
+                                        tracer.emit(f"[DEBUG-CLEANSE] LBRM triggered cleanse on ally: {log}")
+                                    else:
+                                        tracer.emit(f"[DEBUG-CLEANSE] {hero.name} triggered cleanse: {log}")
                         logs.extend(p_logs)
 
-        logs = group_control_effects(logs, team=self)
+        self.acting = None
+        # Only worth rewriting the lines if someone is going to read them.
+        if self.log.detailed:
+            logs = group_control_effects(logs, team=self)
         return logs
 
 
@@ -230,11 +253,10 @@ class Team:
 
                 # ⬇️ Then apply normal end-of-round logic
                 if "start_ADR" in hero.buffs:
-                    hero.buffs["start_ADR"]["bonus"] -= 10
-                    if hero.buffs["start_ADR"]["bonus"] <= 0:
+                    if hero.buffs.add_bonus("start_ADR", -10) <= 0:
                         del hero.buffs["start_ADR"]
                 if "start_HD" in hero.buffs:
-                    hero.buffs["start_HD"]["bonus"] += 10
+                    hero.buffs.add_bonus("start_HD", 10)
                 if hero.hp > 0.5 * hero.max_hp:
                     BuffHandler.apply_buff(hero, f"universal_add_{round_num}", {"attribute": "all_damage_dealt", "bonus": 25, "rounds": 2})
                     buffs_applied.append((hero.name, "+25% All Damage Dealt (2 rounds)"))
@@ -243,16 +265,21 @@ class Team:
                     buffs_applied.append((hero.name, f"+{int(hero.max_hp * 0.25) / 1_000_000:.0f}M Shield"))
 
                 if hasattr(hero, "end_of_round"):
+                    self.acting = hero
                     logs += hero.end_of_round(boss, self, round_num)
 
                 if hasattr(hero, "lifestar") and hero.lifestar and hasattr(hero.lifestar, "end_of_round"):
+                    self.acting = hero
                     logs += hero.lifestar.end_of_round(hero, self, boss, round_num)
+                self.acting = None
 
         if buffs_applied:
             logs.append("🛡️ End-of-Round Buffs:")
             logs.extend(group_team_buffs(buffs_applied))
 
+        self.acting = boss
         logs.extend(boss.end_of_round_effects(self.heroes, round_num))
+        self.acting = None
         for hero in self.heroes:
             if hero.is_alive() and hero.calamity > 0:
                 hero.calamity -= 1
@@ -3,7 +3,9 @@ from game_logic.boss import Boss
 from game_logic.team import Team
 from game_logic.damage_utils import hero_deal_damage, apply_burn
 from game_logic.enables import BalancedStrike, UnbendingWill
+from game_logic.buff_book import BuffBook
 from game_logic.buff_handler import BuffHandler
+from game_logic.status import EffectList
 import random
 
 class DummyTarget(Boss):
@@ -14,11 +16,11 @@ class DummyTarget(Boss):
         self.shield = 100_000_000
         self.dr = 0.20
         self.adr = 0.25
-        self.buffs = {
+        self.buffs = BuffBook({
             "crit_vulnerability": {"attribute": "crit_damage_taken", "bonus": 30, "rounds": 2},
             "poisoned": {"attribute": "poison", "bonus": 1, "rounds": 2}
-        }
-        self.poison_effects = [{"attribute": "burn", "damage": 100_000_000, "rounds": 2}]
+        })
+        self.poison_effects = EffectList([{"attribute": "burn", "damage": 100_000_000, "rounds": 2}])
         self.shrink_debuff = {"multiplier_received": 1.2, "multiplier_dealt": 0.8, "rounds": 2}
 
     def take_damage(self, dmg, source_hero=None, team=None, real_attack=False):
@@ -1,14 +1,21 @@
 # main.py
 from dotenv import load_dotenv
 load_dotenv()
+import asyncio
+import multiprocessing
 import os
+from concurrent.futures import ProcessPoolExecutor
 import discord
 from discord.ext import commands
 from game_logic import Hero, Boss, Team
 from game_logic.artifacts import Scissors, DB, Mirror, Antlers
-from game_logic.cores import active_core, PDECore
+from game_logic.engine import BattleConfig, HeroSpec, run_battle
 from game_logic.lifestar import Specter
 from utils.battle import chunk_logs  # Ensure this is imported at top
+from battle import play_logged_battle, post_logged_battle
+from debug_fast_average import AverageStats, _run_seeds
+from sim_cache import ResultCache
+from sim_jobs import JobCancelled, QueueFull, SimScheduler
 
 
 from game_logic.enables import ControlPurify, AttributeReductionPurify, MarkPurify, BalancedStrike, UnbendingWill
@@ -56,8 +63,57 @@ bot = commands.Bot(command_prefix="!", intents=intents)
 tree = bot.tree
 guild_id = discord.Object(id=1358992627424428176)
 
+# Battles are CPU-bound and would stall the gateway heartbeat on the event
+# loop, so every simulation runs here. Workers start on first use.
+SIM_WORKERS = os.cpu_count() or 1
+sim_pool = ProcessPoolExecutor(max_workers=SIM_WORKERS)
+SIM_CHUNK = 25
+MAX_BATTLES = 10_000
+_scheduler = _manager = _result_cache = None
+
+
+def get_scheduler():
+    # Built on first use rather than at import: the Manager starts a process,
+    # and spawn/forkserver pool workers import this module.
+    global _scheduler, _manager
+    if _scheduler is None:
+        _manager = multiprocessing.Manager()
+        _scheduler = SimScheduler(sim_pool, max_in_flight=SIM_WORKERS, event_factory=_manager.Event)
+    return _scheduler
+
+
+async def get_result_cache():
+    # Opening hashes the engine source and every lookup may wait on SQLite's
+    # lock, so cache I/O runs on the default thread pool, never the event loop.
+    # The future is kept so concurrent first calls share one open.
+    global _result_cache
+    if _result_cache is None:
+        _result_cache = asyncio.get_running_loop().run_in_executor(None, ResultCache)
+    try:
+        return await _result_cache
+    except Exception:
+        _result_cache = None  # let the next command retry
+        raise
+
+
+async def run_job(interaction, units, on_progress=None):
+    """Queue ``units`` for the command's user and return their results.
+
+    Returns None after telling the user when the job is refused or cancelled.
+    """
+    try:
+        job = get_scheduler().submit(interaction.user.id, units, on_progress)
+    except QueueFull as exc:
+        await interaction.followup.send(f"🚦 Not queued: {exc}.", ephemeral=True)
+        return None
+    try:
+        return await job.wait()
+    except JobCancelled:
+        await interaction.followup.send("🛑 Simulation cancelled.", ephemeral=True)
+        return None
+
 import textwrap
-from utils.log_utils import stylize_log
+from utils.log_utils import LogRecord, stylize_log
 
 
 def detect_category(line):
@@ -80,6 +136,7 @@ def detect_category(line):
 def format_logs_as_bullet_points(logs):
     formatted_lines = []
     for line in logs:
+        line = str(line) if isinstance(line, LogRecord) else line
         if isinstance(line, str) and line.strip():
             category = detect_category(str(line))
             formatted_lines.append(stylize_log(str(line), category))
@@ -101,217 +158,168 @@ def chunk_logs(log_block, limit=1900):
 
 @tree.command(name="debugbattle", description="Run full battle with logs", guild=guild_id)
 async def debug_battle(interaction):
-    from discord import Interaction
-    global active_core
-    active_core = PDECore()
-
-    data = [
-        ("hero_MFF_Hero", 11e9, 60e6, 3800, "MP", "UW", DB()),
-        ("hero_SQH_Hero", 12e9, 70e6, 3400, "MP", "UW", DB()),
-        ("hero_LFA_Hero", 20e9, 160e6, 3500, "MP", "BS", Antlers()),
-        ("hero_DGN_Hero", 14e9, 90e6, 3300, "MP", "UW", Scissors()),
-        ("hero_PDE_Hero", 9e9, 60e6, 2300, "MP", "UW", Mirror()),
-        ("hero_LBRM_Hero", 9.9e9, 50e6, 2000, "MP", "UW", Mirror())
-    ]
+    config = BattleConfig(heroes=(
+        HeroSpec("hero_MFF_Hero", 11e9, 60e6, 3800, "MP", "UW", "db"),
+        HeroSpec("hero_SQH_Hero", 12e9, 70e6, 3400, "MP", "UW", "db"),
+        HeroSpec("hero_LFA_Hero", 20e9, 160e6, 3500, "MP", "BS", "antlers", "specter"),
+        HeroSpec("hero_DGN_Hero", 14e9, 90e6, 3300, "MP", "UW", "scissors"),
+        HeroSpec("hero_PDE_Hero", 9e9, 60e6, 2300, "MP", "UW", "mirror"),
+        HeroSpec("hero_LBRM_Hero", 9.9e9, 50e6, 2000, "MP", "UW", "mirror"),
+    ), pet=None)
 
-    heroes = []
-    for hid, hp, atk, spd, purify, trait, artifact in data:
-        lifestar = Specter() if hid == "hero_LFA_Hero" else None
-        h = Hero.from_stats(hid, [hp, atk, spd], artifact=artifact, lifestar=lifestar)
-        h.set_enables(purify, trait)
-        h.gk = h.defier = True
-        h.total_damage_dealt = 0
-        heroes.append(h)
+    await interaction.response.send_message("🧪 Starting debug battle with detailed logs...", ephemeral=True)
+    results = await run_job(interaction, [(play_logged_battle, (config,))])
+    if results is None:
+        return
+    blocks, _ = results[0]
+    await post_logged_battle(interaction, blocks)
 
-    team = Team(heroes, heroes[:2], heroes[2:])
-    boss = Boss()
 
-    await interaction.response.send_message("🧪 Starting debug battle with detailed logs...", ephemeral=True)
-    from battle import simulate_battle
-    await simulate_battle(interaction, team, boss, mode="detailed")
+VERDICTS = {
+    "victory": "✅ Boss defeated!",
+    "defeat": "❌ All heroes have fallen!",
+    "timeout": "⚔️ Battle ended after 15 rounds.",
+}
 
 
 @tree.command(name="debugquick", description="Run a fast debug battle summary", guild=guild_id)
 async def debug_quick(interaction: discord.Interaction):
-    global active_core
-    active_core = PDECore()
-
-    data = [
-        ("hero_MFF_Hero", 11e9, 60e6, 3800, "MP", "UW", DB()),
-        ("hero_SQH_Hero", 12e9, 70e6, 3400, "MP", "UW", DB()),
-        ("hero_LFA_Hero", 20e9, 16e7, 3540, "CP", "BS", Antlers()),
-        ("hero_DGN_Hero", 14e9, 90e6, 3300, "MP", "UW", Scissors()),
-        ("hero_PDE_Hero", 9e9, 60e6, 2300, "MP", "UW", Mirror()),
-        ("hero_LBRM_Hero", 9.9e9, 50e6, 2000, "MP", "UW", Mirror())
-    ]
-
-    heroes = []
-    for hid, hp, atk, spd, purify, trait, artifact in data:
-        lifestar = Specter() if hid == "hero_LFA_Hero" else None
-        h = Hero.from_stats(hid, [hp, atk, spd], artifact=artifact, lifestar=lifestar)
-        h.set_enables(purify, trait)
-        h.gk = h.defier = True
-        h.total_damage_dealt = 0
-        h._damage_rounds = []
-        heroes.append(h)
-
-    team = Team(heroes, heroes[:2], heroes[2:])
-    boss = Boss()
-
-    for hero in team.heroes:
-        if hero.artifact and hasattr(hero.artifact, "apply_start_of_battle"):
-            result = hero.artifact.apply_start_of_battle(team, round_num=1)
-            if result:
-                print(f"[DEBUG] {hero.name} artifact start-of-battle effect triggered.")
-        if hasattr(hero, "start_of_battle"):
-            hero.start_of_battle(team, boss)
+    config = BattleConfig(heroes=(
+        HeroSpec("hero_MFF_Hero", 11e9, 60e6, 3800, "MP", "UW", "db"),
+        HeroSpec("hero_SQH_Hero", 12e9, 70e6, 3400, "MP", "UW", "db"),
+        HeroSpec("hero_LFA_Hero", 20e9, 16e7, 3540, "CP", "BS", "antlers", "specter"),
+        HeroSpec("hero_DGN_Hero", 14e9, 90e6, 3300, "MP", "UW", "scissors"),
+        HeroSpec("hero_PDE_Hero", 9e9, 60e6, 2300, "MP", "UW", "mirror"),
+        HeroSpec("hero_LBRM_Hero", 9.9e9, 50e6, 2000, "MP", "UW", "mirror"),
+    ), pet=None)
+    await interaction.response.defer(ephemeral=True)
+    results = await run_job(interaction, [(run_battle, (config,))])
+    if results is None:
+        return
+    result = results[0]
 
     round_summaries = []
-    for round_num in range(1, 16):
-        for hero in team.heroes:
-            if hero.lifestar and hasattr(hero.lifestar, "start_of_round"):
-                hero.lifestar.start_of_round(hero, team, boss, round_num)
-        for hero in team.heroes:
-            if hero.lifestar and hasattr(hero.lifestar, "start_of_round"):
-                hero.lifestar.start_of_round(hero, team, boss, round_num)
-
-                if all(not h.is_alive() for h in team.heroes) or not boss.is_alive():
-                    break
-
-        hero_start_dmg = {h.name: getattr(h, "total_damage_dealt", 0) for h in team.heroes}
-        team.perform_turn(boss, round_num)
-        team.end_of_round(boss, round_num)
-        hero_end_dmg = {h.name: getattr(h, "total_damage_dealt", 0) for h in team.heroes}
-
-        per_hero_logs = []
-        for h in team.heroes:
-            diff = hero_end_dmg[h.name] - hero_start_dmg[h.name]
-            h._damage_rounds.append(diff)
-            per_hero_logs.append(f"{h.name}: {diff / 1e9:.2f}B")
-
-        round_total = sum(hero_end_dmg[h] - hero_start_dmg[h] for h in hero_end_dmg)
-        round_summaries.append(f"🔁 Round {round_num} ({round_total / 1e9:.2f}B): " + " | ".join(per_hero_logs))
-
-    top_dmg_hero = max(team.heroes, key=lambda h: getattr(h, "total_damage_dealt", 0))
-    verdict = "✅ Boss defeated!" if not boss.is_alive() else ("❌ All heroes have fallen!" if all(not h.is_alive() for h in team.heroes) else "⚔️ Battle ended after 15 rounds.")
-    lines = [f"{verdict}", f"🏹 Total Damage: {boss.total_damage_taken / 1e9:.2f}B"]
+    for r in result.rounds:
+        per_hero_logs = [f"{name}: {r.damage[name] / 1e9:.2f}B" for name in result.hero_names]
+        round_total = sum(r.damage.values())
+        round_summaries.append(f"🔁 Round {r.round_num} ({round_total / 1e9:.2f}B): " + " | ".join(per_hero_logs))
+
+    top_dmg_hero = max(result.hero_names, key=result.damage.get)
+    lines = [VERDICTS[result.verdict], f"🏹 Total Damage: {result.boss_damage_taken / 1e9:.2f}B"]
     lines += round_summaries
 
-    for h in team.heroes:
-        label = f"**{h.name}**" if h == top_dmg_hero else h.name
-        total = sum(h._damage_rounds)
-        lines.append(f"{label}: {total / 1e9:.2f}B total")
+    for name in result.hero_names:
+        label = f"**{name}**" if name == top_dmg_hero else name
+        lines.append(f"{label}: {result.damage[name] / 1e9:.2f}B total")
+
+    await interaction.followup.send("\n".join(lines), ephemeral=True)
+
+DEBUGFAST_TEAM = BattleConfig(heroes=(
+    HeroSpec("hero_MFF_Hero", 11e9, 60e7, 3800, "MP", "UW", "db"),
+    HeroSpec("hero_SQH_Hero", 12e9, 70e7, 3400, "MP", "UW", "db"),
+    HeroSpec("hero_LFA_Hero", 20e9, 16e8, 3540, "CP", "BS", "antlers", "specter"),
+    HeroSpec("hero_DGN_Hero", 14e9, 90e7, 3300, "MP", "UW", "scissors"),
+    HeroSpec("hero_PDE_Hero", 9e9, 60e7, 2300, "MP", "UW", "mirror"),
+    HeroSpec("hero_LBRM_Hero", 9.9e9, 50e7, 2000, "MP", "UW", "mirror"),
+), pet=None)
 
-    await interaction.response.send_message("\n".join(lines), ephemeral=True)
 
 @tree.command(name="debugfast", description="Run a fast debug battle summary", guild=guild_id)
 async def debugfast(interaction: discord.Interaction):
-    global active_core
-    active_core = PDECore()
-
-    data = [
-        ("hero_MFF_Hero", 11e9, 60e7, 3800, "MP", "UW", DB()),
-        ("hero_SQH_Hero", 12e9, 70e7, 3400, "MP", "UW", DB()),
-        ("hero_LFA_Hero", 20e9, 16e8, 3540, "CP", "BS", Antlers()),
-        ("hero_DGN_Hero", 14e9, 90e7, 3300, "MP", "UW", Scissors()),
-        ("hero_PDE_Hero", 9e9, 60e7, 2300, "MP", "UW", Mirror()),
-        ("hero_LBRM_Hero", 9.9e9, 50e7, 2000, "MP", "UW", Mirror())
-    ]
-
-    heroes = []
-    for hid, hp, atk, spd, purify, trait, artifact in data:
-        lifestar = Specter() if hid == "hero_LFA_Hero" else None
-        h = Hero.from_stats(hid, [hp, atk, spd], artifact=artifact, lifestar=lifestar)
-        h.set_enables(purify_mapping.get(purify), trait_mapping.get(trait))
-        h.gk = h.defier = True
-        h.total_damage_dealt = 0
-        h._damage_rounds = []
-        h._energy_rounds = []
-        h._curse_offsets_by_source_attr = {}
-        heroes.append(h)
-
-    team = Team(heroes, heroes[:2], heroes[2:])
-    boss = Boss()
-
-    for hero in team.heroes:
-        if hasattr(hero, "start_of_battle"):
-            hero.start_of_battle(team, boss)
+    config = DEBUGFAST_TEAM
+    await interaction.response.defer(ephemeral=True)
+    results = await run_job(interaction, [(run_battle, (config,))])
+    if results is None:
+        return
+    result = results[0]
+    names = result.hero_names
 
     round_summaries = []
-    for round_num in range(1, 16):
-        for hero in team.heroes:
-            if hero.lifestar and hasattr(hero.lifestar, "start_of_round"):
-                hero.lifestar.start_of_round(hero, team, boss, round_num)
-        if all(not h.is_alive() for h in team.heroes) or not boss.is_alive():
-            break
-
-        hero_start_dmg = {h.name: h.total_damage_dealt for h in team.heroes}
-        hero_start_energy = {h.name: h.energy for h in team.heroes}
-
-        battle_logs = []
-        battle_logs += team.perform_turn(boss, round_num)
-        battle_logs += team.end_of_round(boss, round_num)
-
-        for h in team.heroes:
-            h.battle_logs = battle_logs
-
-        hero_end_dmg = {h.name: h.total_damage_dealt for h in team.heroes}
-        hero_end_energy = {h.name: h.energy for h in team.heroes}
-
-        for h in team.heroes:
-            logs = getattr(h, "battle_logs", [])
-            for line in logs:
-                if isinstance(line, str) and "offsets" in line and h.name in line and "(source:" in line:
-                    try:
-                        source = line.split("(source:")[1].split(")")[0].strip()
-                        attr = line.split("offsets ")[1].split(" buff")[0].strip()
-                        h._curse_offsets_by_source_attr.setdefault(source, {})
-                        h._curse_offsets_by_source_attr[source][attr] = h._curse_offsets_by_source_attr[source].get(attr, 0) + 1
-                    except Exception:
-                        continue
-
-        if round_num == 1:
-            header_line = "         | " + " | ".join(f"{h.name:>6}" for h in team.heroes)
+    for r in result.rounds:
+        if r.round_num == 1:
+            header_line = "         | " + " | ".join(f"{name:>6}" for name in names)
             divider = "-" * len(header_line)
             round_summaries.append("\n" + divider)
             round_summaries.append(header_line)
             round_summaries.append(divider)
 
-        round_summaries.append(f"\n\U0001f501 Round {round_num}")
-        round_summaries.append("DMG (B)  | " + " | ".join(f"{(hero_end_dmg[h.name] - hero_start_dmg[h.name]) / 1e9:6.2f}" for h in team.heroes))
-        round_summaries.append("\u26a1 \u0394      | " + " | ".join(f"{(hero_end_energy[h.name] - hero_start_energy[h.name]):+6}" for h in team.heroes))
-        round_summaries.append("\U0001f9ff Calam | " + " | ".join(f"{h.calamity:6}" for h in team.heroes))
-        round_summaries.append("\U0001f480 Curse | " + " | ".join(f"{h.curse_of_decay:6}" for h in team.heroes))
-
-    top_dmg_hero = max(team.heroes, key=lambda h: h.total_damage_dealt)
-    verdict = "\u2705 Boss defeated!" if not boss.is_alive() else (
-        "\u274c All heroes have fallen!" if all(not h.is_alive() for h in team.heroes)
-        else "\u2694\ufe0f Battle ended after 15 rounds."
-    )
+        round_summaries.append(f"\n\U0001f501 Round {r.round_num}")
+        round_summaries.append("DMG (B)  | " + " | ".join(f"{r.damage[name] / 1e9:6.2f}" for name in names))
+        round_summaries.append("\u26a1 \u0394      | " + " | ".join(f"{r.energy[name]:+6}" for name in names))
+        round_summaries.append("\U0001f9ff Calam | " + " | ".join(f"{r.calamity[name]:6}" for name in names))
+        round_summaries.append("\U0001f480 Curse | " + " | ".join(f"{r.curse[name]:6}" for name in names))
 
+    top_dmg_hero = max(names, key=result.damage.get)
     lines = [
-        verdict,
-        f"\U0001f3f9 Total Damage: {boss.total_damage_taken / 1e9:.2f}B",
+        VERDICTS[result.verdict],
+        f"\U0001f3f9 Total Damage: {result.boss_damage_taken / 1e9:.2f}B",
         "\n\U0001f4ca Final Summary:"
     ]
 
-    team_total = sum(h.total_damage_dealt for h in team.heroes)
-    for h in team.heroes:
-        dmg = h.total_damage_dealt
-        energy = h.energy
+    team_total = sum(result.damage.values())
+    for name in names:
+        dmg = result.damage[name]
+        energy = result.energy[name]
         percent = (dmg / team_total * 100) if team_total > 0 else 0
-        label = f"**{h.name}**" if h == top_dmg_hero else h.name
+        label = f"**{name}**" if name == top_dmg_hero else name
 
         lines.append(f"{label:>6}: {dmg / 1e9:6.2f}B DMG | {energy:>3} ⚡ | {percent:>5.1f}%")
 
+    if result.curse_offsets:
+        lines.append("\n💀 Curse of Decay offsets (hero ← source: buffs):")
+        for name in names:
+            offsets = sorted((source, attr, n) for (hero, source, attr), n in result.curse_offsets.items() if hero == name)
+            if offsets:
+                lines.append(f"{name:>6} ← " + ", ".join(f"{source}: {attr}×{n}" for source, attr, n in offsets))
+
     message = "\n".join(lines + round_summaries)
     chunks = chunk_logs(message, limit=1900)
 
-    await interaction.response.send_message(chunks[0], ephemeral=True)
-    for chunk in chunks[1:]:
+    for chunk in chunks:
         await interaction.followup.send(chunk, ephemeral=True)
 
 
+@tree.command(name="simulate", description="Average the debugfast team over many battles", guild=guild_id)
+async def simulate(interaction: discord.Interaction, battles: int = 1000):
+    battles = max(1, min(battles, MAX_BATTLES))
+    await interaction.response.defer(ephemeral=True)
+
+    loop = asyncio.get_running_loop()
+    cache = await get_result_cache()
+    stats, seeds = await loop.run_in_executor(None, cache.missing_seeds, DEBUGFAST_TEAM, battles)
+    if seeds:
+        units = [(_run_seeds, (seeds[i:i + SIM_CHUNK], DEBUGFAST_TEAM)) for i in range(0, len(seeds), SIM_CHUNK)]
+        cached = stats.num_simulations
+
+        async def progress(job):
+            ran = min(job.done * SIM_CHUNK, len(seeds))
+            await interaction.edit_original_response(content=f"⏳ {cached + ran}/{cached + len(seeds)} battles simulated...")
+
+        results = await run_job(interaction, units, progress)
+        if results is None:
+            return
+        fresh = AverageStats()
+        for partial in results:
+            fresh.merge(partial)
+        stats.merge(fresh)
+        await loop.run_in_executor(None, cache.put, DEBUGFAST_TEAM, stats)
+
+    mean, half = stats.interval()
+    lines = [f"📊 **{stats.num_simulations} battles** (cached ones reused)",
+             f"🏹 Avg Team Damage: {mean / 1e9:.2f}B ± {half / 1e9:.2f}B (95%)"]
+    for name, total in stats.hero_totals.items():
+        share, _ = stats.interval(name)
+        lines.append(f"{name:>6}: {total / stats.num_simulations / 1e9:8.2f}B | {share * 100:5.1f}%")
+    await interaction.edit_original_response(content="\n".join(lines))
+
+
+@tree.command(name="cancel", description="Cancel your queued or running simulations", guild=guild_id)
+async def cancel(interaction: discord.Interaction):
+    count = get_scheduler().cancel(interaction.user.id) if _scheduler else 0
+    message = f"🛑 Cancelling {count} simulation(s)." if count else "Nothing of yours is queued."
+    await interaction.response.send_message(message, ephemeral=True)
+
+
 @tree.command(name="startgame", description="Start the boss battle game", guild=guild_id)
 async def start_game(interaction: discord.Interaction):
     await interaction.response.send_message("🧪 This is a placeholder start game command.", ephemeral=True)
@@ -323,4 +331,11 @@ async def on_ready():
     print(f"Synced commands: {[cmd.name for cmd in synced]}")
     print(f"Logged in as {bot.user}")
 
-bot.run(os.environ["DISCORD_TOKEN"])
+if __name__ == "__main__":
+    # Guarded so pool workers started with spawn/forkserver can import this module.
+    try:
+        bot.run(os.environ["DISCORD_TOKEN"])
+    finally:
+        sim_pool.shutdown(cancel_futures=True)
+        if _manager is not None:
+            _manager.shutdown()
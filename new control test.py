@@ -6,7 +6,6 @@ from game_logic.lifestar import Specter, Nova
 from game_logic.pets import Phoenix
 from game_logic.enables import ControlPurify, AttributeReductionPurify, MarkPurify, BalancedStrike, UnbendingWill
 from utils.battle import chunk_logs
-from utils.log_utils import debug
 import random
 import sys, os
 from contextlib import contextmanager
@@ -58,7 +57,7 @@ def run_simulation():
             h._base_crit_dmg = h.crit_dmg = 150
             h._base_precision = h.precision = 150
 
-            h.random_control_immunity = random.choice(control_effects)
+            h.immune_control_effect = random.choice(control_effects)
 
         team = Team(heroes, heroes[:2], heroes[2:], pet=Phoenix())
         boss = Boss()
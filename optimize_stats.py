@@ -0,0 +1,184 @@
+# optimize_stats.py
+"""Bayesian search for one hero's stat allocation under a fixed budget.
+
+An allocation is a weight vector over the tuned stats (summing to 1). Weight
+``w`` on a stat buys ``w * budget * STAT_SCALE[stat]`` points of it, and the
+default budget is whatever the hero's current allocation costs, so the search
+redistributes what the hero already has. Mean team damage from the engine is
+the noisy objective. A Matern-5/2 Gaussian process on log damage (NumPy only)
+picks each batch of candidates by expected improvement, and the batch is
+simulated in parallel on common seeds with split RNG streams.
+"""
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+from math import erf, log, sqrt
+
+import numpy as np
+
+from debug_fast_average import TEAM, _run_seeds, _silence_worker, _variance
+
+# Points of each stat that one unit of budget buys: roughly the most a build
+# would put into that stat.
+STAT_SCALE = {
+    "dt_level": 15, "crit_rate": 100, "crit_dmg": 300, "precision": 300, "hd": 300,
+    "skill_damage": 600, "add": 150, "dr": 75, "adr": 75, "armor": 10000, "spd": 4000,
+}
+# No "add": recalculate_stats resets all_damage_dealt to 0 rather than to the
+# base value, so budget spent on it is wasted and the search would only learn that.
+DAMAGE_STATS = ("crit_rate", "crit_dmg", "precision", "hd", "skill_damage")
+
+
+def allocation_cost(spec, stats):
+    return sum(getattr(spec, stat) / STAT_SCALE[stat] for stat in stats)
+
+
+def allocation_weights(spec, stats):
+    cost = allocation_cost(spec, stats)
+    if cost <= 0:
+        return np.full(len(stats), 1 / len(stats))
+    return np.array([getattr(spec, stat) / STAT_SCALE[stat] / cost for stat in stats])
+
+
+def apply_allocation(config, hero_id, stats, weights, budget):
+    """``config`` with ``hero_id``'s ``stats`` set from ``weights`` (rounded to whole points)."""
+    values = {stat: round(w * budget * STAT_SCALE[stat]) for stat, w in zip(stats, weights)}
+    heroes = tuple(spec._replace(**values) if spec.hero_id == hero_id else spec for spec in config.heroes)
+    return config._replace(heroes=heroes)
+
+
+def _matern(a, b, lengthscale):
+    dist = np.sqrt(((a[:, None, :] - b[None, :, :]) ** 2).sum(-1)) / lengthscale
+    s = sqrt(5) * dist
+    return (1 + s + s * s / 3) * np.exp(-s)
+
+
+class GaussianProcess:
+    """Matern-5/2 GP with per-observation noise; the lengthscale maximises the marginal likelihood."""
+
+    LENGTHSCALES = (0.05, 0.1, 0.2, 0.3, 0.5, 0.8, 1.2)
+
+    def __init__(self, x, y, noise):
+        self.x = np.asarray(x, dtype=float)
+        y = np.asarray(y, dtype=float)
+        self.y_mean = y.mean()
+        self.y_std = y.std() or 1.0
+        z = (y - self.y_mean) / self.y_std
+        noise = np.asarray(noise, dtype=float) / self.y_std ** 2 + 1e-6
+
+        best = None
+        for lengthscale in self.LENGTHSCALES:
+            k = _matern(self.x, self.x, lengthscale) + np.diag(noise)
+            try:
+                chol = np.linalg.cholesky(k)
+            except np.linalg.LinAlgError:
+                continue
+            alpha = np.linalg.solve(chol.T, np.linalg.solve(chol, z))
+            likelihood = -0.5 * z @ alpha - np.log(np.diag(chol)).sum()
+            if best is None or likelihood > best[0]:
+                best = (likelihood, lengthscale, chol, alpha)
+        _, self.lengthscale, self.chol, self.alpha = best
+
+    def predict(self, xs):
+        """Posterior mean and standard deviation at ``xs``."""
+        ks = _matern(np.asarray(xs, dtype=float), self.x, self.lengthscale)
+        mean = ks @ self.alpha
+        v = np.linalg.solve(self.chol, ks.T)
+        var = np.clip(1 - (v * v).sum(0), 1e-12, None)
+        return mean * self.y_std + self.y_mean, np.sqrt(var) * self.y_std
+
+
+_norm_cdf = np.vectorize(lambda z: 0.5 * (1 + erf(z / sqrt(2))))
+
+
+def expected_improvement(mean, std, best):
+    z = (mean - best) / std
+    pdf = np.exp(-0.5 * z * z) / sqrt(2 * np.pi)
+    return (mean - best) * _norm_cdf(z) + std * pdf
+
+
+def _propose(x, y, noise, rng, count, pool_size=2048):
+    """Pick ``count`` points by expected improvement, faking each pick's result as the GP mean."""
+    x, y, noise = np.array(x), np.array(y), np.array(noise)
+    dims = x.shape[1]
+    picks = []
+    for _ in range(count):
+        gp = GaussianProcess(x, y, noise)
+        top = x[np.argsort(y)[-3:]]
+        # Half global exploration, half concentrated around the best allocations so far.
+        pool = np.vstack([
+            rng.dirichlet(np.ones(dims), pool_size // 2),
+            *(rng.dirichlet(point * 60 + 0.2, pool_size // 6) for point in top),
+        ])
+        mean, std = gp.predict(pool)
+        pick = pool[np.argmax(expected_improvement(mean, std, y.max()))]
+        picks.append(pick)
+        x = np.vstack([x, pick])
+        y = np.append(y, gp.predict(pick[None])[0][0])
+        noise = np.append(noise, 0.0)
+    return picks
+
+
+def _score(stats):
+    """Log of mean team damage and the variance of that estimate."""
+    n = stats.num_simulations
+    mean = stats.team_total_sum / n
+    variance = _variance(stats.team_total_sum, stats.team_total_sq, n) / n
+    return log(mean), variance / (mean * mean)
+
+
+def optimize_stats(config=TEAM, hero_id="hero_LFA_Hero", stats=DAMAGE_STATS, budget=None, evaluations=120,
+                   initial=None, battles_per_eval=8, workers=None, base_seed=None):
+    """Search ``hero_id``'s allocation of ``stats`` and return ``(config, mean_damage, weights)`` best first.
+
+    ``initial`` random allocations (default ``2 * len(stats)``) plus the current
+    one seed the GP; after that each batch of ``workers`` candidates comes from
+    expected improvement. Every evaluation runs ``battles_per_eval`` battles
+    on seeds ``base_seed + i``.
+    """
+    if battles_per_eval < 2:
+        raise ValueError("battles_per_eval must be at least 2 to estimate noise")
+    if base_seed is None:
+        base_seed = random.randrange(2**32)
+    workers = workers or os.cpu_count() or 1
+    rng = np.random.default_rng(base_seed)
+    spec = next(spec for spec in config.heroes if spec.hero_id == hero_id)
+    if budget is None:
+        budget = allocation_cost(spec, stats)
+    initial = initial or 2 * len(stats)
+    seeds = range(base_seed, base_seed + battles_per_eval)
+
+    x, y, noise, results = [], [], [], []
+    with ProcessPoolExecutor(max_workers=workers, initializer=_silence_worker) as pool:
+        def evaluate(batch):
+            configs = [apply_allocation(config, hero_id, stats, w, budget) for w in batch]
+            futures = [pool.submit(_run_seeds, seeds, c, True) for c in configs]
+            for weights, candidate, future in zip(batch, configs, futures):
+                score, variance = _score(future.result())
+                x.append(weights)
+                y.append(score)
+                noise.append(variance)
+                results.append((candidate, float(np.exp(score)), tuple(float(w) for w in weights)))
+
+        start = [allocation_weights(spec, stats), *rng.dirichlet(np.ones(len(stats)), initial)]
+        evaluate(start[:evaluations])
+        while len(results) < evaluations:
+            batch = _propose(x, y, noise, rng, min(workers, evaluations - len(results)))
+            evaluate(batch)
+            print(f"🔎 {len(results)} allocations tried, best {np.exp(max(y)):.2e}")
+
+    results.sort(key=lambda r: r[1], reverse=True)
+    print_allocation(results[0], hero_id, stats)
+    return results
+
+
+def print_allocation(result, hero_id, stats):
+    candidate, mean, _ = result
+    spec = next(spec for spec in candidate.heroes if spec.hero_id == hero_id)
+    print(f"\n🧮 BEST ALLOCATION for {hero_id}: {mean:.2e} AVG TEAM DMG\n")
+    for stat in stats:
+        print(f"{stat:>13}: {getattr(spec, stat)}")
+
+
+if __name__ == "__main__":
+    optimize_stats(evaluations=60)
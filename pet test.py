@@ -34,7 +34,7 @@ team.pet.bind_team(team)
 
 boss = Boss()
 boss.hp = boss.max_hp = 5_000_000_000
-boss.poison_effects = []
+boss.poison_effects.clear()
 
 logs = []
 round_num = 6
@@ -0,0 +1,128 @@
+# race_loadouts.py
+"""Search artifact / enable / lifestar assignments by racing (successive halving).
+
+Each hero's loadout is ``(artifact, purify, trait, lifestar)``. With six heroes
+the space is far too large to simulate exhaustively, so many random loadouts
+get a few battles each, the better half moves on with more battles, and so on
+until ``top_k`` remain. Every candidate fights the same seeds on split RNG
+streams, so the ranking compares builds rather than luck.
+"""
+import math
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from debug_fast_average import TEAM, AverageStats, _run_seeds, _silence_worker
+from game_logic.engine import ARTIFACTS, LIFESTARS, PURIFIES, TRAITS
+
+LOADOUT_FIELDS = ("artifact", "purify", "trait", "lifestar")
+CHOICES = {
+    "artifact": tuple(ARTIFACTS),
+    "purify": tuple(PURIFIES),
+    "trait": tuple(TRAITS),
+    "lifestar": (*LIFESTARS, None),
+}
+
+
+def loadout_of(config):
+    """The loadout of every hero in ``config``, as a hashable tuple."""
+    return tuple(tuple(getattr(spec, field) for field in LOADOUT_FIELDS) for spec in config.heroes)
+
+
+def apply_loadout(config, loadout):
+    """``config`` with each hero's artifact, enables and lifestar taken from ``loadout``."""
+    heroes = tuple(spec._replace(**dict(zip(LOADOUT_FIELDS, gear))) for spec, gear in zip(config.heroes, loadout))
+    return config._replace(heroes=heroes)
+
+
+def random_loadout(num_heroes, rng, choices=CHOICES):
+    return tuple(tuple(rng.choice(choices[field]) for field in LOADOUT_FIELDS) for _ in range(num_heroes))
+
+
+class Candidate:
+    """One loadout and the battles it has fought so far."""
+
+    def __init__(self, loadout, config):
+        self.loadout = loadout
+        self.config = apply_loadout(config, loadout)
+        self.stats = AverageStats()
+
+    @property
+    def battles(self):
+        return self.stats.num_simulations
+
+    @property
+    def mean(self):
+        return self.stats.team_total_sum / self.battles if self.battles else 0.0
+
+
+def _chunks(seeds, parts):
+    size = -(-len(seeds) // parts)
+    return [seeds[i:i + size] for i in range(0, len(seeds), size)]
+
+
+def _top_up(pool, candidates, battles, base_seed, workers):
+    """Bring every candidate to ``battles`` battles on seeds ``base_seed + i``."""
+    parts = max(1, -(-workers // len(candidates)))
+    jobs = []
+    for candidate in candidates:
+        seeds = range(base_seed + candidate.battles, base_seed + battles)
+        for chunk in _chunks(seeds, parts) if seeds else ():
+            jobs.append((candidate, pool.submit(_run_seeds, chunk, candidate.config, True)))
+    for candidate, future in jobs:
+        candidate.stats.merge(future.result())
+
+
+def race_loadouts(config=TEAM, num_candidates=64, initial_battles=4, eta=2, top_k=5, choices=CHOICES,
+                  workers=None, base_seed=None, confidence=0.95):
+    """Race ``num_candidates`` loadouts (the current one plus random ones) and return the ``top_k``.
+
+    Each round tops the survivors up to the round's battle count, keeps the
+    best ``1/eta`` by mean team damage (never fewer than ``top_k``) and
+    multiplies the battle count by ``eta``. The survivors get one last round so
+    they are reported on equal footing.
+    """
+    if base_seed is None:
+        base_seed = random.randrange(2**32)
+    workers = workers or os.cpu_count() or 1
+    rng = random.Random(base_seed)
+
+    current = loadout_of(config)
+    seen = {current}
+    candidates = [Candidate(current, config)]
+    # Bounded retries in case ``choices`` leaves fewer loadouts than asked for.
+    for _ in range(num_candidates * 20):
+        if len(candidates) >= num_candidates:
+            break
+        loadout = random_loadout(len(config.heroes), rng, choices)
+        if loadout not in seen:
+            seen.add(loadout)
+            candidates.append(Candidate(loadout, config))
+
+    battles = initial_battles
+    with ProcessPoolExecutor(max_workers=workers, initializer=_silence_worker) as pool:
+        while True:
+            _top_up(pool, candidates, battles, base_seed, workers)
+            candidates.sort(key=lambda c: c.mean, reverse=True)
+            print(f"🏁 {len(candidates)} loadouts at {battles} battles, best {candidates[0].mean:.2e}")
+            if len(candidates) <= top_k:
+                break
+            candidates = candidates[:max(top_k, math.ceil(len(candidates) / eta))]
+            battles *= eta
+
+    print_ranking(candidates, config, confidence)
+    return candidates
+
+
+def print_ranking(candidates, config, confidence=0.95):
+    names = [spec.hero_id.removeprefix("hero_").removesuffix("_Hero") for spec in config.heroes]
+    print(f"\n🏆 TOP {len(candidates)} LOADOUTS\n")
+    for rank, candidate in enumerate(candidates, 1):
+        mean, half = candidate.stats.interval(confidence=confidence)
+        print(f"#{rank}: {mean:.2e} ± {half:.2e} ({candidate.battles} battles)")
+        for name, gear in zip(names, candidate.loadout):
+            print(f"    {name:>5}: " + " / ".join(str(part) for part in gear))
+
+
+if __name__ == "__main__":
+    race_loadouts(num_candidates=32, initial_battles=4, top_k=3)
@@ -0,0 +1,109 @@
+# sim_cache.py
+"""On-disk cache of aggregate simulation results (SQLite).
+
+A row holds the merged AverageStats of the first ``battles`` battles of one
+team. It is keyed by a canonical hash of the BattleConfig, ENGINE_VERSION and
+a hash of the game_logic sources, so any engine edit makes old rows miss
+(they are pruned when the cache is opened). Battle ``i`` of a team always
+uses seed ``team_seed + i``, which is what lets a request for more battles
+run only the difference and merge it into the stored numbers.
+"""
+import hashlib
+import json
+import os
+import sqlite3
+import time
+from contextlib import closing
+from pathlib import Path
+
+from debug_fast_average import AverageStats, simulate_seeds
+from game_logic.engine import ENGINE_VERSION
+
+DEFAULT_PATH = os.environ.get("SIM_CACHE_PATH", str(Path(__file__).with_name("sim_cache.sqlite3")))
+GAME_LOGIC_DIR = Path(__file__).with_name("game_logic")
+
+
+def _canonical(value):
+    if hasattr(value, "_asdict"):
+        return {key: _canonical(item) for key, item in value._asdict().items()}
+    if isinstance(value, (list, tuple)):
+        return [_canonical(item) for item in value]
+    if isinstance(value, str):
+        return value.lower()
+    if isinstance(value, (int, float)) and not isinstance(value, bool):
+        # 11e9 and 11_000_000_000 are the same stat.
+        return float(value)
+    return value
+
+
+def team_hash(config):
+    """Stable hash of a BattleConfig: heroes, stats, gear, enables, lifestars, pet and core."""
+    text = json.dumps(_canonical(config), sort_keys=True, separators=(",", ":"))
+    return hashlib.sha256(text.encode()).hexdigest()
+
+
+def source_hash(root=GAME_LOGIC_DIR):
+    """Hash of every .py file under game_logic/, so any engine edit changes it."""
+    digest = hashlib.sha256()
+    for path in sorted(Path(root).rglob("*.py")):
+        digest.update(path.relative_to(root).as_posix().encode())
+        digest.update(path.read_bytes())
+    return digest.hexdigest()
+
+
+def team_seed(config):
+    return int(team_hash(config)[:8], 16)
+
+
+class ResultCache:
+    def __init__(self, path=DEFAULT_PATH, source=None):
+        self.path = path
+        self.source = source or source_hash()
+        with closing(self._connect()) as db, db:
+            db.execute("""CREATE TABLE IF NOT EXISTS results (
+                team_hash TEXT NOT NULL,
+                engine_version INTEGER NOT NULL,
+                source_hash TEXT NOT NULL,
+                battles INTEGER NOT NULL,
+                stats TEXT NOT NULL,
+                updated REAL NOT NULL,
+                PRIMARY KEY (team_hash, engine_version, source_hash))""")
+            db.execute("DELETE FROM results WHERE engine_version != ? OR source_hash != ?",
+                       (ENGINE_VERSION, self.source))
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def get(self, config):
+        """Cached AverageStats for ``config``, or None."""
+        with closing(self._connect()) as db:
+            row = db.execute("SELECT stats FROM results WHERE team_hash = ? AND engine_version = ? AND source_hash = ?",
+                             (team_hash(config), ENGINE_VERSION, self.source)).fetchone()
+        return AverageStats.from_dict(json.loads(row[0])) if row else None
+
+    def put(self, config, stats):
+        """Store ``stats`` unless a row with at least as many battles is already there."""
+        with closing(self._connect()) as db, db:
+            db.execute("""INSERT INTO results VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT (team_hash, engine_version, source_hash) DO UPDATE
+                SET battles = excluded.battles, stats = excluded.stats, updated = excluded.updated
+                WHERE excluded.battles > results.battles""",
+                       (team_hash(config), ENGINE_VERSION, self.source, stats.num_simulations,
+                        json.dumps(stats.to_dict()), time.time()))
+
+    def missing_seeds(self, config, num_battles):
+        """``(cached_stats, seeds)``: what is stored for ``config`` and the seeds still to run."""
+        stats = self.get(config) or AverageStats()
+        base = team_seed(config)
+        return stats, range(base + min(stats.num_simulations, num_battles), base + num_battles)
+
+    def simulate(self, config, num_battles, workers=None):
+        """AverageStats over at least ``num_battles`` battles, running only the ones not cached yet.
+
+        Returns every cached battle, so the count can exceed ``num_battles``.
+        """
+        stats, seeds = self.missing_seeds(config, num_battles)
+        if seeds:
+            stats.merge(simulate_seeds(seeds, config, workers))
+            self.put(config, stats)
+        return stats
@@ -0,0 +1,196 @@
+# sim_jobs.py
+"""Bounded, fair queue for simulation work submitted from the Discord bot.
+
+A job is a list of units: ``(func, args)`` calls that run on the executor,
+each taking a ``should_stop`` keyword it checks between rounds (see
+Battle.run). The scheduler keeps at most ``max_in_flight`` units running
+overall, limits how many jobs one user and everyone together may queue, and
+hands each free slot to the next user in round-robin order, so one user's
+10k-battle sweep only ever holds its share of the workers. A user's jobs run
+one after another.
+
+Cancelling sets the job's event, which running units see at their next round
+boundary, and drops the units that have not started. Progress callbacks are
+throttled to one per ``progress_interval`` seconds plus the final one. They
+run as their own tasks, in order, after a finished unit's slot has been
+handed on, and a job's result waits for its last report.
+"""
+import asyncio
+import itertools
+import threading
+import time
+from collections import deque
+from functools import partial
+
+
+class QueueFull(Exception):
+    """The user (or the whole bot) already has as many jobs queued as allowed."""
+
+
+class JobCancelled(Exception):
+    """The job was cancelled before it finished."""
+
+
+class SimJob:
+    def __init__(self, job_id, user_id, units, cancel_event, on_progress=None):
+        self.job_id = job_id
+        self.user_id = user_id
+        self.pending = deque(enumerate(units))
+        self.total = len(self.pending)
+        self.results = [None] * self.total
+        self.done = 0
+        self.in_flight = 0
+        self.cancel_event = cancel_event
+        self.on_progress = on_progress
+        self.last_progress = 0.0
+        self.progress_task = None
+        self.error = None
+        self.future = asyncio.get_running_loop().create_future()
+
+    @property
+    def cancelled(self):
+        return self.cancel_event.is_set()
+
+    async def wait(self):
+        """The units' results in order; raises JobCancelled or the first unit's error."""
+        return await self.future
+
+
+class SimScheduler:
+    def __init__(self, executor, max_in_flight, max_jobs_per_user=2, max_jobs=32,
+                 event_factory=threading.Event, progress_interval=2.0):
+        self.executor = executor
+        self.max_in_flight = max_in_flight
+        self.max_jobs_per_user = max_jobs_per_user
+        self.max_jobs = max_jobs
+        # Must give events the workers can see: threading.Event for threads,
+        # a multiprocessing Manager's Event for processes.
+        self.event_factory = event_factory
+        self.progress_interval = progress_interval
+        self._ids = itertools.count(1)
+        self._queues = {}
+        self._ready = deque()
+        self._in_flight = 0
+
+    @property
+    def queued_jobs(self):
+        return sum(len(jobs) for jobs in self._queues.values())
+
+    def submit(self, user_id, units, on_progress=None):
+        """Queue ``units`` for ``user_id`` and return the SimJob.
+
+        ``on_progress(job)`` is awaited as units finish (throttled).
+        """
+        jobs = self._queues.get(user_id, ())
+        if len(jobs) >= self.max_jobs_per_user:
+            raise QueueFull(f"you already have {len(jobs)} simulations queued")
+        if self.queued_jobs >= self.max_jobs:
+            raise QueueFull("the simulation queue is full, try again shortly")
+
+        job = SimJob(next(self._ids), user_id, units, self.event_factory(), on_progress)
+        if not job.total:
+            job.future.set_result([])
+            return job
+        if user_id not in self._queues:
+            self._queues[user_id] = deque()
+            self._ready.append(user_id)
+        self._queues[user_id].append(job)
+        self._fill()
+        return job
+
+    def cancel(self, user_id):
+        """Cancel every queued or running job of ``user_id``; returns how many."""
+        jobs = list(self._queues.get(user_id, ()))
+        for job in jobs:
+            job.cancel_event.set()
+            job.pending.clear()
+            if not job.in_flight:
+                self._finish(job)
+        return len(jobs)
+
+    def _fill(self):
+        while self._in_flight < self.max_in_flight and self._ready:
+            user_id = self._ready.popleft()
+            job = self._queues[user_id][0]
+            if not job.pending:
+                # Cancelled or failed; the user comes back when the job finishes.
+                continue
+            index, (func, args) = job.pending.popleft()
+            job.in_flight += 1
+            self._in_flight += 1
+            asyncio.ensure_future(self._run_unit(job, index, func, args))
+            # Back of the line; once the head job is fully handed out, the
+            # user only returns when it finishes (one job at a time).
+            if job.pending:
+                self._ready.append(user_id)
+
+    async def _run_unit(self, job, index, func, args):
+        loop = asyncio.get_running_loop()
+        call = partial(func, *args, should_stop=job.cancel_event.is_set)
+        try:
+            job.results[index] = await loop.run_in_executor(self.executor, call)
+            job.done += 1
+        except Exception as exc:
+            if not job.cancelled:
+                job.error = exc
+                job.cancel_event.set()
+                job.pending.clear()
+        finally:
+            job.in_flight -= 1
+            self._in_flight -= 1
+        # Hand the slot on before any progress I/O (a Discord edit may wait on rate limits).
+        self._fill()
+
+        if job.on_progress and not job.cancelled:
+            now = time.monotonic()
+            if job.done == job.total:
+                self._report(job)
+            elif now - job.last_progress >= self.progress_interval and not self._reporting(job):
+                job.last_progress = now
+                self._report(job)
+
+        if not job.in_flight and not job.pending:
+            if self._reporting(job):
+                # The last report must not land after the caller has shown the result.
+                await asyncio.wait([job.progress_task])
+            self._finish(job)
+            self._fill()
+
+    @staticmethod
+    def _reporting(job):
+        return job.progress_task is not None and not job.progress_task.done()
+
+    def _report(self, job):
+        previous = job.progress_task
+
+        async def report():
+            if previous is not None:
+                await asyncio.wait([previous])
+            try:
+                await job.on_progress(job)
+            except Exception as exc:
+                print(f"⚠️ progress update for job {job.job_id} failed: {exc}")
+
+        job.progress_task = asyncio.ensure_future(report())
+
+    def _finish(self, job):
+        jobs = self._queues.get(job.user_id)
+        if not jobs or job not in jobs:
+            return
+        was_head = jobs[0] is job
+        jobs.remove(job)
+        if not jobs:
+            del self._queues[job.user_id]
+            if job.user_id in self._ready:
+                self._ready.remove(job.user_id)
+        elif was_head and job.user_id not in self._ready:
+            self._ready.append(job.user_id)
+
+        if job.future.done():
+            return
+        if job.error is not None:
+            job.future.set_exception(job.error)
+        elif job.cancelled:
+            job.future.set_exception(JobCancelled(job.job_id))
+        else:
+            job.future.set_result(job.results)
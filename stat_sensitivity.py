@@ -0,0 +1,120 @@
+# stat_sensitivity.py
+"""Marginal team damage per stat point, by paired finite differences.
+
+For each hero and stat, every seed is fought twice on split RNG streams: once
+with the stat's base field raised by ``step`` and once lowered by ``step``.
+The base field is the one ``Hero.recalculate_stats`` resets the stat to
+(``_base_hd``, ``original_armor``, ...), so the change survives every
+recalculation. Both points are kept inside the stat's floor and cap, so a
+stat at 0 (or at its cap) gets a one-sided difference, and the paired
+difference is divided by how far the clamped stat actually moved.
+"""
+import os
+import random
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor
+
+from compare_builds import PairedStats, team_damage
+from debug_fast_average import TEAM, _silence_worker
+from game_logic.engine import Battle, build_battle
+from game_logic.rng import BattleRNG
+
+# stat -> (Hero field recalculate_stats resets it to, finite-difference step,
+# floor, cap). Caps are where the damage formulas stop responding; None is uncapped.
+SENSITIVITY_STATS = {
+    "spd": ("_base_spd", 100, 0, None),
+    "hd": ("_base_hd", 10, 0, None),
+    "precision": ("_base_precision", 10, 0, 150),
+    "crit_rate": ("_base_crit_rate", 5, 0, 100),
+    "add": ("_base_all_damage_dealt", 10, 0, None),
+    # Boss.take_damage: armor reduction is min(armor / 2180, 0.90).
+    "armor": ("original_armor", 500, 0, 1962),
+    "dr": ("_base_dr", 5, 0, 75),
+    "adr": ("_base_adr", 5, 0, 75),
+}
+
+Sensitivity = namedtuple("Sensitivity", ["pairs", "span"])
+Sensitivity.__doc__ = """PairedStats of upper vs lower point team damage, and how many points the
+clamped stat moved between them (0 when it cannot move)."""
+
+
+def _clamp(value, floor, cap):
+    return max(value, floor) if cap is None else min(max(value, floor), cap)
+
+
+def finite_difference_deltas(value, step, floor, cap):
+    """``(up, down)`` shifts of a field at ``value`` that keep both points within ``[floor, cap]``.
+
+    A value already past the cap has no effect above it, so the upper point
+    stays put and the lower point drops to just under the cap.
+    """
+    effective = _clamp(value, floor, cap)
+    upper = _clamp(effective + step, floor, cap)
+    lower = _clamp(effective - step, floor, cap)
+    up = upper - value if cap is None or value <= cap else 0
+    return up, lower - value
+
+
+def run_perturbed(config, seed, hero, field, delta, stop_on_death=()):
+    """Run one split-stream battle with ``hero``'s ``field`` shifted by ``delta``."""
+    rng = BattleRNG(seed, split=True)
+    team, boss = build_battle(config, rng)
+    target = next(h for h in team.heroes if h.name == hero)
+    setattr(target, field, getattr(target, field) + delta)
+    target.recalculate_stats()
+    return Battle(team, boss, stop_on_death=stop_on_death, seed=seed).run()
+
+
+def _central_differences(config, hero, stat, seeds, stop_on_death=()):
+    field, step, floor, cap = SENSITIVITY_STATS[stat]
+    team, _ = build_battle(config, BattleRNG(seeds.start))
+    value = getattr(next(h for h in team.heroes if h.name == hero), field)
+    up, down = finite_difference_deltas(value, step, floor, cap)
+    # The formulas see the clamped stat, so a field past its cap moves it less than the field.
+    span = _clamp(value + up, floor, cap) - _clamp(value + down, floor, cap)
+    pairs = PairedStats()
+    if not span:
+        return Sensitivity(pairs, 0)
+    for seed in seeds:
+        pairs.add(team_damage(run_perturbed(config, seed, hero, field, up, stop_on_death)),
+                  team_damage(run_perturbed(config, seed, hero, field, down, stop_on_death)))
+    return Sensitivity(pairs, span)
+
+
+def stat_sensitivity(config=TEAM, heroes=None, stats=tuple(SENSITIVITY_STATS), num_battles=50, base_seed=None,
+                     workers=None, stop_on_death=(), confidence=0.95):
+    """Return ``{(hero, stat): Sensitivity}`` and print the report.
+
+    ``heroes`` are hero names (default: the whole team). Divide a pair's
+    difference by ``span`` for damage per point; print_sensitivity does.
+    """
+    if base_seed is None:
+        base_seed = random.randrange(2**32)
+    workers = workers or os.cpu_count() or 1
+    if heroes is None:
+        heroes = [h.name for h in build_battle(config, BattleRNG(base_seed))[0].heroes]
+    seeds = range(base_seed, base_seed + num_battles)
+
+    with ProcessPoolExecutor(max_workers=workers, initializer=_silence_worker) as pool:
+        futures = {(hero, stat): pool.submit(_central_differences, config, hero, stat, seeds, stop_on_death)
+                   for hero in heroes for stat in stats}
+        results = {key: future.result() for key, future in futures.items()}
+
+    print_sensitivity(results, confidence)
+    return results
+
+
+def print_sensitivity(results, confidence=0.95):
+    n = max((result.pairs.n for result in results.values()), default=0)
+    print(f"\n📈 MARGINAL TEAM DAMAGE PER STAT POINT (across {n} seed pairs, {confidence:.0%} CI)\n")
+    for (hero, stat), (pairs, span) in results.items():
+        if not span:
+            print(f"{hero:>5} {stat:>9}: n/a (no room between floor and cap)")
+            continue
+        low, high = pairs.interval(confidence)
+        print(f"{hero:>5} {stat:>9}: {pairs.mean_diff / span:+.2e} "
+              f"[{low / span:+.2e}, {high / span:+.2e}] over {span:g} points")
+
+
+if __name__ == "__main__":
+    stat_sensitivity(heroes=["LFA"], num_battles=30)
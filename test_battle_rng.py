@@ -0,0 +1,12 @@
+import random
+
+from debug_fast_average import simulate_one_battle
+
+
+def test_same_seed_replays_identically_despite_global_random():
+    random.seed(1)
+    first = simulate_one_battle(42)
+    random.seed(2)
+    second = simulate_one_battle(42)
+
+    assert first == second
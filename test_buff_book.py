@@ -0,0 +1,148 @@
+import copy
+
+import pytest
+
+from game_logic.buff_book import BuffBook
+
+
+def make_book():
+    book = BuffBook()
+    book["gg_atk"] = {"attribute": "atk", "bonus": 0.16, "rounds": 2}
+    book["crit_down"] = {"attribute": "crit_rate", "bonus": -20, "rounds": 3}
+    book["start_HD"] = {"attribute": "HD", "bonus": 10, "rounds": 9999}
+    book["boss_attack_debuff"] = {"attribute": "atk", "bonus": -500, "rounds": 2}
+    book["mystical_veil"] = {"layers": 2, "rounds": 9999}
+    return book
+
+
+def test_totals_follow_insert_replace_and_remove():
+    book = make_book()
+    assert book.total("atk") == 0.16 - 500
+    assert book.total("energy") == 0
+
+    book["boss_attack_debuff"] = {"attribute": "atk", "bonus": -100, "rounds": 2}
+    assert book.total("atk") == 0.16 - 100
+
+    del book["gg_atk"]
+    assert book.pop("boss_attack_debuff")["bonus"] == -100
+    assert book.total("atk") == 0
+    assert not book.has("atk")
+
+
+def test_add_bonus_updates_totals_and_sign():
+    book = make_book()
+    book["start_ADR"] = {"attribute": "ADR", "bonus": 10, "rounds": 9999}
+    assert book.add_bonus("start_ADR", -30) == -20
+    assert book.total("ADR") == -20
+    assert "start_ADR" in book.negatives()
+
+    book.add_bonus("start_HD", 10)
+    assert book.total("HD") == 20
+
+
+def test_lookups_keep_insertion_order():
+    book = make_book()
+    assert book.named("atk") == ["gg_atk", "boss_attack_debuff"]
+    assert book.named({"HD", "atk"}) == ["gg_atk", "start_HD", "boss_attack_debuff"]
+    assert book.negatives() == ["crit_down", "boss_attack_debuff"]
+    assert list(book) == ["gg_atk", "crit_down", "start_HD", "boss_attack_debuff", "mystical_veil"]
+
+
+def test_copies_rebuild_the_indexes():
+    book = make_book()
+    clone = copy.deepcopy(book)
+    clone.add_bonus("gg_atk", 1)
+
+    assert isinstance(clone, BuffBook)
+    assert clone.total("atk") == 1.16 - 500
+    assert book.total("atk") == 0.16 - 500
+    assert clone.negatives() == book.negatives()
+
+
+def test_tick_removes_only_buffs_that_ran_out():
+    book = BuffBook()
+    book["short"] = {"attribute": "atk", "bonus": 5, "rounds": 1}
+    book["two"] = {"attribute": "atk", "bonus": 7, "rounds": 2}
+    book["spent"] = {"attribute": "energy", "bonus": 10, "rounds": 0}
+    book["forever"] = {"attribute": "ADR", "bonus": 50, "rounds": 9999}
+
+    assert [name for name, _ in book.tick()] == ["short", "spent"]
+    assert book.remaining("two") == 1
+    assert book.copy_of("two")["rounds"] == 1
+    assert book["two"]["rounds"] == 2
+    assert [name for name, _ in book.tick()] == ["two"]
+    assert book.total("atk") == 0
+
+    for _ in range(20):
+        assert book.tick() == []
+    assert book.remaining("forever") == 9999 - 22
+
+
+def test_reapplying_a_buff_restarts_its_countdown():
+    book = BuffBook()
+    book["gg_atk"] = {"attribute": "atk", "bonus": 1, "rounds": 2}
+    book.tick()
+    book["gg_atk"] = {"attribute": "atk", "bonus": 1, "rounds": 2}
+    assert book.tick() == []
+    assert book.remaining("gg_atk") == 1
+
+    clone = copy.deepcopy(book)
+    assert clone.remaining("gg_atk") == 1
+    assert [name for name, _ in clone.tick()] == ["gg_atk"]
+    assert "gg_atk" in book
+
+
+def test_stacks_share_one_entry_and_expire_on_their_own():
+    book = BuffBook()
+    book.add_stack("foresight_basic", {"attribute": "all_damage_dealt", "bonus": 30, "rounds": 2})
+    book.tick()
+    book.add_stack("foresight_basic", {"attribute": "all_damage_dealt", "bonus": 30, "rounds": 2})
+    book.add_stack("antlers", {"attribute": "all_damage_dealt", "bonus": 9, "rounds": 9999})
+    book.add_stack("antlers", {"attribute": "all_damage_dealt", "bonus": 9, "rounds": 9999})
+
+    assert list(book) == ["foresight_basic", "antlers"]
+    assert book.stacks("foresight_basic") == 2
+    assert book.stacks("antlers") == 2
+    assert book.total("all_damage_dealt") == 78
+    assert book.remaining("foresight_basic") == 2
+
+    clone = copy.deepcopy(book)
+    assert [buff["bonus"] for _, buff in book.tick()] == [30]
+    assert book.stacks("foresight_basic") == 1
+    assert book.total("all_damage_dealt") == 48
+    assert [name for name, _ in book.tick()] == ["foresight_basic"]
+    assert "foresight_basic" not in book
+    assert book.stacks("foresight_basic") == 0
+
+    assert clone.stacks("foresight_basic") == 2
+    clone.pop("antlers")
+    assert clone.total("all_damage_dealt") == 60
+
+
+def test_one_stack_can_be_copied_or_removed():
+    book = BuffBook()
+    book.add_stack("atk_down", {"attribute": "atk", "bonus": -0.1, "rounds": 4})
+    book.tick()
+    book.add_stack("atk_down", {"attribute": "atk", "bonus": -0.2, "rounds": 2})
+    book.add_stack("atk_down", {"attribute": "atk", "bonus": -0.3, "rounds": 9999})
+    assert book.each_stack(["atk_down"]) == [("atk_down", 0), ("atk_down", 1), ("atk_down", 2)]
+    assert [buff["rounds"] for buff in book.stack_copies("atk_down")] == [3, 2, 9999]
+
+    assert book.remove_stack("atk_down", 2) == {"attribute": "atk", "bonus": -0.3, "rounds": 9999}
+    assert book.stacks("atk_down") == 2
+    assert book.total("atk") == pytest.approx(-0.3)
+    assert book.remaining("atk_down") == 3  # the longest stack left
+    book.remove_stack("atk_down")
+    assert book.remaining("atk_down") == 2
+    assert book.remove_stack("atk_down")["bonus"] == -0.2
+    assert "atk_down" not in book and book.total("atk") == 0 and not book.negatives()
+    assert book.tick() == [] and book.tick() == []
+
+
+def test_stacks_sum_numeric_fields():
+    book = BuffBook()
+    for _ in range(3):
+        book.add_stack("nova_heal", {"attribute": "regen", "heal_amount": 100, "rounds": 1, "skill_buff": True})
+    assert book["nova_heal"]["heal_amount"] == 300
+    assert book["nova_heal"]["skill_buff"] is True
+    assert len(book.tick()) == 3
@@ -0,0 +1,56 @@
+import pickle
+
+import pytest
+
+from compare_builds import PairedStats, paired_battle, swap_artifact, t_critical
+from debug_fast_average import TEAM
+from game_logic.rng import BattleRNG
+
+
+def test_split_streams_are_independent_and_survive_pickling():
+    rng = BattleRNG(7, split=True)
+    rng.stream("crit", "LFA").random()
+    crit = rng.stream("crit", "LFA")
+    assert crit is rng.stream("crit", "LFA")
+    assert crit is not rng.stream("dodge", "LFA")
+
+    clone = pickle.loads(pickle.dumps(rng))
+    assert clone.stream("crit", "LFA").random() == crit.random()
+    assert clone.random() == rng.random()
+
+    # Rolling one purpose more often leaves the others untouched.
+    other = BattleRNG(7, split=True)
+    for _ in range(5):
+        other.stream("pet").random()
+    assert other.stream("crit", "LFA").random() == BattleRNG(7, split=True).stream("crit", "LFA").random()
+
+
+def test_identical_builds_pair_up_exactly(capsys):
+    a, b = paired_battle(TEAM, TEAM, 42)
+    assert capsys.readouterr().out == ""
+    assert a == b > 0
+
+
+def test_paired_stats_interval_and_merge():
+    first, second = PairedStats(), PairedStats()
+    for a, b in [(10, 7), (12, 10), (9, 7)]:
+        first.add(a, b)
+    for a, b in [(11, 8), (13, 10)]:
+        second.add(a, b)
+    stats = first.merge(second)
+
+    assert stats.n == 5
+    assert stats.mean_diff == 2.6
+    low, high = stats.interval()
+    assert 0 < low < 2.6 < high
+    assert stats.verdict() == "A"
+    assert stats.variance_reduction() > 1
+    assert abs(t_critical(4) - 2.776) < 0.05
+    assert swap_artifact(TEAM, "hero_LFA_Hero", "scissors") != TEAM
+
+
+@pytest.mark.parametrize("df, confidence, expected", [
+    (1, 0.95, 12.706), (2, 0.95, 4.303), (5, 0.99, 4.032), (10, 0.90, 1.812), (30, 0.95, 2.042), (60, 0.95, 2.000),
+])
+def test_t_critical_matches_the_table_at_small_df(df, confidence, expected):
+    assert t_critical(df, confidence) == pytest.approx(expected, abs=1e-3)
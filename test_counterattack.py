@@ -6,6 +6,7 @@ from game_logic.artifacts import DB
 from game_logic.cores import PDECore, active_core
 from game_logic.enables import ControlPurify, BalancedStrike
 from game_logic.damage_utils import hero_deal_damage
+from utils.log_utils import render_logs
 
 # Create 6 heroes
 heroes = [
@@ -59,4 +60,4 @@ for hero in heroes:
 
 # Optionally print logs
 print("\n--- LOGS ---")
-print("\n".join(logs))
+print("\n".join(render_logs(logs)))
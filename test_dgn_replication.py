@@ -0,0 +1,39 @@
+import pytest
+
+from game_logic.boss import Boss
+from game_logic.heroes.base import Hero
+from game_logic.rng import BattleRNG
+from game_logic.team import Team
+
+
+def make_dgn_and_boss(seed):
+    rng = BattleRNG(seed)
+    dgn = Hero.from_stats("hero_DGN_Hero", [14e9, 9e7, 3300], rng=rng)
+    team = Team([dgn], [dgn], [], rng=rng)
+    return dgn, team, Boss(rng=rng)
+
+
+# The sample comes back in either order depending on the seed; cover both.
+@pytest.mark.parametrize("seed", range(8))
+def test_after_attack_copies_the_sampled_debuffs_not_fresh_replicas(seed):
+    dgn, team, boss = make_dgn_and_boss(seed)
+    boss.buffs["replicated_armor_cut_from_dgn"] = {"attribute": "armor", "bonus": -0.2, "rounds": 2}
+    boss.buffs.tick()
+    boss.buffs["armor_cut"] = {"attribute": "armor", "bonus": -0.2, "rounds": 2}
+
+    dgn.after_attack(dgn, boss, "basic", team)
+
+    # As with the old countdown: each replica keeps the time its source had left when sampled.
+    assert boss.buffs.remaining("replicated_armor_cut_from_dgn") == 2
+    assert boss.buffs.remaining("replicated_replicated_armor_cut_from_dgn_from_dgn") == 1
+
+
+def test_two_sampled_stacks_of_one_family_replicate_as_two_stacks():
+    dgn, team, boss = make_dgn_and_boss(0)
+    for rounds in (2, 3):
+        boss.buffs.add_stack("armor_cut", {"attribute": "armor", "bonus": -0.2, "rounds": rounds})
+    dgn.after_attack(dgn, boss, "basic", team)
+
+    assert boss.buffs.stacks("armor_cut") == 2
+    assert sorted(buff["rounds"] for buff in boss.buffs.stack_copies("replicated_armor_cut_from_dgn")) == [2, 3]
+    assert boss.buffs.total("armor") == pytest.approx(-0.8)
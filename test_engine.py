@@ -0,0 +1,161 @@
+import copy
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from battle import play_logged_battle
+from debug_fast_average import TEAM
+from game_logic.boss import Boss
+from game_logic.buff_handler import BuffHandler
+from game_logic.damage_utils import attacker_snapshot
+from game_logic.engine import VERDICT_LINES, Battle, BattleCancelled, build_battle, run_battle
+from game_logic.events import OFFSET
+from game_logic.rng import BattleRNG
+
+
+def test_run_battle_is_reproducible_for_a_seed(capsys):
+    first = run_battle(TEAM, seed=7)
+    second = run_battle(TEAM, seed=7)
+    assert capsys.readouterr().out == ""
+
+    assert first.damage == second.damage
+    assert [r.damage for r in first.rounds] == [r.damage for r in second.rounds]
+    assert first.verdict == second.verdict
+
+
+def test_round_stats_add_up_to_totals():
+    result = run_battle(TEAM, seed=3)
+
+    assert result.rounds_played == len(result.rounds)
+    assert result.verdict in ("victory", "defeat", "timeout", "stopped")
+    for name in result.hero_names:
+        assert sum(r.damage[name] for r in result.rounds) == pytest.approx(result.damage[name])
+
+
+def test_logs_are_only_kept_when_requested():
+    quiet = run_battle(TEAM, seed=3)
+    detailed = run_battle(TEAM, seed=3, log_level="detailed")
+
+    assert quiet.logs is None
+    assert all(r.logs is None for r in quiet.rounds)
+    assert detailed.logs
+    assert detailed.damage == quiet.damage
+
+
+def test_unknown_log_level_is_rejected():
+    team, boss = build_battle(TEAM)
+    with pytest.raises(ValueError):
+        Battle(team, boss, log_level="verbose")
+
+
+def test_summary_level_keeps_one_line_per_round():
+    result = run_battle(TEAM, seed=3, log_level="summary")
+
+    assert len(result.logs) == result.rounds_played
+    assert all(len(r.logs) == 1 for r in result.rounds)
+
+
+def test_curse_offset_ledger_matches_offset_events():
+    team, boss = build_battle(TEAM, BattleRNG(2))
+    battle = Battle(team, boss)
+    offsets = 0
+    while not battle.finished:
+        battle.play_round()
+        offsets += sum(1 for e in team.events if e.kind == OFFSET)
+    result = battle.result()
+
+    assert sum(result.curse_offsets.values()) == offsets > 0
+    sources = set(result.hero_names) | {"Boss", "round"}
+    for hero, source, attr in result.curse_offsets:
+        assert hero in result.hero_names and source in sources and attr
+
+
+def test_heroes_and_boss_have_no_instance_dict():
+    team, boss = build_battle(TEAM, BattleRNG(0))
+    Battle(team, boss).run()
+
+    for unit in team.heroes + [boss]:
+        assert not hasattr(unit, "__dict__"), type(unit).__name__
+
+
+def test_boss_atk_ramp_is_one_counting_buff():
+    team, boss = build_battle(TEAM, BattleRNG(3))
+    battle = Battle(team, boss)
+    battle.run()
+
+    ramp = boss.buffs["end_of_round_atk_buff"]
+    assert boss.buffs.named("atk").count("end_of_round_atk_buff") == 1
+    assert 1 <= ramp["stacks"] <= battle.round_num
+    assert ramp["bonus"] == pytest.approx(0.15 * ramp["stacks"])
+
+
+def test_attacker_snapshot_is_reused_until_stats_change():
+    team, boss = build_battle(TEAM, BattleRNG(0))
+    hero = team.heroes[0]
+    first = attacker_snapshot(hero)
+    assert attacker_snapshot(hero) is first
+
+    BuffHandler.apply_buff(hero, "gg_hd", {"attribute": "HD", "bonus": 20, "rounds": 2})
+    second = attacker_snapshot(hero)
+    assert second is not first
+    assert second.hd_factor == pytest.approx(first.hd_factor + 20 * 0.007)
+
+
+def test_boss_cleanse_removes_one_stack_of_a_family():
+    boss = Boss(rng=BattleRNG(0))
+    for _ in range(3):
+        boss.buffs.add_stack("lfa_atk_down_active", {"attribute": "atk", "bonus": -0.30, "rounds": 9999})
+    boss.end_of_round_effects([], 1)
+
+    assert boss.buffs.stacks("lfa_atk_down_active") == 2
+    assert boss.buffs["lfa_atk_down_active"]["bonus"] == pytest.approx(-0.60)
+
+
+def test_deal_hits_matches_separate_hits():
+    team, boss = build_battle(TEAM, BattleRNG(0))
+    twin_team, twin_boss = copy.deepcopy((team, boss))
+    hero, twin = team.heroes[0], twin_team.heroes[0]
+    hero.shield = twin.shield = 10_000
+
+    hits = boss.deal_hits(hero, int(boss.atk * 30), 3)
+    expected = [twin_boss.calculate_damage_to_hero(twin, int(twin_boss.atk * 30)) for _ in range(3)]
+
+    assert hits == expected
+    assert (hero.hp, hero.shield) == (twin.hp, twin.shield)
+
+
+def test_forks_continue_a_snapshot_independently():
+    battle = Battle(*build_battle(TEAM, BattleRNG(5)), seed=5)
+    for _ in range(5):
+        battle.play_round()
+    snapshot = battle.snapshot()
+
+    fork = Battle.fork(snapshot)
+    assert fork.round_num == snapshot.round_num == 5
+    assert fork.run().damage == battle.run().damage
+    assert Battle.fork(snapshot).round_num == 5
+
+    reseeded = [Battle.fork(snapshot, seed=11).run() for _ in range(2)]
+    assert reseeded[0].damage == reseeded[1].damage
+    assert reseeded[0].rounds[:5] == battle.rounds[:5]
+
+
+def test_logged_battle_runs_in_a_worker_process():
+    with ProcessPoolExecutor(max_workers=1) as pool:
+        blocks, all_logs = pool.submit(play_logged_battle, TEAM, 8).result()
+        result = pool.submit(run_battle, TEAM, 8).result()
+    again, _ = play_logged_battle(TEAM, 8)
+    assert [list(map(str, block)) for block in blocks] == [list(map(str, block)) for block in again]
+    assert all_logs[-1] == VERDICT_LINES[result.verdict]
+
+
+def test_should_stop_cancels_between_rounds():
+    rounds = []
+
+    def stop_after_three():
+        rounds.append(None)
+        return len(rounds) > 3
+
+    with pytest.raises(BattleCancelled) as cancelled:
+        run_battle(TEAM, 8, should_stop=stop_after_three)
+    assert cancelled.value.args == (3,)
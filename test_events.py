@@ -0,0 +1,34 @@
+from debug_fast_average import TEAM
+from game_logic.engine import Battle, build_battle
+from game_logic.events import CONTROL, HIT
+from game_logic.rng import BattleRNG
+from game_logic.team import group_control_effects
+from utils.log_utils import ControlLine
+
+
+def test_round_records_hero_and_boss_hits():
+    team, boss = build_battle(TEAM, BattleRNG(4))
+    Battle(team, boss).play_round()
+
+    hits = [e for e in team.events if e.kind == HIT]
+    assert any(e.source is boss and e.target in team.heroes for e in hits)
+    assert any(e.source in team.heroes and e.target is boss for e in hits)
+    assert all(e.amount >= 0 for e in hits)
+
+
+def test_control_events_match_hero_flags():
+    team, boss = build_battle(TEAM, BattleRNG(1))
+    battle = Battle(team, boss)
+    controls = []
+    while not battle.finished and not controls:
+        battle.play_round()
+        controls = [e for e in team.events if e.kind == CONTROL]
+    assert controls
+    assert all(e.detail in ("fear", "silence", "seal_of_light") for e in controls)
+
+
+def test_group_control_effects_drops_only_control_lines():
+    team, _ = build_battle(TEAM, BattleRNG(0))
+    logs = ["⚔️ Team begins actions", ControlLine("🧹 {} has {} removed.", "MFF", "Fear"),
+            "🧹 LFA removes boss buffs: hd_from_fear_1."]
+    assert group_control_effects(logs, team) == [logs[0], logs[2]]
@@ -0,0 +1,27 @@
+from utils.log_utils import BattleLog, LogRecord, render_logs
+
+
+def test_log_record_formats_once_on_demand():
+    calls = []
+
+    def fmt(name, dmg):
+        calls.append(name)
+        return f"{name} deals {dmg}M"
+
+    record = LogRecord(fmt, "LFA", 12)
+    assert calls == []
+    assert str(record) == "LFA deals 12M"
+    assert str(record) == "LFA deals 12M"
+    assert calls == ["LFA"]
+
+
+def test_battle_log_levels():
+    off, summary, detailed = BattleLog("off"), BattleLog("summary"), BattleLog("detailed")
+    for log in (off, summary, detailed):
+        log.extend(["hit"])
+        log.note("Round {}", 1)
+
+    assert off.lines == []
+    assert summary.render() == ["Round 1"]
+    assert detailed.render() == ["hit", "Round 1"]
+    assert render_logs(None) == []
@@ -0,0 +1,31 @@
+import numpy as np
+
+from debug_fast_average import TEAM
+from optimize_stats import (DAMAGE_STATS, GaussianProcess, allocation_cost, allocation_weights,
+                            apply_allocation, optimize_stats)
+
+
+def test_current_allocation_round_trips_through_weights():
+    lfa = TEAM.heroes[3]
+    budget = allocation_cost(lfa, DAMAGE_STATS)
+    weights = allocation_weights(lfa, DAMAGE_STATS)
+    assert abs(weights.sum() - 1) < 1e-9
+    assert apply_allocation(TEAM, lfa.hero_id, DAMAGE_STATS, weights, budget) == TEAM
+
+
+def test_gp_interpolates_and_grows_uncertain_away_from_data():
+    x = np.linspace(0, 1, 8)[:, None]
+    y = np.sin(3 * x[:, 0])
+    gp = GaussianProcess(x, y, np.zeros(8))
+    mean, std = gp.predict(np.array([[x[3, 0]], [3.0]]))
+    assert abs(mean[0] - y[3]) < 1e-3
+    assert std[0] < 1e-2 < std[1]
+
+
+def test_optimizer_returns_budgeted_allocations_best_first():
+    results = optimize_stats(stats=("crit_rate", "hd"), evaluations=4, initial=2, battles_per_eval=2,
+                             workers=2, base_seed=7)
+    assert len(results) == 4
+    assert results[0][1] >= results[-1][1]
+    lfa = next(spec for spec in results[0][0].heroes if spec.hero_id == "hero_LFA_Hero")
+    assert abs(allocation_cost(lfa, ("crit_rate", "hd")) - allocation_cost(TEAM.heroes[3], ("crit_rate", "hd"))) < 0.02
@@ -0,0 +1,35 @@
+import pytest
+
+from debug_fast_average import TEAM, run_debugfast_average, run_debugfast_average_parallel, run_debugfast_until
+from race_loadouts import apply_loadout, loadout_of, race_loadouts
+
+
+def test_parallel_matches_serial_for_same_seeds():
+    serial = run_debugfast_average(num_simulations=4, base_seed=1234)
+    parallel = run_debugfast_average_parallel(num_simulations=4, workers=2, base_seed=1234)
+
+    assert parallel.num_simulations == serial.num_simulations == 4
+    assert parallel.hero_totals == serial.hero_totals
+    assert parallel.best_damage == serial.best_damage
+    assert parallel.worst_damage == serial.worst_damage
+    assert sorted(parallel.ely_rounds_survived) == sorted(serial.ely_rounds_survived)
+
+
+def test_adaptive_run_stops_on_width_and_is_seed_ordered():
+    serial = run_debugfast_average(num_simulations=4, base_seed=1234)
+    loose = run_debugfast_until(target_width=10.0, min_simulations=4, batch_size=2, workers=2, base_seed=1234)
+    assert loose.num_simulations == 4
+    assert loose.hero_totals == pytest.approx(serial.hero_totals)
+
+    capped = run_debugfast_until(target_width=0.0, hero="LFA", max_simulations=6, batch_size=4, workers=2, base_seed=1234)
+    assert capped.num_simulations == 6
+    mean, half = capped.interval("LFA")
+    assert 0 < mean < 1 and half > 0
+
+
+def test_racing_keeps_the_best_loadouts_on_equal_battles():
+    top = race_loadouts(num_candidates=4, initial_battles=1, top_k=2, workers=2, base_seed=99)
+    assert len(top) == 2
+    assert top[0].battles == top[1].battles == 2
+    assert top[0].mean >= top[1].mean
+    assert apply_loadout(TEAM, loadout_of(TEAM)) == TEAM
@@ -0,0 +1,36 @@
+import pytest
+
+from debug_fast_average import TEAM, _run_seeds
+from game_logic.engine import BattleConfig, HeroSpec
+from race_loadouts import apply_loadout, loadout_of
+from sim_cache import ResultCache, team_hash, team_seed
+
+
+def test_team_hash_ignores_number_spelling_and_code_case():
+    spec = HeroSpec("hero_LFA_Hero", 20e9, 1.74e8, 3200, "MP", "BS", "antlers", "specter")
+    same = HeroSpec("hero_LFA_Hero", 20_000_000_000, 174_000_000, 3200, "MP", "BS", "Antlers", "specter")
+    assert team_hash(BattleConfig((spec,))) == team_hash(BattleConfig((same,)))
+    assert team_hash(BattleConfig((spec,))) != team_hash(BattleConfig((spec,), pet=None))
+
+
+def test_requests_top_up_the_cached_battles(tmp_path):
+    cache = ResultCache(tmp_path / "cache.sqlite3", source="v1")
+    assert cache.get(TEAM) is None
+    assert cache.simulate(TEAM, 2, workers=1).num_simulations == 2
+
+    stats = cache.simulate(TEAM, 4, workers=1)
+    base = team_seed(TEAM)
+    assert stats.num_simulations == 4
+    assert stats.hero_totals == pytest.approx(_run_seeds(range(base, base + 4)).hero_totals)
+    assert cache.simulate(TEAM, 3).num_simulations == 4
+
+    other = apply_loadout(TEAM, [("scissors",) + gear[1:] for gear in loadout_of(TEAM)])
+    assert cache.get(other) is None
+
+
+def test_source_changes_invalidate_the_cache(tmp_path):
+    path = tmp_path / "cache.sqlite3"
+    ResultCache(path, source="v1").simulate(TEAM, 1, workers=1)
+    assert ResultCache(path, source="v1").get(TEAM).num_simulations == 1
+    assert ResultCache(path, source="v2").get(TEAM) is None
+    assert ResultCache(path, source="v1").get(TEAM) is None
@@ -0,0 +1,149 @@
+import asyncio
+import multiprocessing
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+import pytest
+
+from debug_fast_average import _run_seeds
+from sim_jobs import JobCancelled, QueueFull, SimScheduler
+
+
+def record(order, tag, should_stop):
+    order.append(tag)
+    return tag
+
+
+def wait_for_cancel(started, should_stop):
+    started.set()
+    while not should_stop():
+        threading.Event().wait(0.01)
+    raise RuntimeError("stopped")
+
+
+def fail(should_stop):
+    raise ValueError("boom")
+
+
+def run(coro):
+    return asyncio.run(coro)
+
+
+def test_free_slots_go_round_robin_between_users():
+    async def scenario():
+        order = []
+        with ThreadPoolExecutor(1) as pool:
+            scheduler = SimScheduler(pool, max_in_flight=1)
+            heavy = scheduler.submit("heavy", [(record, (order, f"h{i}")) for i in range(4)])
+            light = scheduler.submit("light", [(record, (order, f"l{i}")) for i in range(2)])
+            assert await light.wait() == ["l0", "l1"]
+            assert await heavy.wait() == ["h0", "h1", "h2", "h3"]
+        return order
+
+    # heavy was already back in line when light arrived; after that they alternate.
+    assert run(scenario()) == ["h0", "h1", "l0", "h2", "l1", "h3"]
+
+
+def test_quotas_refuse_extra_jobs():
+    async def scenario():
+        with ThreadPoolExecutor(1) as pool:
+            scheduler = SimScheduler(pool, max_in_flight=1, max_jobs_per_user=1, max_jobs=2)
+            first = scheduler.submit("a", [(record, ([], "a"))])
+            with pytest.raises(QueueFull):
+                scheduler.submit("a", [(record, ([], "a"))])
+            second = scheduler.submit("b", [(record, ([], "b"))])
+            with pytest.raises(QueueFull):
+                scheduler.submit("c", [(record, ([], "c"))])
+            await first.wait()
+            await second.wait()
+            assert scheduler.queued_jobs == 0
+
+    run(scenario())
+
+
+def test_cancel_stops_running_units_and_drops_queued_ones():
+    async def scenario():
+        started = threading.Event()
+        progress = []
+
+        async def on_progress(job):
+            progress.append(job.done)
+
+        with ThreadPoolExecutor(2) as pool:
+            scheduler = SimScheduler(pool, max_in_flight=1, progress_interval=0)
+            job = scheduler.submit("a", [(wait_for_cancel, (started,)), (record, ([], "never"))], on_progress)
+            queued = scheduler.submit("a", [(record, ([], "never"))])
+            other = scheduler.submit("b", [(record, ([], "b"))], on_progress)
+            while not started.is_set():
+                await asyncio.sleep(0.01)
+            assert scheduler.cancel("a") == 2
+            with pytest.raises(JobCancelled):
+                await queued.wait()
+            with pytest.raises(JobCancelled):
+                await job.wait()
+            assert await other.wait() == ["b"]
+            assert scheduler.cancel("a") == 0
+        return progress
+
+    assert run(scenario()) == [1]
+
+
+def test_a_failing_unit_fails_its_job_only():
+    async def scenario():
+        with ThreadPoolExecutor(1) as pool:
+            scheduler = SimScheduler(pool, max_in_flight=1)
+            broken = scheduler.submit("a", [(fail, ()), (record, ([], "skipped"))])
+            fine = scheduler.submit("a", [(record, ([], "next"))])
+            with pytest.raises(ValueError):
+                await broken.wait()
+            assert await fine.wait() == ["next"]
+
+    run(scenario())
+
+
+def test_slow_progress_does_not_hold_the_worker_slot():
+    async def scenario():
+        release = asyncio.Event()
+        reports = []
+
+        async def slow_progress(job):
+            await release.wait()
+            reports.append(job.done)
+
+        async def broken_progress(job):
+            raise RuntimeError("discord is down")
+
+        with ThreadPoolExecutor(1) as pool:
+            scheduler = SimScheduler(pool, max_in_flight=1, progress_interval=0)
+            slow = scheduler.submit("a", [(record, ([], "a0")), (record, ([], "a1"))], slow_progress)
+            other = scheduler.submit("b", [(record, ([], "b"))], broken_progress)
+            # b runs while a's first progress edit is still stuck.
+            assert await asyncio.wait_for(other.wait(), 5) == ["b"]
+            assert not slow.future.done()
+            release.set()
+            assert await slow.wait() == ["a0", "a1"]
+        return reports
+
+    # The report after a0 and the final one run in order, before the result.
+    assert run(scenario()) == [2, 2]
+
+
+def test_process_pool_with_manager_events_like_the_bot():
+    # main.py's setup: units pickled to worker processes, should_stop bound
+    # to a Manager Event proxy's is_set and passed through partial.
+    async def scenario():
+        with multiprocessing.Manager() as manager, ProcessPoolExecutor(1) as pool:
+            scheduler = SimScheduler(pool, max_in_flight=1, event_factory=manager.Event)
+            started = manager.Event()
+            job = scheduler.submit("a", [(wait_for_cancel, (started,))])
+            while not started.is_set():
+                await asyncio.sleep(0.01)
+            scheduler.cancel("a")
+            with pytest.raises(JobCancelled):
+                await job.wait()
+
+            seeds = range(7, 9)
+            [stats] = await scheduler.submit("a", [(_run_seeds, (seeds,))]).wait()
+            return stats
+
+    assert run(scenario()).to_dict() == _run_seeds(range(7, 9)).to_dict()
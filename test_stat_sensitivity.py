@@ -0,0 +1,35 @@
+from debug_fast_average import TEAM
+from game_logic.engine import run_battle
+from stat_sensitivity import finite_difference_deltas, run_perturbed, stat_sensitivity
+
+
+def test_zero_perturbation_replays_the_split_stream_battle(capsys):
+    base = run_battle(TEAM, 11, split_streams=True)
+    same = run_perturbed(TEAM, 11, "LFA", "_base_hd", 0)
+    more_hd = run_perturbed(TEAM, 11, "LFA", "_base_hd", 50)
+    assert capsys.readouterr().out == ""
+    assert same.damage == base.damage
+    assert more_hd.damage["LFA"] != base.damage["LFA"]
+
+
+def test_report_covers_each_hero_and_stat():
+    results = stat_sensitivity(heroes=["LFA"], stats=("hd", "crit_rate"), num_battles=2, base_seed=5, workers=2)
+    assert set(results) == {("LFA", "hd"), ("LFA", "crit_rate")}
+    assert all(result.pairs.n == 2 for result in results.values())
+    assert results[("LFA", "crit_rate")].span == 10
+
+
+def test_points_stay_within_floor_and_cap():
+    assert finite_difference_deltas(20, 5, 0, 100) == (5, -5)
+    assert finite_difference_deltas(0, 5, 0, 100) == (5, 0)
+    assert finite_difference_deltas(98, 5, 0, 100) == (2, -5)
+    # Past the cap the field has to drop to just under it; the stat itself moves 10 (150 -> 140).
+    assert finite_difference_deltas(280, 10, 0, 150) == (0, -140)
+    assert finite_difference_deltas(0, 10, 0, None) == (10, 0)
+
+
+def test_span_is_the_change_in_the_clamped_stat():
+    # Default TEAM: LFA's precision is 280 (cap 150), MFF's DR 94 (cap 75).
+    results = stat_sensitivity(heroes=["LFA", "MFF"], stats=("precision", "dr"), num_battles=2, base_seed=5, workers=1)
+    assert results[("LFA", "precision")].span == 10
+    assert results[("MFF", "dr")].span == 5
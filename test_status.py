@@ -0,0 +1,36 @@
+import copy
+
+from game_logic.boss import Boss
+from game_logic.buff_handler import BuffHandler
+from game_logic.status import EffectList
+
+
+def test_effect_list_counts_kinds_through_changes():
+    dots = EffectList([{"attribute": "burn", "damage": 5, "rounds": 2}])
+    poison = {"attribute": "poison", "damage": 3, "rounds": 1}
+    dots.append(poison)
+    assert dots.has("burn") and dots.has("poison")
+
+    dots.remove(poison)
+    assert not dots.has("poison")
+    clone = copy.deepcopy(dots)
+    del dots[0]
+    assert not dots.has("burn")
+    assert clone.has("burn") and len(clone) == 1
+
+
+def test_boss_status_follows_buffs_and_dots():
+    boss = Boss()
+    assert not (boss.is_poisoned or boss.is_burning or boss.is_blazing)
+    assert boss.crit_taken_bonus == 0
+
+    BuffHandler.apply_debuff(boss, "poison", {"attribute": "poison", "damage": 10, "rounds": 1})
+    BuffHandler.apply_debuff(boss, "crit_down_ac", {"attribute": "crit_damage_taken", "bonus": 48, "rounds": 9999})
+    boss.poison_effects.append({"attribute": "burn", "damage": 10, "rounds": 1})
+    assert boss.is_poisoned and boss.is_burning
+    assert boss.crit_taken_bonus == 48
+
+    boss.process_buffs()
+    boss.process_poison_and_other_effects()
+    assert not boss.is_poisoned and not boss.is_burning
+    assert boss.crit_taken_bonus == 48
@@ -0,0 +1,50 @@
+import io
+
+import pytest
+
+from debug_fast_average import TEAM
+from game_logic.engine import run_battle
+from utils.trace import Tracer, tracer
+
+
+def test_tracer_buffers_until_flush():
+    out = io.StringIO()
+    t = Tracer(stream=out, buffer_lines=3)
+    t.enable("energy")
+    assert t.energy and not t.counterattack
+
+    t.emit("a")
+    t.emit("b")
+    assert out.getvalue() == ""
+    t.emit("c")
+    assert out.getvalue() == "a\nb\nc\n"
+    t.emit("d")
+    t.flush()
+    assert out.getvalue().endswith("d\n")
+
+
+def test_unknown_category_raises():
+    with pytest.raises(KeyError):
+        Tracer().configure({"not_a_category": True})
+
+
+def test_battle_is_silent_with_tracing_off(capsys):
+    run_battle(TEAM, seed=3)
+    tracer.flush()
+    assert capsys.readouterr().out == ""
+
+
+def test_enabled_category_is_traced():
+    out = io.StringIO()
+    old_stream = tracer.stream
+    tracer.stream = out
+    tracer.enable("counterattack")
+    try:
+        run_battle(TEAM, seed=3)
+        tracer.flush()
+    finally:
+        tracer.disable_all()
+        tracer.stream = old_stream
+    lines = out.getvalue().splitlines()
+    assert lines and all("[DEBUG" in line for line in lines)
+    assert any("flush_counterattacks" in line for line in lines)
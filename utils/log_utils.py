@@ -15,6 +15,83 @@ def stylize_log(message, category):
     }
     return f"{prefix_map.get(category, '')} {message}"
 
+LOG_LEVELS = ("off", "summary", "detailed")
+
+
+class LogRecord:
+    """A log line that is only formatted when someone reads it.
+
+    ``template`` is either a ``str.format`` template or a callable taking
+    ``*args``. Hooks return records in place of f-strings so battles whose
+    logs are never shown don't pay for string building.
+    """
+    __slots__ = ("template", "args", "_text")
+
+    def __init__(self, template, *args):
+        self.template = template
+        self.args = args
+        self._text = None
+
+    def __str__(self):
+        if self._text is None:
+            if callable(self.template):
+                self._text = self.template(*self.args)
+            else:
+                self._text = self.template.format(*self.args)
+        return self._text
+
+    def __repr__(self):
+        return f"LogRecord({str(self)!r})"
+
+    def __contains__(self, text):
+        return text in str(self)
+
+
+class ControlLine(LogRecord):
+    """A LogRecord about Fear/Silence/Seal of Light being applied, resisted or
+    removed. Detailed round logs fold these into one status line per hero."""
+    __slots__ = ()
+
+
+def render_logs(lines):
+    """Turn a list of log lines (str or LogRecord) into plain strings."""
+    return [str(line) for line in lines or ()]
+
+
+class BattleLog:
+    """Level-gated log sink shared by a battle's Team and Boss.
+
+    "off" keeps nothing, "summary" keeps one recap line per round, and
+    "detailed" keeps every line the hooks produce. Lines are stored as given
+    (records stay unformatted) until :meth:`render` is called.
+    """
+    __slots__ = ("level", "summary", "detailed", "lines")
+
+    def __init__(self, level="detailed"):
+        if level not in LOG_LEVELS:
+            raise ValueError(f"log_level must be one of {LOG_LEVELS}, got {level!r}")
+        self.level = level
+        self.summary = level != "off"
+        self.detailed = level == "detailed"
+        self.lines = []
+
+    def extend(self, lines):
+        if self.detailed:
+            self.lines.extend(lines)
+
+    def note(self, template, *args):
+        """Record a summary-level line."""
+        if self.summary:
+            self.lines.append(LogRecord(template, *args))
+
+    def render(self):
+        return render_logs(self.lines)
+
+
+def _format_grouped_buffs(buff_desc, heroes):
+    return f"{buff_desc} → {', '.join(heroes)}"
+
+
 def group_team_buffs(buffs_applied):
     from collections import defaultdict
     grouped = defaultdict(list)
@@ -24,11 +101,7 @@ def group_team_buffs(buffs_applied):
         grouped[buff_description].append(hero_name)
 
     for buff_desc, heroes in grouped.items():
-        hero_list = ', '.join(heroes)
-        logs.append(f"{buff_desc} → {hero_list}")
+        logs.append(LogRecord(_format_grouped_buffs, buff_desc, heroes))
 
     return logs
 
-def debug(message: str):
-    print(f"[DEBUG] {message}")
-
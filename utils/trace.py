@@ -0,0 +1,86 @@
+# utils/trace.py
+"""Categorised debug tracing.
+
+Every debug line in game_logic is guarded by one category switch::
+
+    if tracer.energy:
+        tracer.emit(f"[DEBUG-GRANT] {hero.name} gains ...")
+
+A disabled category costs a single attribute check and the message is never
+formatted. Enabled lines are buffered and written to ``tracer.stream``
+(stdout by default) in batches. All categories start off; scripts turn on
+what they need, e.g. ``tracer.configure(LOG_SETTINGS)`` or
+``tracer.enable("counterattack", "energy")``.
+"""
+import atexit
+import sys
+
+CATEGORIES = (
+    "battle_flow",
+    "buffs",
+    "boss_skills",
+    "calamity",
+    "control_effects",
+    "control_cleansing",
+    "counterattack",
+    "hero_skills",
+    "pets",
+    "core",
+    "artifacts",
+    "enables",
+    "lifestars",
+    "foresight",
+    "damage",
+    "dr_adr_armor",
+    "dt_levels",
+    "dodge_heal_shield",
+    "energy",
+    "start_of_battle",
+)
+
+
+class Tracer:
+    def __init__(self, stream=None, buffer_lines=512):
+        for category in CATEGORIES:
+            setattr(self, category, False)
+        self.stream = stream
+        self.buffer_lines = buffer_lines
+        self._buffer = []
+
+    def configure(self, settings):
+        """Set switches from a ``{category: bool}`` dict; unknown names raise KeyError."""
+        for category, enabled in settings.items():
+            if category not in CATEGORIES:
+                raise KeyError(f"unknown trace category {category!r}")
+            setattr(self, category, bool(enabled))
+
+    def enable(self, *categories):
+        self.configure({c: True for c in categories})
+
+    def disable(self, *categories):
+        self.configure({c: False for c in categories})
+
+    def enable_all(self):
+        self.enable(*CATEGORIES)
+
+    def disable_all(self):
+        self.disable(*CATEGORIES)
+
+    def enabled(self):
+        return [c for c in CATEGORIES if getattr(self, c)]
+
+    def emit(self, message):
+        self._buffer.append(message)
+        if len(self._buffer) >= self.buffer_lines:
+            self.flush()
+
+    def flush(self):
+        if not self._buffer:
+            return
+        stream = self.stream or sys.stdout
+        stream.write("\n".join(self._buffer) + "\n")
+        self._buffer.clear()
+
+
+tracer = Tracer()
+atexit.register(tracer.flush)